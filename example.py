@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import enum
 import logging
 import random
 import time
-from typing import Any, List
+from typing import Any, Iterator, List
 
 import requests
 import streamlit as st
@@ -61,6 +62,23 @@ def search_rnd_delay(searchterm: str) -> List[str]:
     return [f"{searchterm}_{i}" for i in range(10)]
 
 
+async def search_async_delay(searchterm: str) -> List[str]:
+    await asyncio.sleep(random.random() * 2)
+    return [f"{searchterm}_{i}" for i in range(10)]
+
+
+def search_stream(searchterm: str) -> Iterator[List[str]]:
+    # fast local results are shown first, slow results are appended later
+    yield [f"{searchterm}_local_{i}" for i in range(3)]
+    time.sleep(1)
+    yield [f"{searchterm}_remote_{i}" for i in range(5)]
+
+
+def search_descriptions(searchterm: str) -> List[tuple[str, int, str]]:
+    # third element is shown as description next to the label
+    return [(f"{searchterm}_{i}", i, f"description {i}") for i in range(10)]
+
+
 def search_enum_return(_: str):
     e = enum.Enum("FancyEnum", {"a": 1, "b": 2, "c": 3})
     return [e.a, e.b, e.c]
@@ -116,6 +134,27 @@ boxes = [
         label=search_rnd_delay.__name__,
         key=search_rnd_delay.__name__,
     ),
+    dict(
+        search_function=search_async_delay,
+        label=search_async_delay.__name__,
+        key=search_async_delay.__name__,
+    ),
+    dict(
+        search_function=search_stream,
+        label=search_stream.__name__,
+        key=search_stream.__name__,
+    ),
+    dict(
+        search_function=search_async_delay,
+        debounce="auto",
+        label=f"{search_async_delay.__name__}_debounce_auto",
+        key=f"{search_async_delay.__name__}_debounce_auto",
+    ),
+    dict(
+        search_function=search_descriptions,
+        label=search_descriptions.__name__,
+        key=search_descriptions.__name__,
+    ),
     dict(
         search_function=search_enum_return,
         clear_on_submit=True,
@@ -222,6 +261,12 @@ boxes = [
             },
         },
     ),
+    dict(
+        options=[f"option_{i}" for i in range(10_000)],
+        mode="local",
+        label="search_local_mode",
+        key="search_local_mode",
+    ),
     dict(
         search_function=search_wikipedia_ids,
         placeholder="Search Wikipedia",
@@ -321,10 +366,11 @@ with manual_example:
     key = f"{search.__name__}_manual"
 
     if key in st.session_state:
-        st.session_state[key]["options_js"] = [
-            {"label": f"{st.session_state[key]['search']}_{i}", "value": i}
-            for i in range(5)
-        ]
+        # labels are sent as a single column, the value of an option is its index
+        st.session_state[key]["options_js"] = {
+            "labels": [f"{st.session_state[key]['search']}_{i}" for i in range(5)],
+            "descriptions": None,
+        }
         st.session_state[key]["options_py"] = [i for i in range(5)]
 
     manual = st_searchbox(
@@ -376,5 +422,15 @@ with fragment_example:
     if selected_value_app:
         st.write(selected_value_app)
 
+    # default rerun_scope="auto", searches only rerun the searchbox itself
+    selected_value_auto = st_searchbox(
+        search_wikipedia_ids,
+        key="wiki_searchbox_auto",
+        label="rerun_scope=auto",
+    )
+
+    if selected_value_auto:
+        st.write(selected_value_auto)
+
     st.write(f"Full app says it ran {st.session_state.app_runs} times.")
     st.write(f"Full app sees that fragment ran {st.session_state.fragment_runs} times.")
@@ -5,30 +5,79 @@ module for streamlit searchbox component
 from __future__ import annotations
 
 import datetime
+import functools
+import hashlib
+import inspect
+import itertools
+import json
 import logging
 import os
 import time
 import warnings
-from typing import Any, Callable, List, Literal, TypedDict
+from collections.abc import Sequence
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    TypedDict,
+    TypeVar,
+    cast,
+)
 
 import streamlit as st
 import streamlit.components.v1 as components
 
+from streamlit_searchbox.cache import (
+    PrefixRefinement,
+    SearchCache,
+    default_cache,
+    default_refinement,
+)
+from streamlit_searchbox.executor import (
+    SearchCancelled,
+    SearchExecutor,
+    _current_fragment_id,
+    _rerun_requested,
+    close_stream,
+    default_executor,
+    is_stream,
+    next_batch,
+    run_coroutine,
+)
+from streamlit_searchbox.federated import FederatedSearch, SearchSource
+from streamlit_searchbox.metrics import SearchboxMetrics, default_metrics
+from streamlit_searchbox.store import StoredResults, default_value_store
+
 try:
     from streamlit import rerun  # type: ignore
 except ImportError:
     # conditional import for streamlit version <1.27
     from streamlit import experimental_rerun as rerun  # type: ignore
 
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    # conditional import for streamlit version <1.18
+    def get_script_run_ctx(*args, **kwargs) -> Any:  # type: ignore
+        return None
+
 
-# default milliseconds for the search function to run, this is used to avoid
-# fast consecutive reruns. possibly remove this in later versions
+# default milliseconds between two searches, this is used to avoid fast
+# consecutive reruns. possibly remove this in later versions
 # see: https://github.com/streamlit/streamlit/issues/9002
 # NOTE: DEPRECATED, remove in future versions
 MIN_EXECUTION_TIME_DEFAULT = (
     250 if st.__version__ >= "1.35" and st.__version__ < "1.39" else 0
 )
 
+# weight of the latest search in the smoothed latency, used for debounce="auto"
+LATENCY_SMOOTHING = 0.3
+
 # point to build directory
 parent_dir = os.path.dirname(os.path.abspath(__file__))
 build_dir = os.path.join(parent_dir, "frontend/build")
@@ -39,8 +88,33 @@ _get_react_component = components.declare_component(
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+class OptionsJS(TypedDict):
+    """
+    columnar options as sent to the react component
+    """
+
+    labels: List[str]
+    descriptions: List[str | None] | None
+
+
+# search functions can be sync or async and return all options at once, as a list
+# or an iterable that is read page by page, or yield batches of options, kwargs
+# of st_searchbox are passed through
+SearchResults = (
+    List[Any] | Iterable[Any] | Iterator[List[Any]] | AsyncIterator[List[Any]]
+)
+SearchFunction = Callable[..., SearchResults | Awaitable[List[Any]]]
+
 
 def _rerun(rerun_scope: Literal["app", "fragment"]) -> None:
+    # streamlit merges fragment reruns into a pending full app rerun, the
+    # fragment scope raises if the searchbox doesn't run in a fragment anymore
+    if rerun_scope == "fragment" and _current_fragment_id() is None:
+        rerun_scope = "app"
+
     # only pass scope if the version is >= 1.37
     if st.__version__ >= "1.37":
         rerun(scope=rerun_scope)  # type: ignore
@@ -48,6 +122,25 @@ def _rerun(rerun_scope: Literal["app", "fragment"]) -> None:
         rerun()
 
 
+def _fragment_supported() -> bool:
+    """
+    searchbox can run in its own fragment, i.e. scoped reruns are supported and
+    the searchbox isn't part of a form
+    """
+    if _searchbox_fragment is None or st.__version__ < "1.37":
+        return False
+
+    if get_script_run_ctx() is None:
+        return False
+
+    try:
+        from streamlit.elements.lib.form_utils import is_in_form
+    except ImportError:
+        return False
+
+    return not is_in_form(st._main)
+
+
 def _list_to_options_py(options: list[Any] | list[tuple[str, Any]]) -> list[Any]:
     """
     unpack search options for proper python return types
@@ -57,55 +150,622 @@ def _list_to_options_py(options: list[Any] | list[tuple[str, Any]]) -> list[Any]
 
 def _list_to_options_js(
     options: list[Any] | list[tuple[str, Any]],
-) -> list[dict[str, Any]]:
+) -> OptionsJS:
     """
-    unpack search options for use in react component
+    unpack search options for use in react component. options are sent as
+    columns, the value of an option is its implied index in the labels and
+    (label, value, description) tuples add an optional description column
     """
-    return [
-        {
-            "label": str(v[0]) if isinstance(v, tuple) else str(v),
-            "value": i,
-        }
-        for i, v in enumerate(options)
-    ]
+    labels = []
+    descriptions: list[str | None] | None = None
+
+    for v in options:
+        if not isinstance(v, tuple):
+            labels.append(str(v))
+            description = None
+        else:
+            labels.append(str(v[0]))
+            description = str(v[2]) if len(v) > 2 else None
+
+        if description is not None and descriptions is None:
+            descriptions = [None for _ in range(len(labels) - 1)]
+
+        if descriptions is not None:
+            descriptions.append(description)
+
+    return {"labels": labels, "descriptions": descriptions}
+
+
+def _descriptions(options: OptionsJS) -> list[str | None]:
+    if options["descriptions"] is None:
+        return [None for _ in options["labels"]]
+
+    return options["descriptions"]
+
+
+def _concat_options_js(options: OptionsJS, more: OptionsJS) -> OptionsJS:
+    """
+    new options with `more` appended, neither of the inputs is mutated
+    """
+    descriptions: list[str | None] | None = None
+
+    if options["descriptions"] is not None or more["descriptions"] is not None:
+        descriptions = _descriptions(options) + _descriptions(more)
+
+    return {"labels": options["labels"] + more["labels"], "descriptions": descriptions}
+
+
+def _list_to_labels(options: list[Any] | list[tuple[str, Any]]) -> list[str]:
+    """
+    labels of search options as shown in the react component
+    """
+    return [str(v[0]) if isinstance(v, tuple) else str(v) for v in options]
+
+
+def _corpus_args(key: str, options: List[Any]) -> dict[str, Any]:
+    """
+    option corpus for `mode="local"`. the labels are only sent once per react
+    component and afterwards referenced by their content hash
+    """
+    corpus = st.session_state[key].get("corpus")
+
+    # keep a reference to the options, so identity checks can't be fooled by
+    # a new list that reuses the id of a garbage collected one
+    if corpus is not None and corpus["options"] is options and corpus["sent"]:
+        return {"hash": corpus["hash"], "labels": None}
+
+    labels = _list_to_labels(options)
+    content_hash = hashlib.sha1("\x00".join(labels).encode()).hexdigest()
+
+    if corpus is None or corpus["hash"] != content_hash:
+        st.session_state[key]["options_py"] = _list_to_options_py(options)
+
+    sent = corpus is not None and corpus["hash"] == content_hash and corpus["sent"]
+
+    st.session_state[key]["corpus"] = {
+        "options": options,
+        "hash": content_hash,
+        "sent": True,
+    }
+
+    return {"hash": content_hash, "labels": None if sent else labels}
+
+
+def _options_rows(options: OptionsJS, descriptions: bool) -> list[Any]:
+    if not descriptions:
+        return options["labels"]
+
+    return list(zip(options["labels"], _descriptions(options)))
+
+
+def _options_diff(old: OptionsJS, new: OptionsJS) -> tuple[int, int, OptionsJS]:
+    """
+    single splice that turns the old into the new options, i.e. the start
+    position, number of deleted options and inserted options in between
+    """
+    descriptions = old["descriptions"] is not None or new["descriptions"] is not None
+    old_rows = _options_rows(old, descriptions)
+    new_rows = _options_rows(new, descriptions)
+    n = min(len(old_rows), len(new_rows))
+
+    start = 0
+    while start < n and old_rows[start] == new_rows[start]:
+        start += 1
+
+    end = 0
+    while (
+        end < n - start
+        and old_rows[len(old_rows) - 1 - end] == new_rows[len(new_rows) - 1 - end]
+    ):
+        end += 1
+
+    stop = len(new_rows) - end
+    new_descriptions = new["descriptions"]
+
+    insert: OptionsJS = {
+        "labels": new["labels"][start:stop],
+        "descriptions": None
+        if new_descriptions is None
+        else new_descriptions[start:stop],
+    }
+
+    return start, len(old_rows) - start - end, insert
+
+
+def _options_args(key: str) -> dict[str, Any]:
+    """
+    options for the react component, which keeps the options of the last rerun.
+    nothing is sent if the options didn't change, a splice if only a few options
+    changed, e.g. for paging or streams, and the full list otherwise
+    """
+    options = st.session_state[key]["options_js"]
+    sent = st.session_state[key].get("options_sent")
+
+    # options are replaced and never mutated in place, identity means unchanged
+    if sent is not None and sent["options"] is options:
+        return {"version": sent["version"]}
+
+    version = 1 if sent is None else sent["version"] + 1
+    args: dict[str, Any] = {"version": version, "options": options}
+
+    if sent is not None and sent["options"] is not None:
+        start, delete, insert = _options_diff(sent["options"], options)
+
+        # splices of mostly new options aren't worth patching
+        if 2 * len(insert["labels"]) <= len(options["labels"]):
+            args = {
+                "version": version,
+                "base": sent["version"],
+                "start": start,
+                "delete": delete,
+                "insert": insert,
+            }
+
+    st.session_state[key]["options_sent"] = {"options": options, "version": version}
+
+    return args
+
+
+def _call_search(
+    search_function: SearchFunction,
+    searchterm: str,
+    executor: SearchExecutor | None = None,
+    **kwargs,
+) -> SearchResults:
+    if executor is not None:
+        search_results = executor.run(search_function, searchterm, kwargs)
+    else:
+        search_results = search_function(searchterm, **kwargs)
+
+        # async search functions run on a shared event loop
+        if inspect.isawaitable(search_results):
+            search_results = run_coroutine(search_results)
+
+    if search_results is None:
+        search_results = []
+
+    return search_results
+
+
+def _run_search(
+    search_function: SearchFunction,
+    searchterm: str,
+    cache: SearchCache | None = None,
+    executor: SearchExecutor | None = None,
+    metrics: SearchboxMetrics | None = None,
+    key: str = "",
+    **kwargs,
+) -> SearchResults:
+    if cache is None:
+        return _call_search(search_function, searchterm, executor, **kwargs)
+
+    cache_key = cache.key(search_function, searchterm, kwargs)
+    search_results = cache.get(cache_key)
+
+    if metrics is not None:
+        metrics.count(
+            key, "cache_hits" if search_results is not None else "cache_misses"
+        )
+
+    if search_results is None:
+        search_results = _call_search(search_function, searchterm, executor, **kwargs)
+
+        # streams and iterators, e.g. cursors, are consumed by a single session
+        # and can't be shared
+        if isinstance(search_results, Sequence):
+            cache.set(cache_key, cast(List[Any], search_results))
+
+    return search_results
+
+
+def _resolve(option: T | bool, default: T) -> T | None:
+    """
+    instance passed to st_searchbox, the shared default for True, None for False
+    """
+    if isinstance(option, bool):
+        return default if option else None
+
+    return option
+
+
+def _result_limit(
+    search_function: SearchFunction, kwargs: dict[str, Any]
+) -> int | None:
+    """
+    maximum number of results of top-k search functions, e.g. `SearchIndex`,
+    either passed as `limit` kwarg or configured on the search function
+    """
+    limit = kwargs.get("limit", getattr(search_function, "limit", None))
+
+    return limit if isinstance(limit, int) else None
 
 
 def _process_search(
-    search_function: Callable[[str], List[Any]],
+    search_function: SearchFunction,
     key: str,
     searchterm: str,
     rerun_on_update: bool,
     rerun_scope: Literal["app", "fragment"] = "app",
-    min_execution_time: int = 0,
+    cache: SearchCache | None = None,
+    refine: PrefixRefinement | None = None,
+    executor: SearchExecutor | None = None,
+    max_options: int | None = None,
+    value_store: SearchCache | None = None,
+    metrics: SearchboxMetrics | None = None,
+    trace_id: int | None = None,
     **kwargs,
 ) -> None:
     # nothing changed, avoid new search
     if searchterm == st.session_state[key]["search"]:
+        # streaming search functions show one new batch per rerun
+        if st.session_state[key].get("stream") is not None:
+            _process_stream(key, rerun_on_update, rerun_scope)
         return
 
+    # results of a previous streaming search are outdated
+    if st.session_state[key].get("stream") is not None:
+        close_stream(st.session_state[key]["stream"])
+        st.session_state[key]["stream"] = None
+
+    # server side debounce, a newer keystroke is already queued and its rerun
+    # will search for the newer searchterm instead
+    if _rerun_requested():
+        logger.debug(f"search for '{searchterm}' skipped, key={key}")
+        if metrics is not None:
+            metrics.count(key, "dropped")
+        return
+
+    searchterm_previous = st.session_state[key]["search"]
     st.session_state[key]["search"] = searchterm
 
+    if metrics is not None:
+        metrics.search_start(key, searchterm)
+
     ts_start = datetime.datetime.now()
+    measurements: dict[str, Any] = {}
+    # reported to the metrics as well if the search is cancelled or raises
+    status = "error"
 
-    search_results = search_function(searchterm, **kwargs)
+    try:
+        search_results = None
 
-    if search_results is None:
-        search_results = []
+        if refine is not None:
+            # previous results of this session, filtered locally if possible
+            history = st.session_state[key].setdefault("history", [])
+            search_results = refine.refine(history, searchterm)
 
-    st.session_state[key]["options_js"] = _list_to_options_js(search_results)
-    st.session_state[key]["options_py"] = _list_to_options_py(search_results)
+            if search_results is not None and metrics is not None:
+                metrics.count(key, "refined")
+
+        if search_results is None:
+            ts_search = time.perf_counter()
+            results = _run_search(
+                search_function,
+                searchterm,
+                cache,
+                executor,
+                metrics=metrics,
+                key=key,
+                **kwargs,
+            )
+            measurements["search_ms"] = (time.perf_counter() - ts_search) * 1000
+
+            if metrics is not None:
+                metrics.count(key, "searches")
+
+            # streaming search functions show their first batch right away, paging
+            # isn't used since further batches are appended to all options
+            if is_stream(results, search_function):
+                st.session_state[key]["stream"] = results
+                results = next_batch(results) or []
+                max_options = None
+
+            search_results = cast(List[Any], results)
+
+        if (
+            refine is not None
+            and st.session_state[key].get("stream") is None
+            and isinstance(search_results, Sequence)
+        ):
+            refine.remember(
+                st.session_state[key]["history"],
+                searchterm,
+                search_results,
+                limit=_result_limit(search_function, kwargs),
+            )
+
+        stored = None
+
+        # sessions only keep a reference to results in the shared store, streams and
+        # paged iterables are consumed per session and can't be shared
+        if (
+            value_store is not None
+            and st.session_state[key].get("stream") is None
+            and (isinstance(search_results, Sequence) or max_options is None)
+        ):
+            search_results = list(search_results)
+            store_key = value_store.key(search_function, searchterm, kwargs)
+            value_store.set(store_key, search_results)
+
+            stored = StoredResults(
+                value_store,
+                store_key,
+                len(search_results),
+                functools.partial(
+                    _call_search, search_function, searchterm, executor, **kwargs
+                ),
+            )
+
+        ts_convert = time.perf_counter()
+        _set_options(key, search_results, max_options, stored)
+        measurements["convert_ms"] = (time.perf_counter() - ts_convert) * 1000
 
-    if rerun_on_update:
         ts_stop = datetime.datetime.now()
         execution_time_ms = (ts_stop - ts_start).total_seconds() * 1000
+        logger.debug(
+            f"search for '{searchterm}' took {execution_time_ms:.0f}ms, key={key}"
+        )
+
+        _update_latency(key, execution_time_ms)
 
-        # wait until minimal execution time is reached
-        if execution_time_ms < min_execution_time:
-            time.sleep((min_execution_time - execution_time_ms) / 1000)
+        if metrics is not None:
+            measurements["results"] = (
+                len(search_results)
+                if isinstance(search_results, Sequence)
+                else len(st.session_state[key]["options_js"]["labels"])
+            )
+
+        # server timings, echoed to the react component with the new options
+        if trace_id is not None:
+            st.session_state[key]["trace"] = {
+                "id": trace_id,
+                "server_ms": execution_time_ms,
+                **measurements,
+            }
+
+        status = "ok"
+    except SearchCancelled:
+        # a newer interaction is already queued, that rerun will search again
+        logger.debug(f"search for '{searchterm}' cancelled, key={key}")
+        st.session_state[key]["search"] = searchterm_previous
+        status = "cancelled"
+        if metrics is not None:
+            metrics.count(key, "cancelled")
+        return
+    finally:
+        if metrics is not None:
+            if status == "error":
+                metrics.count(key, "errors")
+
+            measurements["status"] = status
+            metrics.search_end(key, searchterm, measurements)
+
+    if rerun_on_update:
+        # a newer interaction is already queued and will show these results, an
+        # additional rerun would only be dropped by streamlit after starting
+        if _rerun_requested():
+            return
+
+        if metrics is not None:
+            metrics.count(key, "reruns")
+            # observed once the searchbox renders again
+            st.session_state[key]["rerun_start"] = time.perf_counter()
 
         _rerun(rerun_scope)
 
 
+def _update_latency(key: str, execution_time_ms: float) -> None:
+    """
+    exponentially smoothed search latency, which adapts `debounce="auto"`
+    """
+    latency = st.session_state[key].get("latency_ms")
+
+    if latency is not None:
+        execution_time_ms = (
+            LATENCY_SMOOTHING * execution_time_ms + (1 - LATENCY_SMOOTHING) * latency
+        )
+
+    st.session_state[key]["latency_ms"] = execution_time_ms
+
+
+def _next_page(
+    search_results: Iterator[Any],
+    max_options: int | None,
+) -> tuple[List[Any], Iterator[Any] | None]:
+    """
+    next `max_options` results of an iterator and the iterator over the rest,
+    None if there are no further results. only one result is read ahead
+    """
+    if max_options is None:
+        return list(search_results), None
+
+    page = list(itertools.islice(search_results, max_options + 1))
+
+    if len(page) <= max_options:
+        return page, None
+
+    return page[:max_options], itertools.chain(page[max_options:], search_results)
+
+
+def _set_options(
+    key: str,
+    search_results: Iterable[Any],
+    max_options: int | None = None,
+    stored: StoredResults | None = None,
+) -> None:
+    """
+    show the first `max_options` search results, further results are only
+    converted once the user scrolls to the end of the options. with `stored`
+    results, the session only keeps the reference instead of the option values
+    """
+    more: Sequence[Any] | Iterator[Any] | None
+
+    # iterables are only read up to the first page, the session keeps the
+    # iterator for the next pages
+    if not isinstance(search_results, Sequence):
+        page, more = _next_page(iter(search_results), max_options)
+    else:
+        page = list(search_results[:max_options])
+        more = search_results if len(search_results) > len(page) else None
+
+    st.session_state[key]["options_js"] = _list_to_options_js(page)
+    st.session_state[key]["options_ref"] = stored
+
+    if stored is None:
+        st.session_state[key]["options_py"] = _list_to_options_py(page)
+        st.session_state[key]["options_more"] = more
+    else:
+        st.session_state[key].pop("options_py", None)
+        st.session_state[key]["options_more"] = stored if more is not None else None
+
+
+def _option_value(key: str, index: int) -> Any:
+    """
+    python value of the submitted option
+    """
+    stored = st.session_state[key].get("options_ref")
+
+    if stored is not None:
+        return _stored_value(key, stored, index)
+
+    if "options_py" in st.session_state[key]:
+        return st.session_state[key]["options_py"][index]
+
+    return index
+
+
+def _stored_value(key: str, stored: StoredResults, index: int) -> Any:
+    """
+    resolve the submitted option from the shared store. results that were
+    searched again after eviction can differ, e.g. for refined results, so the
+    option is located by the label that the user selected
+    """
+    label = st.session_state[key]["options_js"]["labels"][index]
+    results = stored.results()
+
+    if index >= len(results) or _list_to_labels([results[index]])[0] != label:
+        labels = _list_to_labels(results)
+
+        if label not in labels:
+            logger.warning(f"submitted option '{label}' not found, key={key}")
+            return None
+
+        index = labels.index(label)
+
+    return _list_to_options_py([results[index]])[0]
+
+
+def _process_page(
+    key: str,
+    loaded: int,
+    max_options: int | None,
+    rerun_scope: Literal["app", "fragment"] = "app",
+) -> None:
+    """
+    append the next `max_options` search results after the user scrolled to the
+    end of the `loaded` options
+    """
+    search_results = st.session_state[key].get("options_more")
+
+    # page was already added, e.g. for reruns triggered by other widgets
+    if search_results is None or loaded != len(
+        st.session_state[key]["options_js"]["labels"]
+    ):
+        return
+
+    if isinstance(search_results, Iterator):
+        page, more = _next_page(search_results, max_options)
+    else:
+        end = len(search_results) if max_options is None else loaded + max_options
+
+        try:
+            page = search_results[loaded:end]
+        except SearchCancelled:
+            # evicted results were searched again, the component requests the
+            # page again after the newer interaction
+            return
+
+        more = search_results if end < len(search_results) else None
+
+    st.session_state[key]["options_js"] = _concat_options_js(
+        st.session_state[key]["options_js"], _list_to_options_js(page)
+    )
+    # stored results are resolved on submit, nothing to convert
+    if "options_py" in st.session_state[key]:
+        st.session_state[key]["options_py"] += _list_to_options_py(page)
+
+    st.session_state[key]["options_more"] = more
+
+    _rerun(rerun_scope)
+
+
+def _process_stream(
+    key: str,
+    rerun_on_update: bool,
+    rerun_scope: Literal["app", "fragment"] = "app",
+) -> None:
+    """
+    append the next batch of a streaming search function to the options
+    """
+    try:
+        batch = next_batch(st.session_state[key]["stream"])
+    except SearchCancelled:
+        # a newer interaction is already queued, that rerun will continue
+        return
+
+    if batch is None:
+        st.session_state[key]["stream"] = None
+        return
+
+    st.session_state[key]["options_js"] = _concat_options_js(
+        st.session_state[key]["options_js"], _list_to_options_js(batch)
+    )
+    st.session_state[key]["options_py"] += _list_to_options_py(batch)
+
+    if rerun_on_update and not _rerun_requested():
+        _rerun(rerun_scope)
+
+
+def _search_outdated(key: str, seq: int | None) -> bool:
+    """
+    search request is older than the latest one of this searchbox, the same
+    request is repeated for reruns triggered by other widgets and streams
+    """
+    if seq is None:
+        return False
+
+    if seq < st.session_state[key].get("search_seq", seq):
+        return True
+
+    st.session_state[key]["search_seq"] = seq
+
+    return False
+
+
+def _process_trace_report(
+    key: str,
+    report: dict[str, Any] | None,
+    trace_function: Callable[[dict[str, Any]], None] | None,
+) -> None:
+    """
+    waterfall of a search from keystroke to rendered options, assembled by the
+    react component and sent with its next interaction
+    """
+    if report is None or st.session_state[key].get("trace_reported") == report["id"]:
+        return
+
+    st.session_state[key]["trace_reported"] = report["id"]
+
+    # roundtrip without the search itself, i.e. websocket, reruns and script
+    server_ms = (report.get("server") or {}).get("server_ms", 0)
+    report = {**report, "key": key, "streamlit_ms": report["roundtrip_ms"] - server_ms}
+
+    if trace_function is not None:
+        trace_function(report)
+    else:
+        logger.info(f"trace {report}")
+
+
 def _set_defaults(
     key: str,
     default: Any,
@@ -118,7 +778,7 @@ def _set_defaults(
         # updated after each search keystroke
         "search": default_searchterm,
         # updated after each search_function run
-        "options_js": [],
+        "options_js": _list_to_options_js([]),
         # key that is used by react component, use time suffix to reload after clear
         "key_react": f"{key}_react_{str(time.time())}",
     }
@@ -189,8 +849,225 @@ class StyleOverrides(TypedDict, total=False):
     searchbox: SearchboxStyle | None
 
 
+def _searchbox(
+    search_function: SearchFunction | None,
+    key: str,
+    *,
+    placeholder: str,
+    label: str | None,
+    default: Any,
+    default_searchterm: str,
+    default_use_searchterm: bool,
+    default_options: List[Any] | None,
+    clear_on_submit: bool,
+    rerun_on_update: bool,
+    edit_after_submit: Literal["disabled", "current", "option", "concat"],
+    style_absolute: bool,
+    style_overrides: StyleOverrides | None,
+    debounce: int | Literal["auto"],
+    debounce_bounds: tuple[int, int],
+    min_execution_time: int,
+    reset_function: Callable[[], None] | None,
+    submit_function: Callable[[Any], None] | None,
+    rerun_scope: Literal["app", "fragment"],
+    fragment: bool,
+    help: str | None,
+    cache: SearchCache | None,
+    refine: PrefixRefinement | None,
+    executor: SearchExecutor | None,
+    options: List[Any] | None,
+    mode: Literal["remote", "local"],
+    max_options: int | None,
+    value_store: SearchCache | None,
+    metrics: SearchboxMetrics | None,
+    trace: Callable[[dict[str, Any]], None] | bool,
+    **kwargs,
+) -> Any:
+    """
+    render the react component and process its interactions
+    """
+    # results have to be shown in the app, also when running in a fragment
+    result_scope = "app" if fragment else rerun_scope
+
+    # options are searched by the react component itself in local mode
+    corpus = _corpus_args(key, options or []) if mode == "local" else None
+    options_args = _options_args(key) if mode == "remote" else None
+
+    rerun_start = st.session_state[key].pop("rerun_start", None)
+    if metrics is not None and rerun_start is not None:
+        metrics.observe(key, "rerun_ms", (time.perf_counter() - rerun_start) * 1000)
+
+    if (
+        metrics is not None
+        and options_args is not None
+        and ("options" in options_args or "insert" in options_args)
+    ):
+        # approximation, streamlit serializes the args itself
+        ts_serialize = time.perf_counter()
+        payload = json.dumps(options_args)
+        metrics.observe(
+            key, "serialize_ms", (time.perf_counter() - ts_serialize) * 1000
+        )
+        metrics.observe(key, "payload_bytes", len(payload))
+
+    # everything here is passed to react as this.props.args
+    react_state = _get_react_component(
+        options=options_args,
+        mode=mode,
+        corpus=corpus,
+        clear_on_submit=clear_on_submit,
+        placeholder=placeholder,
+        label=label,
+        edit_after_submit=edit_after_submit,
+        style_overrides=style_overrides,
+        debounce=debounce,
+        # only needed to adapt the debounce, avoids changing args otherwise
+        debounce_bounds=debounce_bounds if debounce == "auto" else None,
+        latency=round(st.session_state[key].get("latency_ms") or 0)
+        if debounce == "auto"
+        else None,
+        min_execution_time=min_execution_time,
+        max_options=max_options,
+        has_more=st.session_state[key].get("options_more") is not None,
+        default_searchterm=default_searchterm,
+        tracing=trace is not False,
+        trace=st.session_state[key].get("trace") if trace is not False else None,
+        # react return state within streamlit session_state
+        help=help,
+        key=st.session_state[key]["key_react"],
+    )
+
+    if style_absolute:
+        # add empty markdown blocks to reserve space for the iframe
+        st.markdown("")
+        st.markdown("")
+
+        css = """
+        iframe[title="streamlit_searchbox.searchbox"] {
+            position: absolute;
+            z-index: 10;
+        }
+        """
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+
+    if react_state is None:
+        return st.session_state[key]["result"]
+
+    interaction, value = react_state["interaction"], react_state["value"]
+
+    if trace is not False:
+        _process_trace_report(
+            key,
+            react_state.get("trace_report"),
+            trace if callable(trace) else None,
+        )
+
+    if interaction == "corpus":
+        # react component lost the corpus, e.g. after the iframe was reloaded
+        if st.session_state[key].get("corpus_request") != value:
+            st.session_state[key]["corpus_request"] = value
+            st.session_state[key]["corpus"]["sent"] = False
+            _rerun(rerun_scope)
+
+    if interaction == "options":
+        # react component doesn't know the base of the last splice, e.g. after
+        # the iframe was reloaded, send the full options again
+        if st.session_state[key].get("options_request") != value:
+            st.session_state[key]["options_request"] = value
+            st.session_state[key]["options_sent"]["options"] = None
+            _rerun(rerun_scope)
+
+    if interaction == "page":
+        _process_page(key, value, max_options, rerun_scope)
+
+    # searches are numbered by the react component, older searches can arrive
+    # after newer ones, e.g. from reruns that were started before the latest
+    if interaction == "search" and _search_outdated(key, react_state.get("seq")):
+        logger.debug(f"outdated search '{value}' dropped, key={key}")
+        interaction = None
+
+        if metrics is not None:
+            metrics.count(key, "dropped")
+
+    if interaction == "search" and search_function is not None:
+        if default_use_searchterm:
+            st.session_state[key]["result"] = value
+
+        # triggers rerun, no ops afterwards executed
+        _process_search(
+            search_function,
+            key,
+            value,
+            rerun_on_update,
+            rerun_scope=rerun_scope,
+            cache=cache,
+            refine=refine,
+            executor=executor,
+            max_options=max_options,
+            value_store=value_store,
+            metrics=metrics,
+            trace_id=react_state.get("seq") if trace is not False else None,
+            **kwargs,
+        )
+
+    if interaction == "submit":
+        try:
+            submit_value = _option_value(key, value)
+        except SearchCancelled:
+            # evicted results were searched again and a newer interaction is
+            # already queued, keep the previous value
+            logger.debug(f"submit of option {value} cancelled, key={key}")
+            return st.session_state[key]["result"]
+
+        # ensure submit_function only runs when value changed
+        if st.session_state[key]["result"] != submit_value:
+            st.session_state[key]["result"] = submit_value
+            if submit_function is not None:
+                submit_function(submit_value)
+
+            # submit only reran the fragment, show the new result in the app
+            if fragment and not clear_on_submit:
+                _rerun(result_scope)
+
+        if clear_on_submit:
+            _set_defaults(
+                key,
+                st.session_state[key]["result"],
+                default_searchterm,
+                default_options,
+            )
+            _rerun(result_scope)
+
+        return st.session_state[key]["result"]
+
+    if interaction == "reset":
+        _set_defaults(
+            key,
+            default,
+            default_searchterm,
+            default_options,
+        )
+
+        if reset_function is not None:
+            reset_function()
+
+        if rerun_on_update or fragment:
+            _rerun(result_scope)
+
+        return default
+
+    # no new react interaction happened
+    return st.session_state[key]["result"]
+
+
+# searchbox in its own fragment, only available for streamlit >= 1.37
+_searchbox_fragment = st.fragment(_searchbox) if hasattr(st, "fragment") else None
+
+
 def st_searchbox(
-    search_function: Callable[[str], List[Any]],
+    search_function: SearchFunction
+    | Sequence[SearchFunction | SearchSource]
+    | None = None,
     placeholder: str = "Search ...",
     label: str | None = None,
     default: Any = None,
@@ -203,13 +1080,23 @@ def st_searchbox(
     edit_after_submit: Literal["disabled", "current", "option", "concat"] = "disabled",
     style_absolute: bool = False,
     style_overrides: StyleOverrides | None = None,
-    debounce: int = 150,
+    debounce: int | Literal["auto"] = 150,
+    debounce_bounds: tuple[int, int] = (50, 1000),
     min_execution_time: int = MIN_EXECUTION_TIME_DEFAULT,
     reset_function: Callable[[], None] | None = None,
     submit_function: Callable[[Any], None] | None = None,
     key: str = "searchbox",
-    rerun_scope: Literal["app", "fragment"] = "app",
+    rerun_scope: Literal["app", "fragment", "auto"] = "auto",
     help: str | None = None,
+    cache: SearchCache | bool = False,
+    refine_results: PrefixRefinement | bool = False,
+    options: List[Any] | None = None,
+    mode: Literal["remote", "local"] = "remote",
+    executor: SearchExecutor | bool = False,
+    max_options: int | None = None,
+    value_store: SearchCache | bool = False,
+    metrics: SearchboxMetrics | bool = False,
+    trace: Callable[[dict[str, Any]], None] | bool = False,
     **kwargs,
 ) -> Any:
     """
@@ -217,8 +1104,12 @@ def st_searchbox(
     and returns a selected option or empty string if nothing was selected
 
     Args:
-        search_function (Callable[[str], List[any]]):
+        search_function (Callable[[str], List[any]], optional):
             Function that is called to fetch new suggestions after user input.
+            Can also be an async function, which is cancelled if superseded by
+            newer user input, or a list of functions / SearchSource instances that
+            are called in parallel and merged with a FederatedSearch. Required
+            unless mode is "local".
         placeholder (str, optional):
             Label shown in the searchbox. Defaults to "Search ...".
         label (str, optional):
@@ -242,17 +1133,23 @@ def st_searchbox(
             searchboxes and should be passed to every element. Defaults to False.
         style_overrides (StyleOverrides, optional):
             CSS styling passed directly to the react components. Defaults to None.
-        rerun_scope ("app", "fragment", optional):
+        rerun_scope ("app", "fragment", "auto", optional):
             The scope in which to rerun the Streamlit app. Only applicable if Streamlit
-            version >= 1.37. Defaults to "app".
-        debounce (int, optional):
+            version >= 1.37. With "auto" the searchbox runs in its own fragment, so
+            searches don't rerun the whole app. Defaults to "auto".
+        debounce (int | "auto", optional):
             Time in milliseconds to wait before sending the input to the search function
-            to avoid too many requests, i.e. during fast keystrokes. Defaults to 150.
+            to avoid too many requests, i.e. during fast keystrokes. With "auto" the
+            wait adapts to the measured search latency and typing speed. Defaults to 150.
+        debounce_bounds (tuple[int, int], optional):
+            Minimum and maximum wait in milliseconds for debounce="auto".
+            Defaults to (50, 1000).
         min_execution_time (int, optional):
-            Deprecated: Minimal execution time for the search function in milliseconds.
-            This is used to avoid fast consecutive reruns, where fast reruns can lead to
-            resets within the component in some streamlit versions.
-            Defaults to 0 or 250 depending on the streamlit version.
+            Deprecated: Minimal time between two searches in milliseconds. This is
+            used to avoid fast consecutive reruns, where fast reruns can lead to
+            resets within the component in some streamlit versions. Searches within
+            this interval are merged by the react component instead of waiting on the
+            server. Defaults to 0 or 250 depending on the streamlit version.
         reset_function (Callable[[], None], optional):
             Function that is called after the user reset the combobox. Defaults to None.
         submit_function (Callable[[any], None], optional):
@@ -260,6 +1157,42 @@ def st_searchbox(
             combobox. Defaults to None.
         help (str, optional):
             Show a help tooltip, only visible if a label is provided. Defaults to None.
+        cache (SearchCache | bool, optional):
+            Cache search results across sessions, keyed on the search function,
+            searchterm and kwargs. Pass True to use the shared default cache or a
+            SearchCache instance for custom size / ttl limits. Defaults to False.
+        refine_results (PrefixRefinement | bool, optional):
+            Filter the previous results of this session locally if the searchterm
+            extends a previous one instead of calling the search function. Only
+            use this if results are monotone under prefix extension. Defaults to False.
+        options (List[any], optional):
+            Static list of options that is searched in the browser, only used if
+            mode is "local". Defaults to None.
+        mode ("remote", "local", optional):
+            Call the search_function on user input or filter the static options
+            within the browser without reruns. Defaults to "remote".
+        executor (SearchExecutor | bool, optional):
+            Run the search function in a thread pool shared across sessions, which
+            coalesces identical concurrent searches and can limit the concurrency per
+            search function. Pass True to use the shared default executor or a
+            SearchExecutor instance for custom limits. Defaults to False.
+        max_options (int, optional):
+            Maximum number of options that are shown at once, further options are
+            loaded when scrolling to the end of the options. Defaults to None.
+        value_store (SearchCache | bool, optional):
+            Keep search results in a store shared across sessions, each session
+            only keeps a reference and resolves the selected option on submit.
+            Evicted results are searched again. Pass True to use the shared default
+            store or a SearchCache instance for custom limits. Defaults to False.
+        metrics (SearchboxMetrics | bool, optional):
+            Record latency, result count and payload size histograms as well as
+            cache hits and dropped searches per key. Pass True to use the shared
+            default metrics or a SearchboxMetrics instance, e.g. with hooks.
+            Defaults to False.
+        trace (Callable[[dict], None] | bool, optional):
+            Trace searches from keystroke to rendered options. The waterfall with
+            browser and server timings is passed to the function once the next
+            interaction happens, True logs it instead. Defaults to False.
         key (str, optional):
             Streamlit session key. Defaults to "searchbox".
 
@@ -274,6 +1207,11 @@ def st_searchbox(
             stacklevel=2,
         )
 
+    if mode == "remote" and search_function is None:
+        raise ValueError('search_function is required unless mode is "local"')
+
+    search_cache = _resolve(cache, default_cache)
+
     if key not in st.session_state:
         _set_defaults(
             key,
@@ -282,93 +1220,76 @@ def st_searchbox(
             default_options,
         )
 
-    # everything here is passed to react as this.props.args
-    react_state = _get_react_component(
-        options=st.session_state[key]["options_js"],
-        clear_on_submit=clear_on_submit,
-        placeholder=placeholder,
-        label=label,
-        edit_after_submit=edit_after_submit,
-        style_overrides=style_overrides,
-        debounce=debounce,
-        default_searchterm=default_searchterm,
-        # react return state within streamlit session_state
-        help=help,
-        key=st.session_state[key]["key_react"],
-    )
-
-    if style_absolute:
-        # add empty markdown blocks to reserve space for the iframe
-        st.markdown("")
-        st.markdown("")
-
-        css = """
-        iframe[title="streamlit_searchbox.searchbox"] {
-            position: absolute;
-            z-index: 10;
-        }
-        """
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
-
-    if react_state is None:
-        return st.session_state[key]["result"]
-
-    interaction, value = react_state["interaction"], react_state["value"]
-
-    if interaction == "search":
-        if default_use_searchterm:
-            st.session_state[key]["result"] = value
+    refine = _resolve(refine_results, default_refinement)
+    search_executor = _resolve(executor, default_executor)
 
-        # triggers rerun, no ops afterwards executed
-        _process_search(
+    if isinstance(search_function, Sequence):
+        # sources run in their own bounded pool unless an executor is given
+        search_function = FederatedSearch(
             search_function,
-            key,
-            value,
-            rerun_on_update,
-            rerun_scope=rerun_scope,
-            min_execution_time=min_execution_time,
-            **kwargs,
-        )
-
-    if interaction == "submit":
-        submit_value = (
-            st.session_state[key]["options_py"][value]
-            if "options_py" in st.session_state[key]
-            else value
+            executor=executor if isinstance(executor, SearchExecutor) else None,
         )
 
-        # ensure submit_function only runs when value changed
-        if st.session_state[key]["result"] != submit_value:
-            st.session_state[key]["result"] = submit_value
-            if submit_function is not None:
-                submit_function(submit_value)
+    # sources of a federated search already run in its executor
+    if isinstance(search_function, FederatedSearch):
+        search_executor = None
+    search_value_store = _resolve(value_store, default_value_store)
+    search_metrics = _resolve(metrics, default_metrics)
 
-        if clear_on_submit:
-            _set_defaults(
-                key,
-                st.session_state[key]["result"],
-                default_searchterm,
-                default_options,
-            )
-            _rerun(rerun_scope)
+    fragment_id = _current_fragment_id()
 
-        return st.session_state[key]["result"]
+    # run the searchbox in its own fragment, so searches only rerun the searchbox
+    # and not the whole app. the searchterm has to be returned to the app itself
+    # for default_use_searchterm, which needs full app reruns
+    use_fragment = (
+        rerun_scope == "auto"
+        and fragment_id is None
+        and not default_use_searchterm
+        and _fragment_supported()
+    )
 
-    if interaction == "reset":
-        _set_defaults(
-            key,
-            default,
-            default_searchterm,
-            default_options,
-        )
+    if rerun_scope == "auto":
+        rerun_scope = "fragment" if fragment_id is not None else "app"
 
-        if reset_function is not None:
-            reset_function()
+    searchbox = _searchbox_fragment if use_fragment else _searchbox
+    assert searchbox is not None
 
-        if rerun_on_update:
-            _rerun(rerun_scope)
+    result = searchbox(
+        search_function,
+        key,
+        placeholder=placeholder,
+        label=label,
+        default=default,
+        default_searchterm=default_searchterm,
+        default_use_searchterm=default_use_searchterm,
+        default_options=default_options,
+        clear_on_submit=clear_on_submit,
+        rerun_on_update=rerun_on_update,
+        edit_after_submit=edit_after_submit,
+        style_absolute=style_absolute,
+        style_overrides=style_overrides,
+        debounce=debounce,
+        debounce_bounds=debounce_bounds,
+        min_execution_time=min_execution_time,
+        reset_function=reset_function,
+        submit_function=submit_function,
+        rerun_scope="fragment" if use_fragment else rerun_scope,
+        fragment=use_fragment,
+        help=help,
+        cache=search_cache,
+        refine=refine,
+        executor=search_executor,
+        options=options,
+        mode=mode,
+        max_options=max_options,
+        value_store=search_value_store,
+        metrics=search_metrics,
+        trace=trace,
+        **kwargs,
+    )
 
-        return default
+    # fragment reruns can't return values to the app, use the stored result
+    if use_fragment:
+        return st.session_state[key]["result"]
 
-    # no new react interaction happened
-    return st.session_state[key]["result"]
+    return result
@@ -0,0 +1,328 @@
+"""
+caching utilities for search functions that are shared across sessions
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List
+
+
+class _Identity:
+    """
+    unhashable value in a key, compared by identity. the value is referenced by
+    the key, so its id can't be reused by another object while the key exists
+    """
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __hash__(self) -> int:
+        return id(self.value)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Identity) and other.value is self.value
+
+
+def _hashable(value: Any) -> Hashable:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return _Identity(value)
+
+
+def _cell_contents(cell: Any) -> Hashable:
+    try:
+        return _hashable(cell.cell_contents)
+    except ValueError:
+        # cell of a variable that isn't assigned yet
+        return None
+
+
+def _function_key(search_function: Callable[..., Any]) -> Hashable:
+    """
+    identity of a search function that is stable across reruns and sessions.
+    lambdas and closures are re-created on every rerun, so id() can't be used.
+    captured variables, default arguments and the instance of bound methods are
+    part of the identity, so closures of the same factory, e.g. per tenant,
+    don't share results. callable objects are identified by themselves, i.e.
+    by identity unless they define `__eq__` and `__hash__`
+    """
+    args: tuple = ()
+
+    # unpack functools.partial, bound arguments are part of the identity
+    while hasattr(search_function, "func") and hasattr(search_function, "args"):
+        args += tuple(_hashable(a) for a in getattr(search_function, "args", ()))
+        args += tuple(
+            (k, _hashable(v))
+            for k, v in sorted(getattr(search_function, "keywords", {}).items())
+        )
+        search_function = search_function.func  # type: ignore
+
+    code = getattr(search_function, "__code__", None)
+
+    if code is None:
+        return (_hashable(search_function), args)
+
+    closure = getattr(search_function, "__closure__", None) or ()
+    defaults = getattr(search_function, "__defaults__", None) or ()
+    kwdefaults = getattr(search_function, "__kwdefaults__", None) or {}
+
+    return (
+        getattr(search_function, "__module__", None),
+        getattr(search_function, "__qualname__", None),
+        code.co_filename,
+        code.co_firstlineno,
+        args,
+        tuple(_cell_contents(cell) for cell in closure),
+        tuple(_hashable(v) for v in defaults),
+        tuple((k, _hashable(v)) for k, v in sorted(kwdefaults.items())),
+        _hashable(getattr(search_function, "__self__", None)),
+    )
+
+
+def _kwargs_key(kwargs: dict[str, Any]) -> Hashable:
+    items = tuple(sorted(kwargs.items()))
+
+    try:
+        hash(items)
+        return items
+    except TypeError:
+        # unhashable kwargs, e.g. lists or dicts, fall back to their representation
+        return repr(items)
+
+
+def _estimate_size(results: List[Any]) -> int:
+    """
+    shallow estimate of the memory used by a result list in bytes
+    """
+    size = sys.getsizeof(results)
+
+    for v in results:
+        size += sys.getsizeof(v)
+
+        if isinstance(v, tuple):
+            size += sum(sys.getsizeof(e) for e in v)
+
+    return size
+
+
+class SearchCache:
+    """
+    process-wide, thread-safe cache for search results, keyed on the search
+    function, the searchterm and the kwargs passed to the search function.
+
+    entries are evicted in least-recently-used order once `max_entries` or
+    `max_bytes` is exceeded and expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = 1024,
+        max_bytes: int | None = None,
+        ttl: float | None = 300,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, results)
+        self._entries: OrderedDict[Hashable, tuple[float, int, List[Any]]] = (
+            OrderedDict()
+        )
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(
+        self,
+        search_function: Callable[..., Any],
+        searchterm: str,
+        kwargs: dict[str, Any],
+    ) -> Hashable:
+        return (_function_key(search_function), searchterm, _kwargs_key(kwargs))
+
+    def get(self, key: Hashable) -> List[Any] | None:
+        """
+        cached results or None, counts towards hits / misses
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[2]
+
+    def set(self, key: Hashable, results: List[Any]) -> None:
+        size = _estimate_size(results) if self.max_bytes is not None else 0
+        expires_at = time.monotonic() + self.ttl if self.ttl else float("inf")
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            # never store entries that would evict the whole cache on their own
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self._entries[key] = (expires_at, size, results)
+            self._bytes += size
+
+            self._evict()
+
+    def fetch(
+        self,
+        search_function: Callable[..., Any],
+        searchterm: str,
+        **kwargs,
+    ) -> List[Any]:
+        """
+        return cached results or call the search function and cache its results
+        """
+        key = self.key(search_function, searchterm, kwargs)
+
+        results = self.get(key)
+
+        if results is None:
+            results = search_function(searchterm, **kwargs)
+
+            if results is None:
+                results = []
+
+            self.set(key, results)
+
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+
+# shared instance that is used for `st_searchbox(..., cache=True)`
+default_cache = SearchCache()
+
+
+def _contains(searchterm: str, label: str) -> bool:
+    return searchterm.lower() in label.lower()
+
+
+class PrefixRefinement:
+    """
+    per-session refinement of previous search results. if a new searchterm extends
+    a previous one, e.g. "berl" -> "berli", the previous results are filtered
+    locally instead of calling the search function again.
+
+    only use this for search functions whose results are monotone under prefix
+    extension, i.e. results for "berli" are a subset of the results for "berl".
+    result lists with `truncated_at` or more entries are assumed to be cut off by
+    the search function and are never refined. the searchbox also passes the
+    `limit` of search functions like `SearchIndex`, so top-k results are never
+    refined either.
+    """
+
+    def __init__(
+        self,
+        size: int = 5,
+        truncated_at: int | None = None,
+        match: Callable[[str, str], bool] = _contains,
+    ) -> None:
+        self.size = size
+        self.truncated_at = truncated_at
+        self.match = match
+
+    def refine(
+        self,
+        history: List[tuple[str, List[Any]]],
+        searchterm: str,
+    ) -> List[Any] | None:
+        """
+        filtered results of the longest previous searchterm that the new searchterm
+        extends, None if no previous results can be used
+        """
+        base: tuple[str, List[Any]] | None = None
+
+        for term, results in history:
+            # empty searchterms often return defaults instead of all matches
+            if not term or not searchterm.startswith(term):
+                continue
+
+            if base is None or len(term) > len(base[0]):
+                base = (term, results)
+
+        if base is None:
+            return None
+
+        return [
+            v
+            for v in base[1]
+            if self.match(searchterm, str(v[0]) if isinstance(v, tuple) else str(v))
+        ]
+
+    def remember(
+        self,
+        history: List[tuple[str, List[Any]]],
+        searchterm: str,
+        results: List[Any],
+        limit: int | None = None,
+    ) -> None:
+        """
+        store results in the session history, bounded by `size`. results with
+        `truncated_at` or `limit` entries might be incomplete and are skipped
+        """
+        for truncated_at in (self.truncated_at, limit):
+            if truncated_at is not None and len(results) >= truncated_at:
+                return
+
+        history[:] = [(t, r) for t, r in history if t != searchterm]
+        history.append((searchterm, results))
+
+        if len(history) > self.size:
+            del history[: len(history) - self.size]
+
+
+# shared instance that is used for `st_searchbox(..., refine_results=True)`, the
+# history of previous results is kept per session
+default_refinement = PrefixRefinement()
@@ -0,0 +1,208 @@
+"""
+on-disk corpus of static options that is memory mapped and searched by prefix
+without loading it into python objects, usable as a ready-made search_function
+"""
+
+from __future__ import annotations
+
+import bisect
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, BinaryIO, Iterable, List
+
+from streamlit_searchbox.index import TopKSearch
+
+# magic, version, flags, number of entries and the file positions of the
+# (blob, offsets) sections for keys, labels and values
+_HEADER = struct.Struct("<8sIIQ6Q")
+_MAGIC = b"SBCORPUS"
+_VERSION = 1
+_CASE_SENSITIVE = 1
+
+# larger than any byte of utf-8 encoded text, upper bound for prefix ranges
+_MAX_BYTE = b"\xff"
+
+
+def _write_section(file: BinaryIO, values: Iterable[str]) -> tuple[int, int]:
+    """
+    write the utf-8 encoded values back to back, followed by the offset of each
+    value in the blob and the length of the blob. returns the file positions of
+    the blob and the offsets
+    """
+    blob = file.tell()
+    offsets = array("Q", [0])
+
+    for value in values:
+        offsets.append(offsets[-1] + file.write(value.encode()))
+
+    # offsets are read as native 8 byte integers, keep them aligned
+    file.write(b"\0" * (-file.tell() % offsets.itemsize))
+    position = file.tell()
+    offsets.tofile(file)
+
+    return blob, position
+
+
+def write_corpus(
+    path: str | os.PathLike,
+    options: Iterable[Any] | Iterable[tuple[str, Any]],
+    case_sensitive: bool = False,
+) -> None:
+    """
+    write options, either labels or (label, value) tuples, into a corpus file
+    that can be opened with `MappedCorpus`. values are stored as strings, e.g.
+    ids to look up the selected option. the file is replaced atomically, so
+    processes that mapped the previous version keep reading it.
+    """
+    labels: List[str] = []
+    values: List[str] | None = None
+
+    for option in options:
+        if isinstance(option, tuple):
+            values = values if values is not None else [""] * len(labels)
+            values.append(str(option[1]))
+            option = option[0]
+        elif values is not None:
+            values.append("")
+
+        labels.append(str(option))
+
+    keys = labels if case_sensitive else [label.lower() for label in labels]
+    # code point order equals the byte order of the utf-8 encoded keys
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+
+    tmp = f"{os.fspath(path)}.tmp"
+
+    with open(tmp, "wb") as file:
+        file.write(b"\0" * _HEADER.size)
+
+        key_section = _write_section(file, (keys[i] for i in order))
+        label_section = (
+            key_section
+            if case_sensitive
+            else _write_section(file, (labels[i] for i in order))
+        )
+        value_section = (
+            _write_section(file, (values[i] for i in order))
+            if values is not None
+            else (0, 0)
+        )
+
+        file.seek(0)
+        file.write(
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                _CASE_SENSITIVE if case_sensitive else 0,
+                len(keys),
+                *key_section,
+                *label_section,
+                *value_section,
+            )
+        )
+
+    os.replace(tmp, path)
+
+
+class _Column:
+    """
+    read-only sequence of the byte strings of a section
+    """
+
+    def __init__(self, data: mmap.mmap, blob: int, offsets: int, size: int) -> None:
+        self._data = data
+        self._blob = blob
+        self._offsets = memoryview(data)[offsets : offsets + 8 * (size + 1)].cast("Q")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self._blob + self._offsets[i]
+        return self._data[start : self._blob + self._offsets[i + 1]]
+
+    def release(self) -> None:
+        self._offsets.release()
+
+
+class MappedCorpus(TopKSearch):
+    """
+    prefix search over a corpus file written by `write_corpus`. the file is
+    memory mapped and binary searched in place, so opening it takes
+    milliseconds regardless of its size, entries are only decoded when they are
+    returned and the pages are shared by all processes via the page cache.
+
+    results are labels, or `(label, value)` tuples if the corpus has values,
+    with prefix matches in alphabetical order.
+
+    ```
+    # once, e.g. in a build script
+    write_corpus("products.corpus", load_product_names())
+
+    @st.cache_resource
+    def load_corpus() -> MappedCorpus:
+        return MappedCorpus("products.corpus", limit=10)
+
+    st_searchbox(load_corpus(), key="corpus")
+    ```
+    """
+
+    def __init__(self, path: str | os.PathLike, limit: int = 10) -> None:
+        self.path = path
+        self.limit = limit
+
+        with open(path, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, size, *sections = _HEADER.unpack_from(self._data)
+
+        if magic != _MAGIC or version != _VERSION:
+            self._data.close()
+            raise ValueError(f"{path} is not a corpus file of version {_VERSION}")
+
+        self.case_sensitive = bool(flags & _CASE_SENSITIVE)
+
+        self._keys = _Column(self._data, sections[0], sections[1], size)
+        self._labels = _Column(self._data, sections[2], sections[3], size)
+        self._values = (
+            _Column(self._data, sections[4], sections[5], size) if sections[5] else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _search(self, searchterm: str, limit: int) -> List[Any]:
+        """
+        top-k options whose label starts with the searchterm
+        """
+        lo, hi = self.prefix_range(searchterm)
+
+        return [self.option(i) for i in range(lo, min(hi, lo + limit))]
+
+    def prefix_range(self, prefix: str) -> tuple[int, int]:
+        """
+        positions [lo, hi) of the entries that start with prefix
+        """
+        key = (prefix if self.case_sensitive else prefix.lower()).encode()
+
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, key + _MAX_BYTE, lo)
+
+        return lo, hi
+
+    def option(self, position: int) -> Any:
+        label = self._labels[position].decode()
+
+        if self._values is None:
+            return label
+
+        return label, self._values[position].decode()
+
+    def close(self) -> None:
+        for column in (self._keys, self._labels, self._values):
+            if column is not None:
+                column.release()
+
+        self._data.close()
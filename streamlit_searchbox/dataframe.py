@@ -0,0 +1,156 @@
+"""
+search over the columns of a pandas dataframe that can be used as a ready-made
+search_function
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+from array import array
+from typing import Any, List, Sequence
+
+import pandas as pd
+
+from streamlit_searchbox.index import TopKSearch
+
+# precedes each value in the column buffers, so prefixes can be found as well
+SEPARATOR = "\x00"
+
+
+class DataFrameSearch(TopKSearch):
+    """
+    prefix and substring search over one or more columns of a dataframe. each
+    column is normalized once into a contiguous string buffer with the start
+    offset of every row, which is scanned with `str.find` instead of filtering
+    the dataframe and copying rows on each keystroke.
+
+    results are `(label, position)` tuples, or `(label, position, description)`
+    with a `description` column, where position is the row number in the
+    dataframe. rows with a column that starts with the searchterm come first,
+    rows that contain it afterwards, both in dataframe order. the selected row
+    is only looked up on submit with `row(position)`.
+
+    ```
+    @st.cache_resource
+    def load_search() -> DataFrameSearch:
+        return DataFrameSearch(load_products(), columns=["name", "brand"])
+
+    search = load_search()
+    position = st_searchbox(search, key="products")
+
+    if position is not None:
+        st.write(search.row(position))
+    ```
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        columns: str | Sequence[str],
+        label: str | None = None,
+        description: str | None = None,
+        limit: int = 10,
+        case_sensitive: bool = False,
+    ) -> None:
+        self.df = df
+        self.columns = [columns] if isinstance(columns, str) else list(columns)
+        self.label = self.columns[0] if label is None else label
+        self.description = description
+        self.limit = limit
+        self.case_sensitive = case_sensitive
+
+        self._buffers = [self._buffer(df[column]) for column in self.columns]
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _search(self, searchterm: str, limit: int) -> List[Any]:
+        """
+        top-k options, prefix matches first and substring matches afterwards
+        """
+        term = self._normalize(searchterm.replace(SEPARATOR, ""))
+
+        if not term:
+            return self._options(list(range(min(limit, len(self)))))
+
+        rows = self._find(term, limit)
+
+        if len(rows) < limit:
+            # all matches were found, no need to search for prefixes separately
+            prefix = [row for row in rows if self._startswith(row, term)]
+        else:
+            prefix = self._find(SEPARATOR + term, limit)
+
+            if len(prefix) < limit:
+                rows = self._find(term, limit + len(prefix))
+
+        matches = set(prefix)
+        rows = prefix + [row for row in rows if row not in matches]
+
+        return self._options(rows[:limit])
+
+    def row(self, position: int) -> pd.Series:
+        """
+        row of a selected option
+        """
+        return self.df.iloc[position]
+
+    def _normalize(self, label: str) -> str:
+        return label if self.case_sensitive else label.lower()
+
+    def _buffer(self, column: Any) -> tuple[str, array]:
+        """
+        normalized values joined by SEPARATOR and the offset of the separator in
+        front of each row, followed by the length of the buffer
+        """
+        values = [
+            self._normalize(value.replace(SEPARATOR, ""))
+            for value in column.fillna("").astype(str)
+        ]
+        offsets = array(
+            "q", itertools.accumulate((len(v) + 1 for v in values), initial=0)
+        )
+
+        return "".join(SEPARATOR + value for value in values), offsets
+
+    def _find(self, needle: str, limit: int) -> List[int]:
+        """
+        first `limit` rows with a column that contains the needle
+        """
+        rows: set[int] = set()
+
+        for buffer, offsets in self._buffers:
+            found = 0
+            start = 0
+
+            while found < limit:
+                pos = buffer.find(needle, start)
+
+                if pos < 0:
+                    break
+
+                row = bisect.bisect_right(offsets, pos) - 1
+                rows.add(row)
+                found += 1
+                # continue with the next row, one match per row is enough
+                start = offsets[row + 1]
+
+        return sorted(rows)[:limit]
+
+    def _startswith(self, row: int, term: str) -> bool:
+        return any(
+            buffer.startswith(term, offsets[row] + 1)
+            for buffer, offsets in self._buffers
+        )
+
+    def _options(self, rows: List[int]) -> List[Any]:
+        labels = self._values(self.label, rows)
+
+        if self.description is None:
+            return list(zip(labels, rows))
+
+        return list(zip(labels, rows, self._values(self.description, rows)))
+
+    def _values(self, column: str, rows: List[int]) -> List[str]:
+        return self.df[column].iloc[rows].fillna("").astype(str).tolist()
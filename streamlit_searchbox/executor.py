@@ -0,0 +1,438 @@
+"""
+execution of search functions outside of the streamlit script thread
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import inspect
+import threading
+import time
+from collections.abc import Sequence
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterator,
+    List,
+    TypeGuard,
+)
+
+from streamlit_searchbox.cache import _function_key, _kwargs_key
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    # superseded searches can't be detected for older streamlit versions
+    def get_script_run_ctx(*args, **kwargs) -> Any:  # type: ignore
+        return None
+
+
+# interval in seconds to check if a running search was superseded
+POLL_INTERVAL = 0.05
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+class SearchCancelled(Exception):
+    """
+    raised if a search was superseded by a newer interaction
+    """
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """
+    event loop shared by all sessions, running in a background thread
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever,
+                name="streamlit_searchbox_loop",
+                daemon=True,
+            ).start()
+
+    return _loop
+
+
+def _current_fragment_id() -> str | None:
+    """
+    id of the user fragment that is currently running, if any
+    """
+    ctx = get_script_run_ctx()
+
+    # streamlit <1.4x tracks the fragment within the script run context
+    fragment_id = getattr(ctx, "current_fragment_id", None)
+
+    if fragment_id is None and ctx is not None:
+        try:
+            from streamlit.runtime.scriptrunner_utils.script_run_context import (
+                ThreadState,  # type: ignore
+            )
+
+            fragment_id = ThreadState.get().fragment_id
+        except (ImportError, AttributeError, RuntimeError):
+            pass
+
+    return fragment_id
+
+
+def _rerun_requested() -> bool:
+    """
+    streamlit received a newer interaction or stop request that supersedes the
+    current script run, i.e. its search results are outdated. reruns of other
+    fragments, e.g. `st.fragment(run_every=...)`, wait for this run instead
+    """
+    ctx = get_script_run_ctx()
+    requests = getattr(ctx, "script_requests", None)
+
+    # NOTE: there is no public api for this, so fail safe for internal changes
+    state = getattr(getattr(requests, "_state", None), "value", None)
+
+    if state == "STOP":
+        return True
+
+    if state != "RERUN":
+        return False
+
+    rerun_data = getattr(requests, "_rerun_data", None)
+    fragment_ids = [
+        *(getattr(rerun_data, "fragment_id_queue", None) or []),
+        getattr(rerun_data, "fragment_id", None),
+    ]
+    fragment_ids = [fragment_id for fragment_id in fragment_ids if fragment_id]
+
+    # full app and `st.rerun(scope="fragment")` reruns preempt the script run,
+    # same for streamlit versions without fragments
+    if not fragment_ids or getattr(rerun_data, "is_fragment_scoped_rerun", False):
+        return True
+
+    fragment_id = _current_fragment_id()
+    return fragment_id is not None and fragment_id in fragment_ids
+
+
+def run_coroutine(
+    coro: Awaitable[Any],
+    cancelled: Callable[[], bool] | None = None,
+) -> Any:
+    """
+    run a coroutine on the shared event loop and wait for its result. the
+    coroutine is cancelled as soon as `cancelled` returns True, which defaults
+    to a newer interaction for the current session
+    """
+    if cancelled is None:
+        cancelled = _rerun_requested
+
+    future = asyncio.run_coroutine_threadsafe(
+        coro,  # type: ignore
+        _event_loop(),
+    )
+
+    while True:
+        try:
+            return future.result(timeout=POLL_INTERVAL)
+        except concurrent.futures.TimeoutError:
+            if cancelled():
+                future.cancel()
+                raise SearchCancelled()
+
+
+def is_stream_function(search_function: Callable[..., Any]) -> bool:
+    """
+    search function is a (async) generator function that yields batches of
+    options, also for partials and callable objects
+    """
+    return any(
+        inspect.isgeneratorfunction(function) or inspect.isasyncgenfunction(function)
+        for function in (search_function, getattr(search_function, "__call__", None))
+    )
+
+
+def is_stream(
+    search_results: Any,
+    search_function: Callable[..., Any],
+) -> TypeGuard[Iterator[Any] | AsyncIterator[Any]]:
+    """
+    search results are batches of options of a streaming search function. other
+    iterators that are returned, e.g. generator expressions, yield options
+    """
+    if inspect.isasyncgen(search_results):
+        return True
+
+    return inspect.isgenerator(search_results) and is_stream_function(search_function)
+
+
+async def _anext(stream: AsyncIterator[Any]) -> Any:
+    return await stream.__anext__()
+
+
+def next_batch(
+    stream: Iterator[Any] | AsyncIterator[Any],
+    cancelled: Callable[[], bool] | None = None,
+) -> List[Any] | None:
+    """
+    next batch of options from a streaming search function, None if exhausted
+    """
+    try:
+        if isinstance(stream, AsyncIterator):
+            batch = run_coroutine(_anext(stream), cancelled)
+        else:
+            batch = next(stream)
+    except (StopIteration, StopAsyncIteration):
+        return None
+
+    return [] if batch is None else list(batch)
+
+
+def close_stream(stream: Iterator[Any] | AsyncIterator[Any]) -> None:
+    """
+    stop a streaming search function whose results are outdated
+    """
+    if inspect.isasyncgen(stream):
+        asyncio.run_coroutine_threadsafe(stream.aclose(), _event_loop())
+    elif inspect.isgenerator(stream):
+        stream.close()
+
+
+def _wait_time(deadline: float | None) -> float:
+    """
+    seconds to wait before checking for cancellation again
+    """
+    if deadline is None:
+        return POLL_INTERVAL
+
+    return max(0.0, min(POLL_INTERVAL, deadline - time.monotonic()))
+
+
+def _slot_key(search_function: Callable[..., Any]) -> Hashable:
+    """
+    code identity of a search function, the same for closures and partials that
+    are re-created on every rerun, so they share their slots and don't keep the
+    captured data alive. callable objects are identified by their class
+    """
+    while hasattr(search_function, "func") and hasattr(search_function, "args"):
+        search_function = search_function.func  # type: ignore
+
+    search_function = getattr(search_function, "__func__", search_function)
+    code = getattr(search_function, "__code__", None)
+
+    if code is None:
+        return type(search_function)
+
+    return (
+        getattr(search_function, "__module__", None),
+        getattr(search_function, "__qualname__", None),
+        code.co_filename,
+        code.co_firstlineno,
+    )
+
+
+class SearchExecutor:
+    """
+    bounded thread pool to run search functions, shared across sessions.
+
+    identical concurrent calls, i.e. same search function, searchterm and kwargs,
+    are coalesced into a single call whose result is returned to all callers.
+    streams and other iterators are never shared, every caller gets its own to
+    iterate and close.
+    `max_concurrency` limits the number of parallel calls per search function,
+    further calls wait for a free slot in their script thread.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_concurrency: int | None = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+
+        self.calls = 0
+        self.coalesced = 0
+
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="streamlit_searchbox",
+        )
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, concurrent.futures.Future] = {}
+        self._slots: dict[Hashable, threading.BoundedSemaphore] = {}
+
+    def submit(
+        self,
+        search_function: Callable[..., Any],
+        searchterm: str,
+        kwargs: dict[str, Any] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+        timeout: float | None = None,
+    ) -> concurrent.futures.Future:
+        """
+        future with the search results, shared with identical in-flight calls.
+        waiting for a free slot raises `concurrent.futures.TimeoutError` after
+        `timeout` seconds
+        """
+        kwargs = kwargs or {}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        function_key = _function_key(search_function)
+        key = (function_key, searchterm, _kwargs_key(kwargs))
+        coalesce = not is_stream_function(search_function)
+
+        with self._lock:
+            future = self._inflight.get(key) if coalesce else None
+
+            if future is not None:
+                self.coalesced += 1
+                return self._joined(future, search_function, searchterm, kwargs)
+
+            slot = self._slot(search_function)
+
+        # wait for a free slot of this search function, without blocking the pool
+        if slot is not None:
+            while not slot.acquire(timeout=_wait_time(deadline)):
+                if (cancelled or _rerun_requested)():
+                    raise SearchCancelled()
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise concurrent.futures.TimeoutError()
+
+        with self._lock:
+            # an identical call might have been started while waiting
+            future = self._inflight.get(key) if coalesce else None
+
+            if future is not None:
+                self.coalesced += 1
+
+                if slot is not None:
+                    slot.release()
+
+                return self._joined(future, search_function, searchterm, kwargs)
+
+            self.calls += 1
+            future = self._pool.submit(self._call, search_function, searchterm, kwargs)
+
+            if coalesce:
+                self._inflight[key] = future
+
+        def _done(f: concurrent.futures.Future) -> None:
+            with self._lock:
+                if self._inflight.get(key) is f:
+                    del self._inflight[key]
+
+            if slot is not None:
+                slot.release()
+
+        future.add_done_callback(_done)
+
+        return future
+
+    def run(
+        self,
+        search_function: Callable[..., Any],
+        searchterm: str,
+        kwargs: dict[str, Any] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """
+        submit a search and wait for its result. waiting stops as soon as
+        `cancelled` returns True or with `concurrent.futures.TimeoutError` after
+        `timeout` seconds, the search itself keeps running for other callers
+        """
+        if cancelled is None:
+            cancelled = _rerun_requested
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        future = self.submit(search_function, searchterm, kwargs, cancelled, timeout)
+
+        while True:
+            try:
+                return future.result(timeout=_wait_time(deadline))
+            except concurrent.futures.TimeoutError:
+                if cancelled():
+                    raise SearchCancelled()
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+    def _slot(
+        self, search_function: Callable[..., Any]
+    ) -> threading.BoundedSemaphore | None:
+        if self.max_concurrency is None:
+            return None
+
+        slot_key = _slot_key(search_function)
+
+        if slot_key not in self._slots:
+            self._slots[slot_key] = threading.BoundedSemaphore(self.max_concurrency)
+
+        return self._slots[slot_key]
+
+    def _joined(
+        self,
+        future: concurrent.futures.Future,
+        search_function: Callable[..., Any],
+        searchterm: str,
+        kwargs: dict[str, Any],
+    ) -> concurrent.futures.Future:
+        """
+        future of a coalesced call. results that aren't sequences, e.g. streams
+        or cursors, can only be consumed once, so the search function is called
+        again for each caller
+        """
+        joined: concurrent.futures.Future = concurrent.futures.Future()
+
+        def _chain(f: concurrent.futures.Future) -> None:
+            try:
+                search_results = f.result()
+
+                if search_results is not None and not isinstance(
+                    search_results, Sequence
+                ):
+                    search_results = self._call(search_function, searchterm, kwargs)
+            except Exception as e:
+                joined.set_exception(e)
+            else:
+                joined.set_result(search_results)
+
+        future.add_done_callback(_chain)
+
+        return joined
+
+    @staticmethod
+    def _call(
+        search_function: Callable[..., Any],
+        searchterm: str,
+        kwargs: dict[str, Any],
+    ) -> Any:
+        search_results = search_function(searchterm, **kwargs)
+
+        # async search functions run on the shared event loop
+        if inspect.isawaitable(search_results):
+            search_results = asyncio.run_coroutine_threadsafe(
+                search_results,  # type: ignore
+                _event_loop(),
+            ).result()
+
+        return search_results
+
+
+# shared instance that is used for `st_searchbox(..., executor=True)`
+default_executor = SearchExecutor()
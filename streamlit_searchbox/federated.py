@@ -0,0 +1,268 @@
+"""
+federated search that runs several search functions in parallel and merges
+their results within a deadline
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import math
+import time
+from typing import Any, Callable, Hashable, List, Sequence
+
+from streamlit_searchbox.cache import _function_key
+from streamlit_searchbox.executor import (
+    POLL_INTERVAL,
+    SearchCancelled,
+    SearchExecutor,
+    _rerun_requested,
+    close_stream,
+    is_stream,
+)
+
+# added to the rank in reciprocal rank fusion, so the first ranks of a single
+# source don't outweigh options that are found by multiple sources
+RANK_OFFSET = 60
+
+logger = logging.getLogger(__name__)
+
+
+def _value_key(option: Any) -> Hashable:
+    """
+    options are deduplicated by their value, unhashable values by representation
+    """
+    value = option[1] if isinstance(option, tuple) else option
+
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+class SearchSource:
+    """
+    search function of a federated search with the weight of its results and
+    the seconds to wait for them. without a timeout the source is awaited until
+    the deadline of the federated search.
+    """
+
+    def __init__(
+        self,
+        search_function: Callable[..., Any],
+        weight: float = 1.0,
+        timeout: float | None = None,
+    ) -> None:
+        self.search_function = search_function
+        self.weight = weight
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return (
+            f"SearchSource({_function_key(self.search_function)!r}, "
+            f"weight={self.weight}, timeout={self.timeout})"
+        )
+
+
+class FederatedSearch:
+    """
+    search function that calls multiple sources in parallel, e.g. a local index,
+    a database and an api, and merges their results. sources are plain search
+    functions or `SearchSource` instances with a weight and timeout.
+
+    results that arrive within the `deadline` in seconds are ranked by weighted
+    reciprocal rank fusion and deduplicated by value, the option of the source
+    with the highest contribution is kept. sources that time out or raise are
+    skipped, so a slow backend can't delay the whole dropdown.
+
+    sources run in the `executor`, the shared `source_executor` if not given.
+    sources that timed out keep running there until they return and hold one of
+    the `max_concurrency` slots of their search function. sources without a
+    free slot are skipped once their timeout passed, so a slow backend only
+    delays itself and not the other sources or later searches.
+
+    ```
+    search = FederatedSearch(
+        [
+            load_index(),
+            SearchSource(search_sql, weight=2),
+            SearchSource(search_api, timeout=0.3),
+        ],
+        deadline=0.5,
+    )
+
+    st_searchbox(search, key="federated")
+    ```
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Callable[..., Any] | SearchSource],
+        deadline: float = 1.0,
+        limit: int | None = None,
+        executor: SearchExecutor | None = None,
+    ) -> None:
+        self.sources = [
+            s if isinstance(s, SearchSource) else SearchSource(s) for s in sources
+        ]
+        self.deadline = deadline
+        self.limit = limit
+        self.executor = source_executor if executor is None else executor
+
+    def __repr__(self) -> str:
+        return (
+            f"FederatedSearch({self.sources!r}, "
+            f"deadline={self.deadline}, limit={self.limit})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FederatedSearch) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def _key(self) -> Hashable:
+        # identity for cache and value store keys, stable across reruns
+        return (
+            tuple(
+                (_function_key(s.search_function), s.weight, s.timeout)
+                for s in self.sources
+            ),
+            self.deadline,
+            self.limit,
+        )
+
+    def __call__(self, searchterm: str, **kwargs) -> List[Any]:
+        return self.merge(self.gather(searchterm, kwargs))
+
+    def gather(
+        self,
+        searchterm: str,
+        kwargs: dict[str, Any] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> List[List[Any] | None]:
+        """
+        results of each source, None for sources that timed out or failed.
+        waiting stops as soon as `cancelled` returns True, which defaults to a
+        newer interaction for the current session
+        """
+        if cancelled is None:
+            cancelled = _rerun_requested
+
+        start = time.monotonic()
+        results: List[List[Any] | None] = [None] * len(self.sources)
+        pending: dict[concurrent.futures.Future, int] = {}
+        ends: List[float] = []
+
+        for source in self.sources:
+            timeout = math.inf if source.timeout is None else source.timeout
+            ends.append(start + min(timeout, self.deadline))
+
+        # sources are submitted once a slot of their search function is free,
+        # waiting for it counts towards their timeout
+        waiting = list(range(len(self.sources)))
+
+        while pending or waiting:
+            now = time.monotonic()
+
+            for i in list(waiting):
+                if now < ends[i]:
+                    try:
+                        future = self.executor.submit(
+                            self.sources[i].search_function,
+                            searchterm,
+                            kwargs,
+                            cancelled,
+                            timeout=0,
+                        )
+                    except concurrent.futures.TimeoutError:
+                        continue
+
+                    pending[future] = i
+                else:
+                    logger.debug(f"search source {self.sources[i]} had no free slot")
+
+                waiting.remove(i)
+
+            for future, i in list(pending.items()):
+                if now >= ends[i]:
+                    logger.debug(f"search source {self.sources[i]} timed out")
+                    del pending[future]
+
+            if not pending and not waiting:
+                break
+
+            timeout = min(ends[i] for i in [*pending.values(), *waiting]) - now
+            timeout = max(0.0, min(POLL_INTERVAL, timeout))
+
+            if pending:
+                done, _ = concurrent.futures.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+            else:
+                done = set()
+                time.sleep(timeout)
+
+            for future in done:
+                i = pending.pop(future)
+                results[i] = self._result(self.sources[i], future)
+
+            if (pending or waiting) and cancelled():
+                raise SearchCancelled()
+
+        return results
+
+    def merge(self, results: Sequence[List[Any] | None]) -> List[Any]:
+        """
+        options of all sources ranked by the sum of weight / (RANK_OFFSET + rank)
+        over the sources that found them, ties in order of the sources
+        """
+        scores: dict[Hashable, float] = {}
+        best: dict[Hashable, tuple[float, Any]] = {}
+
+        for source, options in zip(self.sources, results):
+            seen: set[Hashable] = set()
+
+            for rank, option in enumerate(options or [], start=1):
+                key = _value_key(option)
+
+                if key in seen:
+                    continue
+
+                seen.add(key)
+                score = source.weight / (RANK_OFFSET + rank)
+                scores[key] = scores.get(key, 0.0) + score
+
+                if key not in best or score > best[key][0]:
+                    best[key] = (score, option)
+
+        ranked = sorted(scores, key=scores.__getitem__, reverse=True)
+
+        return [best[key][1] for key in ranked[: self.limit]]
+
+    @staticmethod
+    def _result(
+        source: SearchSource, future: concurrent.futures.Future
+    ) -> List[Any] | None:
+        try:
+            results = future.result()
+        except Exception:
+            logger.warning(f"search source {source} failed", exc_info=True)
+            return None
+
+        if is_stream(results, source.search_function):
+            # batches can't be merged within the deadline
+            logger.warning(f"search source {source} is a stream and was skipped")
+            close_stream(results)
+            return None
+
+        return [] if results is None else list(results)
+
+
+# shared instance that runs the sources of federated searches, separate from the
+# default executor so timed out sources can't starve other searches. each source
+# function runs at most `max_concurrency` calls at once
+source_executor = SearchExecutor(max_workers=16, max_concurrency=4)
@@ -0,0 +1,102 @@
+import React from "react";
+import ReactDOM from "react-dom";
+import Select, { components } from "react-select";
+
+import {
+  WindowedMenuList,
+  rowOffsets,
+  visibleRange,
+  OPTION_HEIGHT,
+  DESCRIPTION_OPTION_HEIGHT,
+} from "./MenuList";
+
+const COUNTS = [100, 1000, 5000, 10000];
+
+function makeOptions(count: number) {
+  return Array.from({ length: count }, (_, i) => ({
+    label: `option ${i}`,
+    value: i,
+  }));
+}
+
+/**
+ * mount an open select menu and measure the render time
+ * @returns time in ms and number of mounted options
+ */
+function renderMenu(count: number, MenuList: any): [number, number] {
+  const container = document.createElement("div");
+  document.body.appendChild(container);
+
+  const start = performance.now();
+
+  ReactDOM.render(
+    <Select
+      options={makeOptions(count)}
+      menuIsOpen={true}
+      components={{ MenuList: MenuList }}
+    />,
+    container,
+  );
+
+  const elapsed = performance.now() - start;
+  const mounted = container.querySelectorAll("[id*='-option-']").length;
+
+  ReactDOM.unmountComponentAtNode(container);
+  container.remove();
+
+  return [elapsed, mounted];
+}
+
+function fixedOffsets(count: number, height: number = OPTION_HEIGHT) {
+  return rowOffsets(new Array(count).fill(height));
+}
+
+test("visible range with overscan", () => {
+  expect(visibleRange(fixedOffsets(1000), 0, 300)).toEqual([0, 14]);
+  expect(
+    visibleRange(fixedOffsets(1000), 100 * OPTION_HEIGHT, 300),
+  ).toEqual([95, 114]);
+  expect(visibleRange(fixedOffsets(10), 0, 300)).toEqual([0, 10]);
+});
+
+test("visible range with taller description rows", () => {
+  const offsets = fixedOffsets(1000, DESCRIPTION_OPTION_HEIGHT);
+
+  expect(visibleRange(offsets, 100 * DESCRIPTION_OPTION_HEIGHT, 300)).toEqual([
+    95, 111,
+  ]);
+
+  // plain options followed by options with a description
+  const mixed = rowOffsets([
+    ...new Array(100).fill(OPTION_HEIGHT),
+    ...new Array(100).fill(DESCRIPTION_OPTION_HEIGHT),
+  ]);
+
+  expect(mixed[200]).toEqual(
+    100 * OPTION_HEIGHT + 100 * DESCRIPTION_OPTION_HEIGHT,
+  );
+  expect(visibleRange(mixed, mixed[150], 300)[0]).toEqual(145);
+});
+
+test("windowed menu only mounts visible options", () => {
+  const [, mounted] = renderMenu(5000, WindowedMenuList);
+
+  expect(mounted).toBeLessThan(50);
+});
+
+test("benchmark render time vs option count", () => {
+  const rows = COUNTS.map((count) => {
+    const [plain, plainMounted] = renderMenu(count, components.MenuList);
+    const [windowed, windowedMounted] = renderMenu(count, WindowedMenuList);
+
+    return {
+      options: count,
+      "plain ms": plain.toFixed(1),
+      "plain mounted": plainMounted,
+      "windowed ms": windowed.toFixed(1),
+      "windowed mounted": windowedMounted,
+    };
+  });
+
+  console.table(rows);
+});
@@ -0,0 +1,225 @@
+import React, { Component, ReactElement, ReactNode } from "react";
+import { components, MenuListProps } from "react-select";
+
+// estimated height of a single option in px, react-select default padding +
+// line height. descriptions can wrap to a second line, the heights of mounted
+// options are measured and replace the estimate
+export const OPTION_HEIGHT = 36;
+export const DESCRIPTION_OPTION_HEIGHT = 56;
+
+// lists below this size are fully rendered, windowing isn't worth it there
+export const WINDOW_THRESHOLD = 100;
+
+// options mounted above and below the visible window to avoid flickering
+const OVERSCAN = 5;
+
+interface State {
+  scrollTop: number;
+}
+
+/**
+ * top offset of each option, followed by the total height of all options
+ * @param heights height of each option
+ * @returns
+ */
+export function rowOffsets(heights: number[]): number[] {
+  const offsets = new Array<number>(heights.length + 1);
+  offsets[0] = 0;
+
+  for (let i = 0; i < heights.length; i++) {
+    offsets[i + 1] = offsets[i] + heights[i];
+  }
+
+  return offsets;
+}
+
+/**
+ * index of the option at the given offset, by binary search over the offsets
+ * @param offsets
+ * @param offset
+ * @returns
+ */
+function rowAt(offsets: number[], offset: number): number {
+  let lo = 0;
+  let hi = offsets.length - 2;
+
+  while (lo < hi) {
+    const mid = (lo + hi + 1) >> 1;
+
+    if (offsets[mid] <= offset) {
+      lo = mid;
+    } else {
+      hi = mid - 1;
+    }
+  }
+
+  return lo;
+}
+
+/**
+ * visible slice of the options for the current scroll position
+ * @param offsets top offsets of the options, see rowOffsets
+ * @param scrollTop
+ * @param height height of the visible menu
+ * @returns [start, end) of the options that should be mounted
+ */
+export function visibleRange(
+  offsets: number[],
+  scrollTop: number,
+  height: number,
+): [number, number] {
+  const count = offsets.length - 1;
+  const start = Math.max(0, rowAt(offsets, scrollTop) - OVERSCAN);
+  const end = Math.min(
+    count,
+    rowAt(offsets, scrollTop + height) + 1 + OVERSCAN,
+  );
+
+  return [start, end];
+}
+
+/**
+ * menu list that only mounts the options in the visible window, the remaining
+ * space is filled with spacers so the scrollbar keeps its size and position
+ */
+export class WindowedMenuList extends Component<MenuListProps<any>, State> {
+  public state: State = {
+    scrollTop: 0,
+  };
+
+  private menu: HTMLDivElement | null = null;
+  private focused: number = -1;
+
+  // measured heights by option, options of a new search are estimated again
+  private heights = new WeakMap<object, number>();
+  private rows: any[] = [];
+  private offsets: number[] = [0];
+
+  public componentDidMount(): void {
+    this.measureRows();
+  }
+
+  public componentDidUpdate(): void {
+    this.measureRows();
+    this.scrollToFocused();
+  }
+
+  private rowHeight = (data: any): number => {
+    const measured = data ? this.heights.get(data) : undefined;
+
+    if (measured !== undefined) {
+      return measured;
+    }
+
+    return data?.description ? DESCRIPTION_OPTION_HEIGHT : OPTION_HEIGHT;
+  };
+
+  /**
+   * store the heights of the mounted options and render again if they differ
+   * from the estimate, so the spacers and scroll positions match the options
+   */
+  private measureRows = (): void => {
+    if (this.menu === null) {
+      return;
+    }
+
+    let changed = false;
+
+    this.menu.querySelectorAll<HTMLElement>("[data-row]").forEach((element) => {
+      const data = this.rows[Number(element.dataset.row)];
+      const height = element.offsetHeight;
+
+      if (data && height > 0 && this.heights.get(data) !== height) {
+        this.heights.set(data, height);
+        changed = true;
+      }
+    });
+
+    if (changed) {
+      this.forceUpdate();
+    }
+  };
+
+  /**
+   * keyboard navigation can focus options outside of the window, react-select
+   * can't scroll to them since they aren't mounted
+   */
+  private scrollToFocused = (): void => {
+    const children = React.Children.toArray(this.props.children);
+
+    if (children.length < WINDOW_THRESHOLD) {
+      return;
+    }
+
+    const focused = children.findIndex(
+      (child) => (child as ReactElement)?.props?.isFocused,
+    );
+
+    if (focused === this.focused || focused < 0 || this.menu === null) {
+      this.focused = focused;
+      return;
+    }
+
+    this.focused = focused;
+
+    const top = this.offsets[focused];
+    const bottom = this.offsets[focused + 1];
+
+    if (top < this.menu.scrollTop) {
+      this.menu.scrollTop = top;
+    } else if (bottom > this.menu.scrollTop + this.menu.clientHeight) {
+      this.menu.scrollTop = bottom - this.menu.clientHeight;
+    }
+  };
+
+  private onScroll = (event: React.UIEvent<HTMLDivElement>): void => {
+    this.setState({ scrollTop: event.currentTarget.scrollTop });
+  };
+
+  private innerRef = (element: HTMLDivElement | null): void => {
+    this.menu = element;
+    this.props.innerRef(element);
+  };
+
+  public render = (): ReactNode => {
+    const children = React.Children.toArray(this.props.children);
+
+    if (children.length < WINDOW_THRESHOLD) {
+      return <components.MenuList {...this.props} />;
+    }
+
+    this.rows = children.map((child) => (child as ReactElement)?.props?.data);
+    this.offsets = rowOffsets(this.rows.map(this.rowHeight));
+
+    const [start, end] = visibleRange(
+      this.offsets,
+      this.state.scrollTop,
+      this.props.maxHeight,
+    );
+
+    return (
+      <components.MenuList
+        {...this.props}
+        innerRef={this.innerRef}
+        innerProps={{ ...this.props.innerProps, onScroll: this.onScroll }}
+      >
+        <div style={{ height: this.offsets[start] }} />
+        {children.slice(start, end).map((child, i) => (
+          <div
+            key={(child as ReactElement).key ?? start + i}
+            data-row={start + i}
+          >
+            {child}
+          </div>
+        ))}
+        <div
+          style={{
+            height: this.offsets[children.length] - this.offsets[end],
+          }}
+        />
+      </components.MenuList>
+    );
+  };
+}
+
+export default WindowedMenuList;
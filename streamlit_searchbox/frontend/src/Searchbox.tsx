@@ -6,12 +6,28 @@ import {
 import React, { ReactNode } from "react";
 
 import SearchboxStyle from "./styling";
-import Select, { InputActionMeta, components } from "react-select";
+import Select, {
+  InputActionMeta,
+  SelectComponentsConfig,
+  components,
+} from "react-select";
 import { debounce } from "lodash";
+import { LocalIndex } from "./localSearch";
+import { WindowedMenuList } from "./MenuList";
+
+// maximum number of options shown for `mode="local"`
+const LOCAL_OPTIONS_LIMIT = 100;
 
 type Option = {
-  value: string;
+  value: string | number;
   label: string;
+  description?: string | null;
+};
+
+// options as sent by streamlit, the value of an option is its index
+type OptionColumns = {
+  labels: string[];
+  descriptions: (string | null)[] | null;
 };
 
 interface State {
@@ -20,14 +36,95 @@ interface State {
   inputValue: string;
 }
 
+// options sent by streamlit, either in full, as splice of the options with
+// version `base` or only the version if nothing changed
+type OptionsUpdate = {
+  version: number;
+  options?: OptionColumns;
+  base?: number;
+  start?: number;
+  delete?: number;
+  insert?: OptionColumns;
+};
+
+function descriptionColumn(columns: OptionColumns): (string | null)[] {
+  return columns.descriptions || columns.labels.map(() => null);
+}
+
+/**
+ * replace `deleteCount` options at `start` with the inserted options
+ */
+export function spliceColumns(
+  columns: OptionColumns,
+  start: number,
+  deleteCount: number,
+  insert: OptionColumns,
+): OptionColumns {
+  const labels = columns.labels
+    .slice(0, start)
+    .concat(insert.labels, columns.labels.slice(start + deleteCount));
+
+  if (columns.descriptions === null && insert.descriptions === null) {
+    return { labels: labels, descriptions: null };
+  }
+
+  const descriptions = descriptionColumn(columns);
+
+  return {
+    labels: labels,
+    descriptions: descriptions
+      .slice(0, start)
+      .concat(
+        descriptionColumn(insert),
+        descriptions.slice(start + deleteCount),
+      ),
+  };
+}
+
+export function columnsToOptions(columns: OptionColumns): Option[] {
+  return columns.labels.map((label, i) => ({
+    label: label,
+    value: i,
+    description: columns.descriptions ? columns.descriptions[i] : null,
+  }));
+}
+
+// search that is traced from keystroke to rendered options
+type Trace = {
+  id: number | null;
+  input: string;
+  keystroke: number;
+  sent: number | null;
+};
+
+// waterfall of a traced search in milliseconds, with the server timings
+type TraceReport = {
+  id: number;
+  input: string;
+  debounce_ms: number;
+  roundtrip_ms: number;
+  render_ms: number;
+  total_ms: number;
+  server: any;
+};
+
 interface StreamlitReturn {
-  interaction: "submit" | "search" | "reset";
+  interaction: "submit" | "search" | "reset" | "corpus" | "page" | "options";
   value: any;
+  seq?: number;
+  trace_report?: TraceReport;
 }
 const Input = (props: any) => <components.Input {...props} isHidden={false} />;
+const IndicatorSeparator = () => null;
+const NoOptionsMessageHidden = () => null;
 
-export function streamlitReturn(interaction: string, value: any): void {
+export function streamlitReturn(
+  interaction: string,
+  value: any,
+  extra: Partial<StreamlitReturn> = {},
+): void {
   Streamlit.setComponentValue({
+    ...extra,
     interaction: interaction,
     value: value,
   } as StreamlitReturn);
@@ -54,19 +151,382 @@ class Searchbox extends StreamlitComponentBase<State> {
     }
   }
 
+  // index over the option corpus for `mode="local"`
+  private localIndex: LocalIndex | null = null;
+  private corpusRequested: string | null = null;
+
+  // options of the last update from streamlit and their version
+  private remoteColumns: OptionColumns = { labels: [], descriptions: null };
+  private remoteOptions: Option[] = [];
+  private remoteVersion: number | null = null;
+  private optionsRequested: number | null = null;
+
+  public componentDidMount(): void {
+    super.componentDidMount();
+    this.syncCorpus();
+    this.syncOptions();
+  }
+
+  public componentDidUpdate(): void {
+    super.componentDidUpdate();
+    this.syncCorpus();
+    this.syncOptions();
+    this.syncTrace();
+  }
+
+  // trace of the last search and the finished waterfall, which is sent with
+  // the next interaction to avoid an additional rerun
+  private trace: Trace | null = null;
+  private traceReport: TraceReport | null = null;
+  private renderStart: number = 0;
+
+  private isTracing = (): boolean => {
+    return this.props.args.tracing === true;
+  };
+
+  private send = (
+    interaction: string,
+    value: any,
+    extra: Partial<StreamlitReturn> = {},
+  ): void => {
+    const report = this.traceReport;
+    this.traceReport = null;
+
+    streamlitReturn(
+      interaction,
+      value,
+      report === null ? extra : { ...extra, trace_report: report },
+    );
+  };
+
+  /**
+   * streamlit echoed the traced search with its server timings, the options
+   * of the search were received and rendered
+   */
+  private syncTrace = (): void => {
+    const server = this.props.args.trace;
+    const trace = this.trace;
+
+    if (!server || trace === null || trace.sent === null) {
+      return;
+    }
+
+    if (server.id !== trace.id) {
+      return;
+    }
+
+    const rendered = performance.now();
+
+    this.traceReport = {
+      id: trace.id,
+      input: trace.input,
+      debounce_ms: trace.sent - trace.keystroke,
+      roundtrip_ms: this.renderStart - trace.sent,
+      render_ms: rendered - this.renderStart,
+      total_ms: rendered - trace.keystroke,
+      server: server,
+    };
+    this.trace = null;
+  };
+
+  /**
+   * apply the options update of the current args, updates are versioned so
+   * this can be called on every render
+   */
+  private applyOptionsUpdate = (): void => {
+    const update: OptionsUpdate | null = this.props.args.options;
+
+    if (!update || update.version === this.remoteVersion) {
+      return;
+    }
+
+    if (update.options) {
+      this.remoteColumns = update.options;
+    } else if (update.insert && update.base === this.remoteVersion) {
+      this.remoteColumns = spliceColumns(
+        this.remoteColumns,
+        update.start || 0,
+        update.delete || 0,
+        update.insert,
+      );
+    } else {
+      return;
+    }
+
+    this.remoteOptions = columnsToOptions(this.remoteColumns);
+    this.remoteVersion = update.version;
+    this.lastOptionsUpdate = Date.now();
+  };
+
+  /**
+   * the update couldn't be applied, e.g. the iframe was reloaded and lost the
+   * previous options, request the full options again
+   */
+  private syncOptions = (): void => {
+    const update: OptionsUpdate | null = this.props.args.options;
+
+    // local mode doesn't apply remote options, requesting them would rerun
+    // streamlit on every render
+    if (
+      this.isLocalMode() ||
+      !update ||
+      update.version === this.remoteVersion ||
+      this.optionsRequested === update.version
+    ) {
+      return;
+    }
+
+    this.optionsRequested = update.version;
+    this.send("options", Date.now());
+  };
+
+  private isLocalMode = (): boolean => {
+    return this.props.args.mode === "local";
+  };
+
+  /**
+   * the corpus is only sent once by streamlit and afterwards referenced by its
+   * hash, request it again if this component doesn't know the hash yet
+   */
+  private syncCorpus = (): void => {
+    const corpus = this.props.args.corpus;
+
+    if (!corpus || this.localIndex?.hash === corpus.hash) {
+      return;
+    }
+
+    if (corpus.labels) {
+      this.localIndex = new LocalIndex(corpus.hash, corpus.labels);
+      this.forceUpdate();
+    } else if (this.corpusRequested !== corpus.hash) {
+      this.corpusRequested = corpus.hash;
+      this.send("corpus", Date.now());
+    }
+  };
+
+  private getOptions = (): Option[] => {
+    if (!this.isLocalMode()) {
+      this.applyOptionsUpdate();
+      return this.remoteOptions;
+    }
+
+    if (this.localIndex === null) {
+      return [];
+    }
+
+    const index = this.localIndex;
+
+    return index
+      .search(
+        this.state.inputValue,
+        this.props.args.max_options || LOCAL_OPTIONS_LIMIT,
+      )
+      .map((i) => ({ label: index.labels[i], value: i }));
+  };
+
+  // style is only rebuilt if the theme or the overrides change
+  private style: SearchboxStyle | null = null;
+  private styleSource: [any, any] | null = null;
+
   private getStyleFromTheme = (): SearchboxStyle => {
-    return new SearchboxStyle(
-      this.props.theme,
-      this.props.args.style_overrides?.searchbox || {},
+    const theme = this.props.theme;
+    const overrides = this.props.args.style_overrides?.searchbox;
+
+    if (
+      this.style === null ||
+      this.styleSource?.[0] !== theme ||
+      this.styleSource?.[1] !== overrides
+    ) {
+      this.style = new SearchboxStyle(theme, overrides || {});
+      this.styleSource = [theme, overrides];
+    }
+
+    return this.style;
+  };
+
+  /**
+   * component overrides have a stable identity across renders, otherwise
+   * react-select remounts them on every keystroke. they read the current
+   * props and state when rendered
+   */
+  private ClearIndicator = (props: any): ReactNode =>
+    this.getStyleFromTheme().clearIndicator(
+      props,
+      this.props.args.style_overrides?.clear || {},
     );
+
+  private DropdownIndicator = (): ReactNode =>
+    this.getStyleFromTheme().iconDropdown(
+      this.state.menu,
+      this.props.args.style_overrides?.dropdown || {},
+    );
+
+  private Option = (props: any): ReactNode =>
+    this.getStyleFromTheme().optionHighlighted(
+      props,
+      this.props.args.style_overrides?.searchbox?.option?.highlightColor ||
+        undefined,
+    );
+
+  private componentsKey: string | null = null;
+  private componentsConfig: SelectComponentsConfig<Option, false, any> = {};
+
+  private getComponents = (): SelectComponentsConfig<Option, false, any> => {
+    const inputTracking = this.isInputTrackingActive();
+    const optionEmptyHidden =
+      this.props.args.style_overrides?.searchbox?.optionEmpty === "hidden";
+    const key = `${inputTracking}-${optionEmptyHidden}`;
+
+    if (this.componentsKey !== key) {
+      this.componentsKey = key;
+      this.componentsConfig = {
+        ClearIndicator: this.ClearIndicator as any,
+        DropdownIndicator: this.DropdownIndicator as any,
+        IndicatorSeparator: IndicatorSeparator,
+        Input: inputTracking ? Input : components.Input,
+        MenuList: WindowedMenuList,
+        Option: this.Option as any,
+        NoOptionsMessage: optionEmptyHidden
+          ? NoOptionsMessageHidden
+          : components.NoOptionsMessage,
+      };
+    }
+
+    return this.componentsConfig;
   };
 
   private isInputTrackingActive = (): boolean => {
     return this.props.args.edit_after_submit !== "disabled";
   };
 
+  // number of loaded options when the last page was requested
+  private pageRequested: number | null = null;
+
+  // time of the last search sent to streamlit, of the last options received
+  // with the rerun after a search and a pending merged search
+  private lastSearchReturn: number = 0;
+  private lastOptionsUpdate: number = 0;
+  private pendingSearchReturn: ReturnType<typeof setTimeout> | null = null;
+
+  // increasing number of the last search, streamlit drops older searches. based
+  // on the time so numbers keep increasing if the iframe is reloaded
+  private searchSeq: number = 0;
+
+  private sendSearch = (input: string): void => {
+    this.lastSearchReturn = Date.now();
+    this.searchSeq = Math.max(this.lastSearchReturn, this.searchSeq + 1);
+
+    if (this.trace !== null && this.trace.input === input) {
+      this.trace.id = this.searchSeq;
+      this.trace.sent = performance.now();
+    }
+
+    this.send("search", input, { seq: this.searchSeq });
+  };
+
+  // cancel the delayed search and debounce, a newer input supersedes them
+  private cancelPendingSearchReturn = (): void => {
+    if (this.pendingSearchReturn !== null) {
+      clearTimeout(this.pendingSearchReturn);
+      this.pendingSearchReturn = null;
+    }
+
+    if (this.debounceTimer !== null) {
+      clearTimeout(this.debounceTimer);
+      this.debounceTimer = null;
+    }
+  };
+
+  // state of the adaptive debounce for `debounce="auto"`
+  private debounceTimer: ReturnType<typeof setTimeout> | null = null;
+  private lastKeystroke: number = 0;
+  private typingInterval: number | null = null;
+
+  private isDebounceAuto = (): boolean => {
+    return this.props.args.debounce === "auto";
+  };
+
+  /**
+   * wait at least the smoothed search latency reported by streamlit, so a slow
+   * search function isn't flooded, and a bit longer than the time between
+   * keystrokes, so fast typing is merged into a single search
+   */
+  private adaptiveDebounce = (): number => {
+    const [min, max] = this.props.args.debounce_bounds || [50, 1000];
+    const latency = this.props.args.latency || 0;
+    const typing = this.typingInterval === null ? 0 : 1.5 * this.typingInterval;
+
+    return Math.min(max, Math.max(min, latency, typing));
+  };
+
+  private callbackSearchAuto = (input: string): void => {
+    const now = Date.now();
+    const interval = now - this.lastKeystroke;
+    const max = (this.props.args.debounce_bounds || [50, 1000])[1];
+
+    this.lastKeystroke = now;
+
+    // longer pauses aren't part of the typing speed
+    if (interval < max) {
+      this.typingInterval =
+        this.typingInterval === null
+          ? interval
+          : 0.7 * this.typingInterval + 0.3 * interval;
+    }
+
+    if (this.debounceTimer !== null) {
+      clearTimeout(this.debounceTimer);
+    }
+
+    this.debounceTimer = setTimeout(() => {
+      this.debounceTimer = null;
+      this.callbackSearchReturn(input);
+    }, this.adaptiveDebounce());
+  };
+
   private callbackSearchReturn = (input: string): void => {
-    streamlitReturn("search", input);
+    this.cancelPendingSearchReturn();
+    this.throttleSearch(input);
+  };
+
+  /**
+   * send the search to streamlit, searches within `min_execution_time` of the
+   * previous one are merged into a single delayed search. this avoids fast
+   * consecutive reruns without blocking streamlit threads. the search is sent
+   * once `min_execution_time` passed since the previous search and since its
+   * options arrived, so the rerun after a search result is spaced from the
+   * next one as well. the wait is checked again when the timer fires, since
+   * options can arrive in the meantime
+   * @param input
+   */
+  private throttleSearch = (input: string): void => {
+    const wait =
+      Math.max(this.lastSearchReturn, this.lastOptionsUpdate) +
+      (this.props.args.min_execution_time || 0) -
+      Date.now();
+
+    if (wait > 0) {
+      this.pendingSearchReturn = setTimeout(() => {
+        this.pendingSearchReturn = null;
+        this.throttleSearch(input);
+      }, wait);
+      return;
+    }
+
+    this.sendSearch(input);
+  };
+
+  /**
+   * scrolled to the end of the options, request the next page of options
+   * @param loaded number of options that are currently shown
+   */
+  private callbackPage = (loaded: number): void => {
+    if (!this.props.args.has_more || this.pageRequested === loaded) {
+      return;
+    }
+
+    this.pageRequested = loaded;
+    this.send("page", loaded);
   };
 
   /**
@@ -81,7 +541,28 @@ class Searchbox extends StreamlitComponentBase<State> {
       option: null,
     });
 
-    this.callbackSearchReturn(input);
+    // new options, pages can be requested again
+    this.pageRequested = null;
+
+    // options are filtered in the browser, only submit is sent to streamlit
+    if (this.isLocalMode()) {
+      return;
+    }
+
+    if (this.isTracing()) {
+      this.trace = {
+        id: null,
+        input: input,
+        keystroke: performance.now(),
+        sent: null,
+      };
+    }
+
+    if (this.isDebounceAuto()) {
+      this.callbackSearchAuto(input);
+    } else {
+      this.callbackSearchReturn(input);
+    }
   };
 
   /**
@@ -94,7 +575,8 @@ class Searchbox extends StreamlitComponentBase<State> {
       inputValue: "",
     });
 
-    streamlitReturn("reset", null);
+    this.cancelPendingSearchReturn();
+    this.send("reset", null);
   }
 
   /**
@@ -132,7 +614,8 @@ class Searchbox extends StreamlitComponentBase<State> {
       });
     }
 
-    streamlitReturn("submit", option.value);
+    this.cancelPendingSearchReturn();
+    this.send("submit", option.value);
   }
 
   /**
@@ -140,11 +623,15 @@ class Searchbox extends StreamlitComponentBase<State> {
    * @returns
    */
   public render = (): ReactNode => {
+    this.renderStart = performance.now();
+
     const style = this.getStyleFromTheme();
 
     // option when the clear button is shown
     const clearable = this.props.args.style_overrides?.clear?.clearable;
 
+    const options = this.getOptions();
+
     return (
       <div style={this.props.args.style_overrides?.wrapper || {}}>
         {this.props.args.label && (
@@ -184,34 +671,10 @@ class Searchbox extends StreamlitComponentBase<State> {
           isClearable={clearable !== "never"}
           isSearchable={true}
           styles={style.select}
-          options={this.props.args.options}
+          options={options}
           placeholder={this.props.args.placeholder}
           // component overrides
-          components={{
-            ClearIndicator: (props) =>
-              style.clearIndicator(
-                props,
-                this.props.args.style_overrides?.clear || {},
-              ),
-            DropdownIndicator: () =>
-              style.iconDropdown(
-                this.state.menu,
-                this.props.args.style_overrides?.dropdown || {},
-              ),
-            IndicatorSeparator: () => null,
-            Input: this.isInputTrackingActive() ? Input : components.Input,
-            Option: (props) =>
-              style.optionHighlighted(
-                props,
-                this.props.args.style_overrides?.searchbox?.option
-                  ?.highlightColor || undefined,
-              ),
-            NoOptionsMessage:
-              this.props.args.style_overrides?.searchbox?.optionEmpty ===
-              "hidden"
-                ? () => null
-                : components.NoOptionsMessage,
-          }}
+          components={this.getComponents()}
           // handlers
           filterOption={(_, __) => true}
           // eslint-disable-next-line @typescript-eslint/no-explicit-any
@@ -237,9 +700,10 @@ class Searchbox extends StreamlitComponentBase<State> {
                 return;
             }
           }}
+          onMenuScrollToBottom={() => this.callbackPage(options.length)}
           onMenuOpen={() => this.setState({ menu: true })}
           onMenuClose={() => this.setState({ menu: false })}
-          menuIsOpen={this.props.args.options && this.state.menu}
+          menuIsOpen={options && this.state.menu}
         />
       </div>
     );
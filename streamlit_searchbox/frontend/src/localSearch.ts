@@ -0,0 +1,68 @@
+/**
+ * in-browser index over a static option corpus, used for `mode="local"`
+ * to filter options without a roundtrip to streamlit
+ */
+export class LocalIndex {
+  public readonly hash: string;
+  public readonly labels: string[];
+
+  private readonly lowered: string[];
+
+  // matches of the last query, reused if the next query extends it
+  private lastQuery: string | null = null;
+  private lastMatches: number[] = [];
+
+  constructor(hash: string, labels: string[]) {
+    this.hash = hash;
+    this.labels = labels;
+    this.lowered = labels.map((label) => label.toLowerCase());
+  }
+
+  /**
+   * indices of the matching labels, prefix matches are ranked first
+   * @param query
+   * @param limit
+   * @returns
+   */
+  public search(query: string, limit: number): number[] {
+    const q = query.toLowerCase();
+
+    if (q === "") {
+      return this.labels.slice(0, limit).map((_, i) => i);
+    }
+
+    // results are monotone under extension of the query, so only previous
+    // matches have to be scanned again, e.g. "berl" -> "berli"
+    const extendsLast = this.lastQuery !== null && q.startsWith(this.lastQuery);
+
+    const matches: number[] = [];
+
+    if (extendsLast) {
+      for (const i of this.lastMatches) {
+        if (this.lowered[i].includes(q)) matches.push(i);
+      }
+    } else {
+      for (let i = 0; i < this.lowered.length; i++) {
+        if (this.lowered[i].includes(q)) matches.push(i);
+      }
+    }
+
+    this.lastQuery = q;
+    this.lastMatches = matches;
+
+    const prefix: number[] = [];
+    const other: number[] = [];
+
+    for (const i of matches) {
+      if (prefix.length >= limit) break;
+
+      if (this.lowered[i].startsWith(q)) {
+        prefix.push(i);
+      } else if (other.length < limit) {
+        other.push(i);
+      }
+    }
+
+    return prefix.concat(other).slice(0, limit);
+  }
+}
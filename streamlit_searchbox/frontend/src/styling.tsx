@@ -279,9 +279,38 @@ class SearchboxStyle {
     );
   }
 
+  /**
+   * secondary text shown next to the option label, long descriptions wrap and
+   * make the option taller
+   * @param description
+   * @returns
+   */
+  optionDescription(description: string) {
+    return (
+      <span
+        style={{
+          color: this.theme.fadedText60,
+          fontSize: "0.85em",
+          marginLeft: "0.5em",
+        }}
+      >
+        {description}
+      </span>
+    );
+  }
+
   optionHighlighted = (props: any, highlightColor: string | undefined) => {
+    const description = props.data?.description;
+
     if (!highlightColor || highlightColor === "") {
-      return <components.Option {...props} />;
+      return description ? (
+        <components.Option {...props}>
+          {props.children}
+          {this.optionDescription(description)}
+        </components.Option>
+      ) : (
+        <components.Option {...props} />
+      );
     }
 
     const { children, selectProps } = props;
@@ -304,6 +333,7 @@ class SearchboxStyle {
             part // no match
           ),
         )}
+        {description && this.optionDescription(description)}
       </components.Option>
     );
   };
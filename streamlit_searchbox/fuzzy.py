@@ -0,0 +1,404 @@
+"""
+typo tolerant search index that can be used as a ready-made search_function
+"""
+
+from __future__ import annotations
+
+import bisect
+import zlib
+from array import array
+from typing import Any, Iterator, List
+
+import numpy as np
+
+from streamlit_searchbox.index import _MAX_CHAR, TopKSearch
+
+# searchterm characters per allowed typo, e.g. one typo from 4 characters on
+CHARS_PER_TYPO = 4
+
+
+def _deletes(word: str, distance: int) -> set[str]:
+    """
+    all strings created by removing up to `distance` characters from `word`
+    """
+    result = {word}
+    level = {word}
+
+    for _ in range(distance):
+        level = {w[:i] + w[i + 1 :] for w in level for i in range(len(w))}
+        result |= level
+
+    return result
+
+
+def _hash(value: str) -> int:
+    return zlib.crc32(value.encode())
+
+
+def _by_common_prefix(
+    term: str, prefixes: List[str], length: int
+) -> Iterator[tuple[int, int, int]]:
+    """
+    ranges of the sorted `prefixes` in decreasing order of their common prefix
+    length with `term`, which is yielded along with each range
+    """
+    lo = hi = bisect.bisect_left(prefixes, term[:length])
+
+    for n in range(min(len(term), length), -1, -1):
+        start = bisect.bisect_left(prefixes, term[:n], 0, lo)
+        end = bisect.bisect_left(prefixes, term[:n] + _MAX_CHAR, hi)
+
+        yield n, start, lo
+        yield n, hi, end
+
+        lo, hi = start, end
+
+
+def _next_row(
+    row: List[int],
+    before: List[int],
+    term: str,
+    char: str,
+    last: str,
+    depth: int,
+    distance: int,
+) -> List[int]:
+    """
+    edit distances (with transpositions) of the label prefix extended by `char`
+    to all prefixes of `term`, given the rows of the prefix and its parent.
+    distances above `distance` are capped, so only a band of the row is computed
+    """
+    cap = distance + 1
+    new = [cap] * (len(term) + 1)
+    new[0] = min(depth + 1, cap)
+
+    # called for every visited node, so min() is avoided in favor of comparisons
+    for i in range(max(1, depth + 1 - distance), min(len(term), depth + cap) + 1):
+        value = row[i - 1] + (term[i - 1] != char)
+        other = (row[i] if row[i] < new[i - 1] else new[i - 1]) + 1
+
+        if other < value:
+            value = other
+
+        if i > 1 and term[i - 1] == last and term[i - 2] == char:
+            if before[i - 2] + 1 < value:
+                value = before[i - 2] + 1
+
+        new[i] = value if value < cap else cap
+
+    return new
+
+
+class _DeleteIndex:
+    """
+    symmetric delete index over the distinct label prefixes of `length`: labels
+    within `distance` edits of a searchterm have a prefix that shares a string
+    with the searchterm prefix after removing up to `distance` characters from
+    both, see symspell. deleted strings are stored as crc32 hashes together with
+    the prefix id in a sorted array, collisions only add candidates.
+    """
+
+    def __init__(self, sorted_labels: List[str], length: int, distance: int) -> None:
+        self.length = length
+        self.distance = distance
+
+        # distinct prefixes (or shorter labels) with their range in the labels
+        self.prefixes: list[str] = []
+        self.ranges = array("I")
+
+        for pos, label in enumerate(sorted_labels):
+            prefix = label[:length]
+
+            if not self.prefixes or self.prefixes[-1] != prefix:
+                self.prefixes.append(prefix)
+                self.ranges.append(pos)
+
+        self.ranges.append(len(sorted_labels))
+
+        self.postings = np.fromiter(
+            (
+                (_hash(deleted) << 32) | i
+                for i, prefix in enumerate(self.prefixes)
+                for deleted in _deletes(prefix, distance)
+            ),
+            dtype=np.uint64,
+        )
+        self.postings.sort()
+
+    def candidates(self, term: str) -> List[int]:
+        """
+        ids of the prefixes that may be within the distance, in sorted order
+        """
+        hashes = np.array(
+            [
+                _hash(deleted)
+                for deleted in _deletes(term[: self.length], self.distance)
+            ],
+            dtype=np.uint64,
+        )
+        starts = np.searchsorted(self.postings, hashes << np.uint64(32))
+        ends = np.searchsorted(self.postings, (hashes + np.uint64(1)) << np.uint64(32))
+
+        postings = [self.postings[lo:hi] for lo, hi in zip(starts, ends) if hi > lo]
+
+        if not postings:
+            return []
+
+        ids = np.concatenate(postings) & np.uint64(0xFFFFFFFF)
+        return np.unique(ids).tolist()
+
+
+class FuzzyIndex(TopKSearch):
+    """
+    typo tolerant prefix search over a static list of options, either labels or
+    (label, value) tuples like they are returned by a search_function.
+
+    an option matches if the searchterm is within `max_distance` edits
+    (insertions, deletions, substitutions, transpositions) of a prefix of its
+    label, one typo is allowed per 4 characters of the searchterm. results are
+    ranked by edit distance, then by the length of the exact common prefix with
+    the searchterm and then alphabetically.
+
+    label prefixes that can be within the distance are looked up in a symmetric
+    delete index, from there the sorted labels are searched as an implicit trie
+    that only follows branches within the distance. `prefix_length` caps the
+    length of the indexed prefixes, longer prefixes find fewer candidates but
+    increase the size of the index. the index is immutable after creation and
+    can be shared across sessions, e.g. with `st.cache_resource`.
+
+    ```
+    @st.cache_resource
+    def load_index() -> FuzzyIndex:
+        return FuzzyIndex(load_product_names(), limit=10)
+
+    st_searchbox(load_index(), key="fuzzy")
+    ```
+    """
+
+    def __init__(
+        self,
+        options: List[Any] | List[tuple[str, Any]],
+        limit: int = 10,
+        max_distance: int = 2,
+        prefix_length: int = 7,
+        case_sensitive: bool = False,
+    ) -> None:
+        self.options = list(options)
+        self.limit = limit
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.case_sensitive = case_sensitive
+
+        labels = [
+            self._normalize(str(v[0]) if isinstance(v, tuple) else str(v))
+            for v in self.options
+        ]
+
+        order = sorted(range(len(labels)), key=labels.__getitem__)
+        self._sorted_labels = [labels[i] for i in order]
+        self._sorted_ids = array("I", order)
+
+        # one delete index per distance, each searchterm with `distance` typos
+        # allowed has at least CHARS_PER_TYPO * distance characters
+        self._indexes = [
+            _DeleteIndex(
+                self._sorted_labels,
+                min(prefix_length, CHARS_PER_TYPO * distance),
+                distance,
+            )
+            for distance in range(1, max_distance + 1)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def _search(self, searchterm: str, limit: int) -> List[Any]:
+        """
+        top-k options ranked by edit distance and exact prefix length
+        """
+        term = self._normalize(searchterm)
+
+        if not term:
+            return self.options[:limit]
+
+        # (distance, -exact prefix length, start, end) in the sorted labels
+        matches: list[tuple[int, int, int, int]] = []
+        found = 0
+
+        # closer matches rank first, so more typos are only searched for if the
+        # fewer typos don't fill the limit
+        for distance in range(min(self.max_distance, len(term) // CHARS_PER_TYPO) + 1):
+            for match in self._matches(term, distance, limit - found):
+                matches.append(match)
+                found += match[3] - match[2]
+
+            if found >= limit:
+                break
+
+        matches.sort()
+        ids: list[int] = []
+
+        for _, _, lo, hi in matches:
+            ids.extend(self._sorted_ids[lo : min(hi, lo + limit - len(ids))])
+
+            if len(ids) >= limit:
+                break
+
+        return [self.options[i] for i in ids]
+
+    def _normalize(self, label: str) -> str:
+        return label if self.case_sensitive else label.lower()
+
+    def _matches(
+        self, term: str, distance: int, needed: int
+    ) -> list[tuple[int, int, int, int]]:
+        """
+        labels with exactly `distance` typos, stops once `needed` labels are found
+        that rank above all remaining ones
+        """
+        matches: list[tuple[int, int, int, int]] = []
+
+        if distance == 0:
+            lo = bisect.bisect_left(self._sorted_labels, term)
+            hi = bisect.bisect_left(self._sorted_labels, term + _MAX_CHAR, lo)
+
+            if hi > lo:
+                matches.append((0, -len(term), lo, hi))
+
+            return matches
+
+        index = self._indexes[distance - 1]
+        ids = index.candidates(term)
+        prefixes = [index.prefixes[i] for i in ids]
+        root = [min(i, distance + 1) for i in range(len(term) + 1)]
+
+        # rows and lowest distance per depth of the previous candidate, which are
+        # reused for the common prefix since candidates are visited in order
+        rows = [root]
+        bests = [root[-1]]
+        previous = ""
+
+        for exact, start, end in _by_common_prefix(term, prefixes, index.length):
+            # remaining candidates share at most `exact` characters with the
+            # searchterm, so they can't outrank matches with a longer exact prefix
+            if (
+                sum(hi - lo for d, e, lo, hi in matches if d == distance and -e > exact)
+                >= needed
+            ):
+                break
+
+            for pos in range(start, end):
+                prefix = prefixes[pos]
+                common = self._exact(prefix, previous, len(prefix))
+                del rows[common + 1 :], bests[common + 1 :]
+                previous = prefix
+
+                while len(rows) <= len(prefix) and min(rows[-1]) <= distance:
+                    depth = len(rows) - 1
+                    last = prefix[depth - 1] if depth else ""
+                    before = rows[-2] if depth else root
+                    row = _next_row(
+                        rows[-1], before, term, prefix[depth], last, depth, distance
+                    )
+                    rows.append(row)
+                    bests.append(min(bests[-1], row[-1]))
+
+                depth = len(rows) - 1
+                before = rows[-2] if depth else root
+                lo, hi = index.ranges[ids[pos]], index.ranges[ids[pos] + 1]
+                self._walk(
+                    term, distance, depth, lo, hi, rows[-1], before, bests[-1], matches
+                )
+
+        # matches with fewer typos were already found for the lower distance
+        return [match for match in matches if match[0] == distance]
+
+    def _walk(
+        self,
+        term: str,
+        distance: int,
+        depth: int,
+        lo: int,
+        hi: int,
+        row: List[int],
+        before: List[int],
+        best: int,
+        matches: list[tuple[int, int, int, int]],
+    ) -> None:
+        """
+        collect labels[lo:hi] that share a prefix of length `depth`, `row` holds
+        the distances of that prefix to the prefixes of the searchterm and `best`
+        the lowest distance of the searchterm to any prefix up to here
+        """
+        labels = self._sorted_labels
+        best = min(best, row[-1])
+        lowest = min(row)
+
+        if best <= distance and lowest >= best:
+            # no longer label prefix can be closer to the searchterm
+            matches.append((best, -self._exact(term, labels[lo], depth), lo, hi))
+            return
+
+        if lowest > distance:
+            return
+
+        end = lo
+
+        while end < hi and len(labels[end]) == depth:
+            end += 1
+
+        if best <= distance and end > lo:
+            matches.append((best, -self._exact(term, labels[lo], depth), lo, end))
+
+        lo = end
+
+        if lo == hi:
+            return
+
+        node = labels[lo][:depth]
+        last = node[-1] if depth else ""
+
+        if lowest < distance:
+            # any next character stays within the distance, visit all children
+            while lo < hi:
+                char = labels[lo][depth]
+                end = bisect.bisect_left(labels, node + char + _MAX_CHAR, lo, hi)
+
+                child = _next_row(row, before, term, char, last, depth, distance)
+                self._walk(
+                    term, distance, depth + 1, lo, end, child, row, best, matches
+                )
+
+                lo = end
+
+            return
+
+        # without typos left, only characters of the searchterm around the
+        # current position can continue a match, jump to those children directly
+        window = term[max(0, depth - distance - 1) : depth + distance + 1]
+
+        for char in sorted(set(window)):
+            lo = bisect.bisect_left(labels, node + char, lo, hi)
+            end = bisect.bisect_left(labels, node + char + _MAX_CHAR, lo, hi)
+
+            if end > lo:
+                child = _next_row(row, before, term, char, last, depth, distance)
+                self._walk(
+                    term, distance, depth + 1, lo, end, child, row, best, matches
+                )
+
+            lo = end
+
+    @staticmethod
+    def _exact(term: str, label: str, depth: int) -> int:
+        """
+        length of the common prefix of `term` and label[:depth]
+        """
+        n = 0
+
+        for a, b in zip(term, label[:depth]):
+            if a != b:
+                break
+            n += 1
+
+        return n
@@ -0,0 +1,156 @@
+"""
+in-process search index that can be used as a ready-made search_function
+"""
+
+from __future__ import annotations
+
+import abc
+import bisect
+from array import array
+from typing import Any, Iterator, List
+
+# largest code point, used as upper bound for prefix ranges in the sorted labels
+_MAX_CHAR = "\U0010ffff"
+
+
+def _trigrams(label: str) -> set[str]:
+    return {label[i : i + 3] for i in range(len(label) - 2)}
+
+
+class TopKSearch(abc.ABC):
+    """
+    base of the ready-made search functions, which return the top `limit`
+    options for a searchterm. `limit` can be set per searchbox by passing it as
+    kwarg to `st_searchbox`, subclasses implement `_search`
+    """
+
+    limit: int
+
+    def __call__(self, searchterm: str, **kwargs) -> List[Any]:
+        return self.search(searchterm, limit=kwargs.get("limit"))
+
+    def search(self, searchterm: str, limit: int | None = None) -> List[Any]:
+        """
+        top-k options for the searchterm, `limit` defaults to the one of the
+        search function
+        """
+        return self._search(searchterm, self.limit if limit is None else limit)
+
+    @abc.abstractmethod
+    def _search(self, searchterm: str, limit: int) -> List[Any]:
+        """
+        top `limit` options for the searchterm
+        """
+
+
+class SearchIndex(TopKSearch):
+    """
+    index over a static list of options, either labels or (label, value) tuples
+    like they are returned by a search_function.
+
+    prefix matches are found via binary search on the sorted labels, substring
+    matches via a trigram inverted index. the index is immutable after creation
+    and can be shared across sessions, e.g. with `st.cache_resource`.
+
+    ```
+    @st.cache_resource
+    def load_index() -> SearchIndex:
+        return SearchIndex(load_labels(), limit=10)
+
+    st_searchbox(load_index(), key="indexed")
+    ```
+    """
+
+    def __init__(
+        self,
+        options: List[Any] | List[tuple[str, Any]],
+        limit: int = 10,
+        case_sensitive: bool = False,
+    ) -> None:
+        self.options = list(options)
+        self.limit = limit
+        self.case_sensitive = case_sensitive
+
+        self._labels = [
+            self._normalize(str(v[0]) if isinstance(v, tuple) else str(v))
+            for v in self.options
+        ]
+
+        # prefix index: labels in sorted order with their option position
+        order = sorted(range(len(self._labels)), key=self._labels.__getitem__)
+        self._sorted_labels = [self._labels[i] for i in order]
+        self._sorted_ids = array("I", order)
+
+        # substring index: trigram -> ascending option positions
+        postings: dict[str, list[int]] = {}
+
+        for i, label in enumerate(self._labels):
+            for gram in _trigrams(label):
+                postings.setdefault(gram, []).append(i)
+
+        self._trigrams = {gram: array("I", ids) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def _search(self, searchterm: str, limit: int) -> List[Any]:
+        """
+        top-k options, prefix matches in alphabetical order first and substring
+        matches in their original order afterwards
+        """
+        term = self._normalize(searchterm)
+
+        if not term:
+            return self.options[:limit]
+
+        ids: list[int] = []
+        seen: set[int] = set()
+
+        for i in self._prefix_ids(term):
+            if len(ids) >= limit:
+                break
+            ids.append(i)
+            seen.add(i)
+
+        if len(ids) < limit:
+            for i in self._substring_ids(term):
+                if len(ids) >= limit:
+                    break
+                if i not in seen:
+                    ids.append(i)
+
+        return [self.options[i] for i in ids]
+
+    def _normalize(self, label: str) -> str:
+        return label if self.case_sensitive else label.lower()
+
+    def _prefix_ids(self, term: str) -> Iterator[int]:
+        lo = bisect.bisect_left(self._sorted_labels, term)
+        hi = bisect.bisect_left(self._sorted_labels, term + _MAX_CHAR, lo)
+
+        for pos in range(lo, hi):
+            yield self._sorted_ids[pos]
+
+    def _substring_ids(self, term: str) -> Iterator[int]:
+        # short terms have no trigrams, scan the labels instead
+        if len(term) < 3:
+            for i, label in enumerate(self._labels):
+                if term in label:
+                    yield i
+            return
+
+        candidates: array | None = None
+
+        for gram in _trigrams(term):
+            ids = self._trigrams.get(gram)
+
+            if ids is None:
+                return
+
+            if candidates is None or len(ids) < len(candidates):
+                candidates = ids
+
+        # all trigrams matching doesn't imply a substring match, verify each
+        for i in candidates or ():
+            if term in self._labels[i]:
+                yield i
@@ -0,0 +1,248 @@
+"""
+instrumentation of searchboxes, shared across sessions and aggregated per key
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, Sequence
+
+# upper bounds of the histogram buckets, the last bucket is unbounded
+TIME_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+COUNT_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+HISTOGRAMS: Dict[str, tuple[Sequence[float], str]] = {
+    "search_ms": (TIME_BUCKETS, "time spent in the search function"),
+    "convert_ms": (TIME_BUCKETS, "time spent converting results to options"),
+    "serialize_ms": (TIME_BUCKETS, "time spent serializing options for react"),
+    "results": (COUNT_BUCKETS, "number of results per search"),
+    "payload_bytes": (BYTES_BUCKETS, "size of the options sent to react"),
+    "rerun_ms": (TIME_BUCKETS, "time from the rerun after a search to rendering"),
+}
+
+COUNTERS: Dict[str, str] = {
+    "searches": "searches that called the search function or cache",
+    "cache_hits": "searches answered by the cache",
+    "cache_misses": "searches not found in the cache",
+    "refined": "searches answered by refining previous results",
+    "cancelled": "searches cancelled by a newer interaction",
+    "errors": "searches that raised an exception",
+    "dropped": "outdated or superseded search requests that were skipped",
+    "reruns": "reruns triggered after a search",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """
+    histogram with fixed bucket bounds, compatible with prometheus histograms
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        upper bound of the bucket that contains the quantile `q`
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        total = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+
+        return float("inf")
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        total = 0
+        result = []
+
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+
+class SearchboxMetrics:
+    """
+    thread-safe histograms and counters per searchbox key, shared across all
+    sessions. `on_search_start(key, searchterm)` and
+    `on_search_end(key, searchterm, measurements)` are called around each search,
+    e.g. to forward the measurements to an existing monitoring system. the
+    measurements contain its `status`, i.e. "ok", "cancelled" or "error".
+
+    ```
+    metrics = SearchboxMetrics()
+    st_searchbox(search, key="search", metrics=metrics)
+
+    metrics.log()
+    print(metrics.prometheus())
+    ```
+    """
+
+    def __init__(
+        self,
+        on_search_start: Callable[[str, str], None] | None = None,
+        on_search_end: Callable[[str, str, dict[str, Any]], None] | None = None,
+    ) -> None:
+        self.on_search_start = on_search_start
+        self.on_search_end = on_search_end
+
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[str, Histogram]] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def observe(self, key: str, name: str, value: float) -> None:
+        buckets, _ = HISTOGRAMS[name]
+
+        with self._lock:
+            histograms = self._histograms.setdefault(key, {})
+
+            if name not in histograms:
+                histograms[name] = Histogram(buckets)
+
+            histograms[name].observe(value)
+
+    def count(self, key: str, name: str, n: int = 1) -> None:
+        assert name in COUNTERS, f"unknown counter {name}"
+
+        with self._lock:
+            counters = self._counters.setdefault(key, {})
+            counters[name] = counters.get(name, 0) + n
+
+    def search_start(self, key: str, searchterm: str) -> None:
+        if self.on_search_start is not None:
+            self.on_search_start(key, searchterm)
+
+    def search_end(self, key: str, searchterm: str, measurements: dict) -> None:
+        for name, value in measurements.items():
+            if name in HISTOGRAMS:
+                self.observe(key, name, value)
+
+        if self.on_search_end is not None:
+            self.on_search_end(key, searchterm, measurements)
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return sorted(set(self._histograms) | set(self._counters))
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """
+        counters, count / sum / p50 / p95 of the histograms per key
+        """
+        snapshot: dict[str, dict[str, Any]] = {}
+
+        with self._lock:
+            for key, counters in self._counters.items():
+                snapshot.setdefault(key, {}).update(counters)
+
+            for key, histograms in self._histograms.items():
+                for name, histogram in histograms.items():
+                    snapshot.setdefault(key, {})[name] = {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95),
+                    }
+
+        return snapshot
+
+    def log(self, level: int = logging.INFO) -> None:
+        """
+        log a summary line per key
+        """
+        for key, values in sorted(self.snapshot().items()):
+            parts = []
+
+            for name, value in values.items():
+                if isinstance(value, dict):
+                    parts.append(
+                        f"{name}[n={value['count']} p50<={value['p50']:g} "
+                        f"p95<={value['p95']:g}]"
+                    )
+                else:
+                    parts.append(f"{name}={value}")
+
+            logger.log(level, f"key={key} " + " ".join(parts))
+
+    def prometheus(self, prefix: str = "streamlit_searchbox") -> str:
+        """
+        metrics in the prometheus text exposition format
+        """
+        lines: list[str] = []
+
+        with self._lock:
+            for name, (_, description) in HISTOGRAMS.items():
+                metric = f"{prefix}_{name}"
+                samples = [
+                    (key, histograms[name])
+                    for key, histograms in sorted(self._histograms.items())
+                    if name in histograms
+                ]
+
+                if not samples:
+                    continue
+
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} histogram")
+
+                for key, histogram in samples:
+                    label = _label(key)
+
+                    for bound, total in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f'{metric}_bucket{{{label},le="{le}"}} {total}')
+
+                    lines.append(f"{metric}_sum{{{label}}} {histogram.sum:g}")
+                    lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+
+            for name, description in COUNTERS.items():
+                metric = f"{prefix}_{name}_total"
+                samples = [
+                    (key, counters[name])
+                    for key, counters in sorted(self._counters.items())
+                    if name in counters
+                ]
+
+                if not samples:
+                    continue
+
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} counter")
+
+                for key, value in samples:
+                    lines.append(f"{metric}{{{_label(key)}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _label(key: str) -> str:
+    escaped = key.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'key="{escaped}"'
+
+
+# shared instance that is used for `st_searchbox(..., metrics=True)`
+default_metrics = SearchboxMetrics()
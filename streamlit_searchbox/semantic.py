@@ -0,0 +1,298 @@
+"""
+semantic search over embeddings of a user supplied model with a local approximate
+nearest neighbor index that can be used as a ready-made search_function
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from typing import Any, Callable, List
+
+import numpy as np
+
+from streamlit_searchbox.index import TopKSearch
+
+# maps a batch of texts to an array-like of shape (len(texts), dimension)
+Embed = Callable[[List[str]], Any]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    unit length rows, so the dot product equals the cosine similarity
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int) -> np.ndarray:
+    """
+    position of the most similar centroid for each vector
+    """
+    labels = np.empty(len(vectors), dtype=np.int64)
+
+    for start in range(0, len(vectors), batch_size):
+        batch = vectors[start : start + batch_size]
+        labels[start : start + batch_size] = np.argmax(batch @ centroids.T, axis=1)
+
+    return labels
+
+
+def _kmeans(
+    vectors: np.ndarray,
+    n_lists: int,
+    n_iter: int,
+    batch_size: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    spherical k-means, i.e. clusters of normalized vectors by cosine similarity
+    """
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)]
+
+    for _ in range(n_iter):
+        labels = _assign(vectors, centroids, batch_size)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=n_lists)
+        starts = np.cumsum(counts) - counts
+        filled = counts > 0
+
+        sums = np.empty_like(centroids)
+        sums[filled] = np.add.reduceat(vectors[order], starts[filled])
+        # restart empty clusters at random vectors
+        sums[~filled] = vectors[rng.choice(len(vectors), int((~filled).sum()))]
+
+        centroids = _normalize(sums)
+
+    return centroids
+
+
+class IVFIndex:
+    """
+    inverted file index over normalized vectors. the vectors are clustered with
+    k-means and stored contiguously per cluster, a query only scores the vectors
+    of the `n_probe` clusters with the most similar centroids.
+
+    `save` writes the arrays as .npy files into a directory and `load` memory
+    maps them, so the operating system only reads the probed clusters and the
+    pages are shared by all processes that load the same index.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+    ) -> None:
+        self.centroids = centroids
+        # vectors of cluster i are vectors[offsets[i] : offsets[i + 1]]
+        self.offsets = offsets
+        # option position of each vector
+        self.ids = ids
+        self.vectors = vectors
+
+    @classmethod
+    def build(
+        cls,
+        vectors: Any,
+        n_lists: int | None = None,
+        n_iter: int = 10,
+        sample_size: int | None = None,
+        batch_size: int = 16_384,
+        seed: int = 0,
+    ) -> IVFIndex:
+        """
+        cluster the vectors into `n_lists` clusters, sqrt(len(vectors)) by
+        default. centroids are trained on a sample of `sample_size` vectors, 64
+        per cluster by default, and all vectors are assigned in batches.
+        """
+        vectors = _normalize(vectors)
+
+        if vectors.ndim != 2 or len(vectors) == 0:
+            raise ValueError("expected a non-empty 2d array of vectors")
+
+        n_lists = n_lists or math.isqrt(len(vectors))
+        n_lists = max(1, min(n_lists, len(vectors)))
+        sample_size = min(len(vectors), max(n_lists, sample_size or 64 * n_lists))
+
+        rng = np.random.default_rng(seed)
+        sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        centroids = _kmeans(sample, n_lists, n_iter, batch_size, rng)
+
+        labels = _assign(vectors, centroids, batch_size)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=n_lists)
+
+        return cls(
+            centroids=centroids,
+            offsets=np.concatenate(([0], np.cumsum(counts))),
+            ids=order,
+            vectors=vectors[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.centroids.shape[1]
+
+    def search(
+        self, query: Any, k: int = 10, n_probe: int = 16
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        ids and cosine similarities of the approximate `k` nearest vectors, most
+        similar first. probing all clusters gives the exact result.
+        """
+        query = _normalize(query).reshape(-1)
+
+        if len(query) != self.dimension:
+            raise ValueError(
+                f"query has dimension {len(query)}, index has {self.dimension}"
+            )
+
+        n_probe = max(1, min(n_probe, len(self.centroids)))
+        probe = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+
+        ranges = [(int(self.offsets[c]), int(self.offsets[c + 1])) for c in probe]
+        scores = np.concatenate([self.vectors[a:b] @ query for a, b in ranges])
+        positions = np.concatenate([np.arange(a, b) for a, b in ranges])
+
+        k = min(k, len(scores))
+
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return np.asarray(self.ids[positions[top]]), scores[top]
+
+    def save(self, path: str | os.PathLike) -> None:
+        """
+        write the index as .npy files into the directory `path`
+        """
+        os.makedirs(path, exist_ok=True)
+
+        for name in ("centroids", "offsets", "ids", "vectors"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, path: str | os.PathLike, mmap: bool = True) -> IVFIndex:
+        """
+        load an index written by `save`, with memory mapped ids and vectors
+        """
+        mode = "r" if mmap else None
+
+        return cls(
+            centroids=np.load(os.path.join(path, "centroids.npy")),
+            offsets=np.load(os.path.join(path, "offsets.npy")),
+            ids=np.load(os.path.join(path, "ids.npy"), mmap_mode=mode),
+            vectors=np.load(os.path.join(path, "vectors.npy"), mmap_mode=mode),
+        )
+
+
+class SemanticSearch(TopKSearch):
+    """
+    search by meaning over a static list of options, either labels or (label,
+    value) tuples. labels and searchterms are embedded with the given `embed`
+    function, e.g. a local sentence-transformers model, and options are ranked
+    by cosine similarity with an `IVFIndex`.
+
+    labels are embedded in batches of `batch_size` when the index is built. a
+    built index can be saved and loaded memory mapped with the same options, so
+    only the searchterm is embedded at runtime.
+
+    ```
+    model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+
+    @st.cache_resource
+    def load_search() -> SemanticSearch:
+        return SemanticSearch.load("index/", load_labels(), model.encode)
+
+    st_searchbox(load_search(), key="semantic")
+    ```
+    """
+
+    def __init__(
+        self,
+        options: List[Any] | List[tuple[str, Any]],
+        embed: Embed,
+        limit: int = 10,
+        n_probe: int = 16,
+        min_score: float | None = None,
+        batch_size: int = 256,
+        index: IVFIndex | None = None,
+        **build_kwargs,
+    ) -> None:
+        self.options = list(options)
+        self.embed = embed
+        self.limit = limit
+        self.n_probe = n_probe
+        self.min_score = min_score
+
+        if index is None:
+            labels = [str(v[0]) if isinstance(v, tuple) else str(v) for v in options]
+            vectors = self._embed_batches(labels, batch_size)
+            index = IVFIndex.build(vectors, **build_kwargs)
+
+        if len(index) != len(self.options):
+            raise ValueError(
+                f"index has {len(index)} vectors for {len(self.options)} options"
+            )
+
+        self.index = index
+
+    @classmethod
+    def load(
+        cls,
+        path: str | os.PathLike,
+        options: List[Any] | List[tuple[str, Any]],
+        embed: Embed,
+        **kwargs,
+    ) -> SemanticSearch:
+        """
+        search over a saved index, built from the same options in the same order
+        """
+        return cls(options, embed, index=IVFIndex.load(path), **kwargs)
+
+    def save(self, path: str | os.PathLike) -> None:
+        self.index.save(path)
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def _search(self, searchterm: str, limit: int) -> List[Any]:
+        """
+        top-k options by similarity to the searchterm, most similar first
+        """
+        if not searchterm.strip():
+            return self.options[:limit]
+
+        query = np.asarray(self.embed([searchterm]), dtype=np.float32)[0]
+        ids, scores = self.index.search(query, k=limit, n_probe=self.n_probe)
+
+        if self.min_score is not None:
+            ids = ids[scores >= self.min_score]
+
+        return [self.options[i] for i in ids.tolist()]
+
+    def _embed_batches(self, labels: List[str], batch_size: int) -> np.ndarray:
+        vectors: np.ndarray | None = None
+
+        for start in range(0, len(labels), batch_size):
+            batch = labels[start : start + batch_size]
+            embedded = np.asarray(self.embed(batch), dtype=np.float32)
+
+            if vectors is None:
+                vectors = np.empty((len(labels), embedded.shape[1]), dtype=np.float32)
+
+            vectors[start : start + len(batch)] = embedded
+
+        if vectors is None:
+            raise ValueError("expected at least one option")
+
+        return vectors
@@ -0,0 +1,58 @@
+"""
+option values that are shared across sessions instead of kept per session
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, Callable, Hashable, List, overload
+
+from streamlit_searchbox.cache import SearchCache
+
+
+class StoredResults(Sequence):
+    """
+    reference to search results in a shared store, which is kept in the session
+    state instead of the results themselves. results that were evicted from the
+    store are searched again on access
+    """
+
+    __slots__ = ("store", "key", "size", "search")
+
+    def __init__(
+        self,
+        store: SearchCache,
+        key: Hashable,
+        size: int,
+        search: Callable[[], Any],
+    ) -> None:
+        self.store = store
+        self.key = key
+        self.size = size
+        self.search = search
+
+    def __len__(self) -> int:
+        return self.size
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Any]: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        return self.results()[index]
+
+    def results(self) -> List[Any]:
+        results = self.store.get(self.key)
+
+        if results is None:
+            results = list(self.search())
+            self.store.set(self.key, results)
+
+        return results
+
+
+# shared instance that is used for `st_searchbox(..., value_store=True)`, entries
+# don't expire since sessions can submit long after their search
+default_value_store = SearchCache(max_entries=4096, ttl=None)
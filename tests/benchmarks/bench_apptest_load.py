@@ -0,0 +1,74 @@
+"""
+headless load test of whole script runs, N sessions are typing a query one
+keystroke at a time. the react component is replaced by the typed interaction
+
+    uv run pytest tests/benchmarks/bench_apptest_load.py -s
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import streamlit_searchbox
+
+SESSIONS = 10
+QUERY = "streamlit"
+PERCENTILES = (50, 95, 99)
+
+
+def app() -> None:
+    from streamlit_searchbox import st_searchbox
+
+    def search(searchterm: str) -> list[str]:
+        return [f"{searchterm}_{i}" for i in range(100)]
+
+    st_searchbox(search, key="load", rerun_scope="app")
+
+
+@pytest.fixture
+def typed_component(monkeypatch) -> None:
+    """
+    component returns the interaction stored in the session by the benchmark
+    """
+
+    def component(**kwargs):
+        return streamlit_searchbox.st.session_state.get("_interaction")
+
+    monkeypatch.setattr(streamlit_searchbox, "_get_react_component", component)
+
+
+def test_sessions_typing(typed_component):
+    sessions = [AppTest.from_function(app) for _ in range(SESSIONS)]
+
+    for at in sessions:
+        at.run()
+
+    runs: list[float] = []
+
+    # sessions type interleaved, like concurrent users of a single server
+    for i in range(1, len(QUERY) + 1):
+        for at in sessions:
+            at.session_state["_interaction"] = {
+                "interaction": "search",
+                "value": QUERY[:i],
+                "seq": i,
+            }
+
+            ts_start = time.perf_counter()
+            at.run()
+            runs.append((time.perf_counter() - ts_start) * 1000)
+
+            assert not at.exception
+            assert at.session_state["load"]["search"] == QUERY[:i]
+
+    quantiles = statistics.quantiles(runs, n=100)
+
+    print()
+    print(f"{'sessions':<10}{'keystrokes':>12}{'mean ms':>10}", end="")
+    print("".join(f"{f'p{p} ms':>10}" for p in PERCENTILES))
+    print(f"{SESSIONS:<10}{len(runs):>12}{statistics.mean(runs):>10.2f}", end="")
+    print("".join(f"{quantiles[p - 1]:>10.2f}" for p in PERCENTILES))
@@ -0,0 +1,49 @@
+"""
+conversion of search results into options for react and python, from a few to a
+million options
+
+    uv run pytest tests/benchmarks/bench_conversion.py --benchmark-only
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from streamlit_searchbox import _list_to_options_js, _list_to_options_py
+
+SIZES = [10, 1_000, 100_000, 1_000_000]
+
+
+def labels(size: int) -> list[str]:
+    return [f"option_{i}" for i in range(size)]
+
+
+def tuples(size: int) -> list[tuple[str, int]]:
+    return [(f"option_{i}", i) for i in range(size)]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_list_to_options_js_labels(benchmark, size):
+    options = labels(size)
+
+    result = benchmark(_list_to_options_js, options)
+
+    assert len(result["labels"]) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_list_to_options_js_tuples(benchmark, size):
+    options = tuples(size)
+
+    result = benchmark(_list_to_options_js, options)
+
+    assert len(result["labels"]) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_list_to_options_py_tuples(benchmark, size):
+    options = tuples(size)
+
+    result = benchmark(_list_to_options_py, options)
+
+    assert len(result) == size
@@ -0,0 +1,121 @@
+"""
+startup and prefix search per keystroke of a memory mapped `MappedCorpus`
+compared to reading a sorted text file into a list and bisecting it, like a
+server process would on startup. the size of the python objects that each
+process has to keep is stored in the extra info of the load benchmarks.
+
+    uv run pytest tests/benchmarks/bench_corpus.py --benchmark-only
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import itertools
+import random
+import string
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from streamlit_searchbox.corpus import MappedCorpus, write_corpus
+
+SIZES = [1_000_000, 10_000_000]
+QUERIES = 1_000
+
+
+@functools.cache
+def directory() -> Path:
+    return Path(tempfile.mkdtemp(prefix="bench_corpus"))
+
+
+@functools.cache
+def corpus(size: int) -> list[str]:
+    # product like names of two words and a number, e.g. "sorel pintera 42"
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+        for _ in range(max(100, size // 20))
+    ]
+    return sorted(
+        f"{rng.choice(words)} {rng.choice(words)} {rng.randint(1, 999)}"
+        for _ in range(size)
+    )
+
+
+@functools.cache
+def corpus_file(size: int) -> Path:
+    path = directory() / f"{size}.corpus"
+    write_corpus(path, corpus(size))
+
+    return path
+
+
+@functools.cache
+def text_file(size: int) -> Path:
+    path = directory() / f"{size}.txt"
+    path.write_text("\n".join(corpus(size)))
+
+    return path
+
+
+def typed_queries(size: int) -> list[str]:
+    rng = random.Random(1)
+    return [label[: rng.randint(1, 12)] for label in rng.sample(corpus(size), QUERIES)]
+
+
+def search_list(labels: list[str], searchterm: str) -> list[str]:
+    lo = bisect.bisect_left(labels, searchterm)
+    hi = bisect.bisect_left(labels, searchterm + "\U0010ffff", lo)
+
+    return labels[lo : min(hi, lo + 10)]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_corpus_open(benchmark, size):
+    path = corpus_file(size)
+
+    def run():
+        corpus = MappedCorpus(path)
+        corpus("a")
+        return corpus
+
+    corpus = benchmark(run)
+    benchmark.extra_info["python_bytes"] = sys.getsizeof(corpus)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_list_load(benchmark, size):
+    path = text_file(size)
+
+    labels = benchmark.pedantic(
+        lambda: path.read_text().split("\n"), rounds=3, iterations=1
+    )
+    benchmark.extra_info["python_bytes"] = sys.getsizeof(labels) + sum(
+        map(sys.getsizeof, labels)
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_corpus_search(benchmark, size):
+    corpus = MappedCorpus(corpus_file(size))
+    queries = itertools.cycle(typed_queries(size))
+
+    benchmark(lambda: corpus(next(queries)))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_list_search(benchmark, size):
+    labels = corpus(size)
+    queries = itertools.cycle(typed_queries(size))
+
+    benchmark(lambda: search_list(labels, next(queries)))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_write_corpus(benchmark, size, tmp_path):
+    labels = corpus(size)
+
+    benchmark.pedantic(write_corpus, args=(tmp_path / "corpus", labels), rounds=1)
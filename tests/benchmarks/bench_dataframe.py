@@ -0,0 +1,68 @@
+"""
+search over a dataframe column per keystroke with `DataFrameSearch` compared to
+filtering the dataframe and converting the matching rows to options
+
+    uv run pytest tests/benchmarks/bench_dataframe.py --benchmark-only
+"""
+
+from __future__ import annotations
+
+import functools
+import random
+import string
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streamlit_searchbox import _list_to_options_js, _list_to_options_py
+from streamlit_searchbox.dataframe import DataFrameSearch
+
+SIZES = [100_000, 1_000_000]
+# frequent, rare and missing searchterms
+TERMS = ["ab", "abcd", "zzzzz"]
+
+
+@functools.cache
+def products(size: int) -> pd.DataFrame:
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+        for _ in range(max(100, size // 20))
+    ]
+    return pd.DataFrame(
+        {
+            "name": [f"{rng.choice(words)} {rng.choice(words)}" for _ in range(size)],
+            "price": np.arange(size, dtype=float),
+            "stock": np.arange(size),
+        }
+    )
+
+
+def search_filter(df: pd.DataFrame, searchterm: str) -> list[tuple[str, dict]]:
+    matches = df.loc[df["name"].str.contains(searchterm, case=False, regex=False)]
+    return list(zip(matches["name"], matches.to_dict("records")))[:10]
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("term", TERMS)
+def test_dataframe_filter(benchmark, size, term):
+    df = products(size)
+
+    def run():
+        options = search_filter(df, term)
+        return _list_to_options_js(options), _list_to_options_py(options)
+
+    benchmark.pedantic(run, rounds=5)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("term", TERMS)
+def test_dataframe_search(benchmark, size, term):
+    search = DataFrameSearch(products(size), "name")
+
+    def run():
+        options = search(term)
+        return _list_to_options_js(options), _list_to_options_py(options)
+
+    benchmark(run)
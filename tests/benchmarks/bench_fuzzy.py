@@ -0,0 +1,88 @@
+"""
+typo tolerant search per keystroke with `FuzzyIndex` compared to calling difflib
+on the whole corpus, which is only measured for the smaller corpora
+
+    uv run pytest tests/benchmarks/bench_fuzzy.py --benchmark-only
+"""
+
+from __future__ import annotations
+
+import difflib
+import functools
+import itertools
+import random
+import string
+
+import pytest
+
+from streamlit_searchbox.fuzzy import FuzzyIndex
+
+SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = 200
+
+
+@functools.cache
+def corpus(size: int) -> list[str]:
+    # product like names of two words and a number, e.g. "sorel pintera 42"
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+        for _ in range(max(100, size // 20))
+    ]
+    return [
+        f"{rng.choice(words)} {rng.choice(words)} {rng.randint(1, 999)}"
+        for _ in range(size)
+    ]
+
+
+@functools.cache
+def fuzzy_index(size: int) -> FuzzyIndex:
+    return FuzzyIndex(corpus(size))
+
+
+def typed_queries(size: int) -> list[str]:
+    """
+    prefixes of corpus entries as they are typed, with one typo from 4 and two
+    typos from 8 characters on
+    """
+    rng = random.Random(1)
+    queries = []
+
+    for label in rng.sample(corpus(size), QUERIES):
+        term = label[: rng.randint(3, 12)]
+
+        for _ in range(len(term) // 4):
+            i = rng.randrange(len(term))
+            term = term[:i] + rng.choice(string.ascii_lowercase) + term[i + 1 :]
+
+        queries.append(term)
+
+    return queries
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_fuzzy_index(benchmark, size):
+    index = fuzzy_index(size)
+    queries = itertools.cycle(typed_queries(size))
+
+    benchmark(lambda: index(next(queries)))
+
+
+@pytest.mark.parametrize("size", SIZES[:2])
+def test_difflib(benchmark, size):
+    labels = corpus(size)
+    queries = itertools.cycle(typed_queries(size))
+
+    benchmark.pedantic(
+        lambda: difflib.get_close_matches(next(queries), labels, n=10),
+        rounds=5,
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_fuzzy_index_build(benchmark, size):
+    labels = corpus(size)
+
+    index = benchmark.pedantic(FuzzyIndex, args=(labels,), rounds=1)
+
+    assert len(index) == size
@@ -0,0 +1,52 @@
+"""
+processing of a single keystroke in the script thread, for search functions with
+different latencies and result sizes
+
+    uv run pytest tests/benchmarks/bench_process_search.py --benchmark-only
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+
+import pytest
+
+from streamlit_searchbox import _process_search
+from streamlit_searchbox.cache import SearchCache
+from tests.benchmarks.utils import KEY
+
+
+def search_function(latency_ms: float, results: int):
+    def search(searchterm: str) -> list[str]:
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        return [f"{searchterm}_{i}" for i in range(results)]
+
+    return search
+
+
+@pytest.mark.parametrize("latency_ms", [0, 1, 10])
+@pytest.mark.parametrize("results", [10, 1_000])
+def test_process_search(benchmark, session_state, latency_ms, results):
+    search = search_function(latency_ms, results)
+    # every keystroke is a new searchterm, unchanged terms aren't searched again
+    terms = (f"term_{i}" for i in itertools.count())
+
+    benchmark(lambda: _process_search(search, KEY, next(terms), True))
+
+    assert len(session_state[KEY]["options_js"]["labels"]) == results
+
+
+def test_process_search_cached(benchmark, session_state):
+    search = search_function(10, 1_000)
+    cache = SearchCache()
+    # alternate between two searchterms, which are cached before the benchmark
+    terms = itertools.cycle(["a", "b"])
+    for _ in range(2):
+        _process_search(search, KEY, next(terms), True, cache=cache)
+
+    benchmark(lambda: _process_search(search, KEY, next(terms), True, cache=cache))
+
+    assert cache.misses == 2
+    assert cache.hits > 0
@@ -0,0 +1,135 @@
+"""
+reruns of a typing session with and without `min_execution_time`, simulated on
+a virtual clock. the component model mirrors the throttle in Searchbox.tsx, a
+search is sent no sooner than `min_execution_time` after the previous search
+and after the options of its rerun arrived, a newer keystroke replaces the
+pending search. the script thread calls the real `_process_search` and counts
+the reruns it requests.
+
+    uv run pytest tests/benchmarks/bench_rerun_throttle.py -s
+"""
+
+from __future__ import annotations
+
+import math
+
+import streamlit_searchbox
+from streamlit_searchbox import _process_search
+from tests.benchmarks.utils import KEY
+
+KEYSTROKES = 40
+MIN_EXECUTION_TIME = 250
+
+# milliseconds between keystrokes of a typing user and per search
+TYPING_INTERVAL = 60
+SEARCH_LATENCY = 40
+
+
+class Simulation:
+    def __init__(self, min_execution_time: int) -> None:
+        self.min_execution_time = min_execution_time
+        self.now = 0.0
+        self.keystrokes = [
+            (i * TYPING_INTERVAL, "x" * (i + 1)) for i in range(KEYSTROKES)
+        ]
+        # component state
+        self.last_search = -math.inf
+        self.last_options = -math.inf
+        self.pending: tuple[float, str] | None = None
+        # searches sent to the script thread, streamlit merges them into the
+        # latest one while the script is running
+        self.queued: str | None = None
+        self.searches = 0
+        self.reruns: list[float] = []
+
+    def search(self, searchterm: str) -> list[str]:
+        # the component keeps receiving keystrokes while the script searches
+        self.advance(self.now + SEARCH_LATENCY)
+        return [f"{searchterm}_{i}" for i in range(10)]
+
+    def rerun(self, rerun_scope: str) -> None:
+        self.reruns.append(self.now)
+        self.last_options = self.now
+
+    def rerun_requested(self) -> bool:
+        return self.queued is not None
+
+    def throttle(self, searchterm: str) -> None:
+        wait = (
+            max(self.last_search, self.last_options)
+            + self.min_execution_time
+            - self.now
+        )
+
+        if wait > 0:
+            self.pending = (self.now + wait, searchterm)
+            return
+
+        self.last_search = self.now
+        self.searches += 1
+        self.queued = searchterm
+
+    def next_event(self) -> float:
+        times = [float(t) for t, _ in self.keystrokes[:1]]
+        if self.pending is not None:
+            times.append(self.pending[0])
+
+        return min(times, default=math.inf)
+
+    def advance(self, until: float) -> None:
+        while self.next_event() <= until:
+            self.now = self.next_event()
+
+            if self.keystrokes and self.keystrokes[0][0] == self.now:
+                _, searchterm = self.keystrokes.pop(0)
+                self.pending = None
+                self.throttle(searchterm)
+            elif self.pending is not None:
+                _, searchterm = self.pending
+                self.pending = None
+                self.throttle(searchterm)
+
+        self.now = max(self.now, until)
+
+    def run(self) -> None:
+        while self.queued is not None or self.next_event() < math.inf:
+            if self.queued is None:
+                self.advance(self.next_event())
+                continue
+
+            searchterm, self.queued = self.queued, None
+            _process_search(self.search, KEY, searchterm, rerun_on_update=True)
+
+
+def test_rerun_throttle(session_state, monkeypatch):
+    results = {}
+
+    for min_execution_time in (0, MIN_EXECUTION_TIME):
+        session_state.clear()
+        streamlit_searchbox._set_defaults(KEY, None)
+
+        simulation = Simulation(min_execution_time)
+        monkeypatch.setattr(streamlit_searchbox, "_rerun", simulation.rerun)
+        monkeypatch.setattr(
+            streamlit_searchbox, "_rerun_requested", simulation.rerun_requested
+        )
+        simulation.run()
+
+        results[min_execution_time] = simulation
+
+    print()
+    print(f"{'min_execution_time':<20}{'searches':>10}{'reruns':>8}{'min gap ms':>12}")
+
+    gaps = {}
+    for min_execution_time, simulation in results.items():
+        reruns = simulation.reruns
+        gaps[min_execution_time] = min(b - a for a, b in zip(reruns, reruns[1:]))
+        print(
+            f"{min_execution_time:<20}{simulation.searches:>10}"
+            f"{len(reruns):>8}{gaps[min_execution_time]:>12.0f}"
+        )
+
+    assert gaps[MIN_EXECUTION_TIME] >= MIN_EXECUTION_TIME
+    assert len(results[MIN_EXECUTION_TIME].reruns) < len(results[0].reruns)
+    # the last keystroke is always searched
+    assert session_state[KEY]["search"] == "x" * KEYSTROKES
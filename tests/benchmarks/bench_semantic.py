@@ -0,0 +1,103 @@
+"""
+nearest neighbor queries per keystroke with `IVFIndex`, in memory and memory
+mapped from disk, compared to scoring all vectors. the embedding model is not
+part of the benchmark, vectors are hierarchically clustered random 128d
+embeddings. recall@10 against the exact search is stored in the extra info.
+
+    uv run pytest tests/benchmarks/bench_semantic.py --benchmark-only
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+
+import numpy as np
+import pytest
+
+from streamlit_searchbox.semantic import IVFIndex, _normalize
+
+SIZES = [100_000, 1_000_000]
+DIMENSION = 128
+QUERIES = 100
+
+
+@functools.cache
+def embeddings(size: int) -> np.ndarray:
+    # topics with subtopics of 100 entries each, like embeddings of real labels
+    rng = np.random.default_rng(0)
+    topics = rng.normal(size=(200, DIMENSION)).astype(np.float32)
+    subtopics = topics[rng.integers(len(topics), size=size // 100)]
+    subtopics += rng.normal(scale=0.7, size=subtopics.shape).astype(np.float32)
+    vectors = subtopics[rng.integers(len(subtopics), size=size)]
+    vectors += rng.normal(scale=0.5, size=vectors.shape).astype(np.float32)
+
+    return _normalize(vectors)
+
+
+@functools.cache
+def queries(size: int) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    vectors = embeddings(size)[rng.integers(size, size=QUERIES)]
+
+    return _normalize(vectors + rng.normal(scale=0.2, size=vectors.shape))
+
+
+@functools.cache
+def exact(size: int) -> list[set[int]]:
+    return [
+        set(np.argsort(-(embeddings(size) @ q))[:10].tolist()) for q in queries(size)
+    ]
+
+
+@functools.cache
+def ivf_index(size: int) -> IVFIndex:
+    return IVFIndex.build(embeddings(size))
+
+
+def recall(index: IVFIndex, size: int, n_probe: int) -> float:
+    found = sum(
+        len(set(index.search(q, k=10, n_probe=n_probe)[0].tolist()) & expected)
+        for q, expected in zip(queries(size), exact(size))
+    )
+
+    return found / (10 * QUERIES)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_exact_search(benchmark, size):
+    vectors = embeddings(size)
+    query = itertools.cycle(queries(size))
+
+    def run():
+        scores = vectors @ next(query)
+        return np.argpartition(-scores, 10)[:10]
+
+    benchmark.pedantic(run, rounds=10)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("n_probe", [4, 16, 64])
+def test_ivf_search(benchmark, size, n_probe):
+    index = ivf_index(size)
+    query = itertools.cycle(queries(size))
+
+    benchmark(lambda: index.search(next(query), k=10, n_probe=n_probe))
+    benchmark.extra_info["recall"] = recall(index, size, n_probe)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_ivf_search_mmap(benchmark, size, tmp_path):
+    ivf_index(size).save(tmp_path)
+    index = IVFIndex.load(tmp_path)
+    query = itertools.cycle(queries(size))
+
+    benchmark(lambda: index.search(next(query), k=10, n_probe=16))
+    benchmark.extra_info["recall"] = recall(index, size, 16)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_ivf_build(benchmark, size):
+    index = benchmark.pedantic(IVFIndex.build, args=(embeddings(size),), rounds=1)
+
+    assert len(index) == size
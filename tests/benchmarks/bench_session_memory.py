@@ -0,0 +1,68 @@
+"""
+memory per session for search results with large option values, comparing values
+kept in each session state with a value store shared across sessions. sessions
+either search the same term, e.g. the default options, or each a distinct term,
+where the store can't share results and only adds its own entries
+
+    uv run pytest tests/benchmarks/bench_session_memory.py -s
+"""
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+
+from streamlit_searchbox import _process_search, _set_defaults
+from streamlit_searchbox.cache import SearchCache
+
+SESSIONS = 200
+RESULTS = 100
+
+
+def search_rows(searchterm: str) -> list[tuple[str, dict]]:
+    # e.g. rows of a dataframe or orm objects, created anew for every search
+    return [
+        (f"{searchterm}_{i}", {"id": i, "name": f"{searchterm}_{i}", "data": [0] * 50})
+        for i in range(RESULTS)
+    ]
+
+
+def bytes_per_session(value_store: SearchCache | None, distinct: bool) -> float:
+    gc.collect()
+    tracemalloc.start()
+
+    for session in range(SESSIONS):
+        key = f"session_{session}"
+        _set_defaults(key, None)
+        _process_search(
+            search_rows,
+            key,
+            f"ber{session}" if distinct else "ber",
+            rerun_on_update=False,
+            value_store=value_store,
+        )
+
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return size / SESSIONS
+
+
+def test_bytes_per_session(session_state):
+    results = {
+        (storage, searchterms): bytes_per_session(
+            SearchCache(ttl=None) if storage == "value_store" else None,
+            distinct=searchterms == "distinct",
+        )
+        for searchterms in ("same", "distinct")
+        for storage in ("session_state", "value_store")
+    }
+
+    print()
+    print(f"{'storage':<16}{'searchterms':<14}{'kb/session':>12}")
+
+    for (storage, searchterms), size in results.items():
+        print(f"{storage:<16}{searchterms:<14}{size / 1024:>12.1f}")
+
+    assert results["value_store", "same"] < results["session_state", "same"]
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+import pytest
+
+from tests.benchmarks.utils import mock_session_state
+
+
+@pytest.fixture
+def session_state(monkeypatch) -> dict:
+    return mock_session_state(monkeypatch)
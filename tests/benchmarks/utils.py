@@ -0,0 +1,27 @@
+"""
+helpers shared by the benchmarks
+"""
+
+from __future__ import annotations
+
+import pytest
+
+import streamlit_searchbox
+from streamlit_searchbox import _set_defaults
+
+KEY = "searchbox"
+
+
+def mock_session_state(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """
+    replace the streamlit session state and reruns, so searches can be
+    benchmarked outside of a streamlit script
+    """
+    state: dict = {}
+
+    monkeypatch.setattr(streamlit_searchbox.st, "session_state", state)
+    monkeypatch.setattr(streamlit_searchbox, "_rerun", lambda _: None)
+
+    _set_defaults(KEY, None)
+
+    return state
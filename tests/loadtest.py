@@ -0,0 +1,162 @@
+"""
+load test of the example app with many concurrent browser sessions, each typing
+queries into the searchboxes of `tests/utils.py` like a user would. reports the
+keystroke to options latency and the cpu usage of the streamlit server
+
+    uv run pytest tests/loadtest.py -s
+
+the number of sessions and typed words can be set with LOADTEST_SESSIONS and
+LOADTEST_WORDS
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import statistics
+import time
+
+import psutil
+import pytest
+from playwright.async_api import Browser, async_playwright
+
+from tests.playwright import streamlit_app  # noqa: F401
+from tests.utils import boxes
+
+SESSIONS = int(os.environ.get("LOADTEST_SESSIONS", 10))
+WORDS = int(os.environ.get("LOADTEST_WORDS", 5))
+
+# think time between two keystrokes in seconds, roughly 40-100 words per minute
+KEYSTROKE_DELAY = (0.08, 0.25)
+# pause between two typed queries in seconds
+QUERY_DELAY = (0.5, 2.0)
+
+OPTIONS_TIMEOUT = 10_000
+PERCENTILES = (50, 95, 99)
+
+# searchboxes with fast, local search functions whose options contain the
+# searchterm, so new options of each keystroke can be told apart from the
+# previous ones
+LABELS = ("search", "search_default_options", "search_default_options_tuple")
+
+VOCABULARY = [
+    "berlin",
+    "streamlit",
+    "search",
+    "python",
+    "dataframe",
+    "widget",
+    "session",
+    "latency",
+]
+
+
+def searchable_boxes() -> list[int]:
+    """
+    positions of the `LABELS` searchboxes within the page
+    """
+    return [i for i, box in enumerate(boxes) if box["label"] in LABELS]
+
+
+async def run_session(
+    browser: Browser,
+    session: int,
+    box_ids: list[int],
+    latencies: list[float],
+    timeouts: list[str],
+) -> None:
+    rng = random.Random(session)
+    context = await browser.new_context()
+    page = await context.new_page()
+
+    await page.goto("localhost:8501")
+    await page.wait_for_selector("iframe[title='streamlit_searchbox.searchbox']")
+
+    for _ in range(WORDS):
+        i = rng.choice(box_ids)
+        frames = [f for f in page.frames if "streamlit_searchbox" in f.url]
+        searchbox = frames[i].locator("input[type='text']")
+
+        await searchbox.fill("")
+        query = rng.choice(VOCABULARY)
+
+        for n in range(1, len(query) + 1):
+            term = query[:n]
+
+            ts_start = time.perf_counter()
+            await searchbox.press(query[n - 1])
+
+            try:
+                await frames[i].wait_for_selector(
+                    f"[role='option'] >> text={term}_0",
+                    timeout=OPTIONS_TIMEOUT,
+                )
+                latencies.append((time.perf_counter() - ts_start) * 1000)
+            except Exception:
+                timeouts.append(term)
+
+            await asyncio.sleep(rng.uniform(*KEYSTROKE_DELAY))
+
+        await asyncio.sleep(rng.uniform(*QUERY_DELAY))
+
+    await context.close()
+
+
+async def run_sessions(box_ids: list[int]) -> tuple[list[float], list[str], float]:
+    latencies: list[float] = []
+    timeouts: list[str] = []
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+
+        ts_start = time.perf_counter()
+        await asyncio.gather(
+            *[
+                run_session(browser, session, box_ids, latencies, timeouts)
+                for session in range(SESSIONS)
+            ]
+        )
+        duration = time.perf_counter() - ts_start
+
+        await browser.close()
+
+    return latencies, timeouts, duration
+
+
+def cpu_seconds(process: psutil.Process) -> float:
+    """
+    cpu time of the streamlit server, including its child processes
+    """
+    processes = [process] + process.children(recursive=True)
+    return sum(p.cpu_times().user + p.cpu_times().system for p in processes)
+
+
+def test_load(streamlit_app):  # noqa: F811
+    box_ids = searchable_boxes()
+    assert len(box_ids) == len(LABELS), f"searchboxes {LABELS} not found"
+
+    server = psutil.Process(streamlit_app.pid)
+    cpu_start = cpu_seconds(server)
+
+    latencies, timeouts, duration = asyncio.run(run_sessions(box_ids))
+
+    cpu = cpu_seconds(server) - cpu_start
+    keystrokes = len(latencies) + len(timeouts)
+
+    if len(latencies) < 2:
+        pytest.fail(f"not enough options received, timeouts={len(timeouts)}")
+
+    quantiles = statistics.quantiles(latencies, n=100)
+
+    print()
+    print(f"sessions={SESSIONS} keystrokes={keystrokes} timeouts={len(timeouts)}")
+    print(
+        "latency ms: "
+        + " ".join(f"p{p}={quantiles[p - 1]:.0f}" for p in PERCENTILES)
+        + f" mean={statistics.mean(latencies):.0f}"
+    )
+    print(
+        f"server cpu: {cpu:.1f}s total, {100 * cpu / duration:.0f}% of one core, "
+        f"{1000 * cpu / keystrokes:.1f}ms per keystroke"
+    )
@@ -0,0 +1,201 @@
+import functools
+import time
+
+from streamlit_searchbox.cache import PrefixRefinement, SearchCache
+
+
+def search(searchterm: str, **kwargs) -> list[str]:
+    search.calls += 1  # type: ignore
+    return [f"{searchterm}_{i}_{len(kwargs)}" for i in range(3)]
+
+
+search.calls = 0  # type: ignore
+
+
+def test_cache_hit_miss():
+    cache = SearchCache()
+    calls = search.calls  # type: ignore
+
+    assert cache.fetch(search, "a") == ["a_0_0", "a_1_0", "a_2_0"]
+    assert cache.fetch(search, "a") == ["a_0_0", "a_1_0", "a_2_0"]
+    assert cache.fetch(search, "b") == ["b_0_0", "b_1_0", "b_2_0"]
+
+    assert search.calls - calls == 2  # type: ignore
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_kwargs_are_part_of_key():
+    cache = SearchCache()
+
+    assert cache.fetch(search, "a", x=1) == ["a_0_1", "a_1_1", "a_2_1"]
+    assert cache.fetch(search, "a") == ["a_0_0", "a_1_0", "a_2_0"]
+    # unhashable kwargs are still supported
+    assert cache.fetch(search, "a", x=[1, 2]) == ["a_0_1", "a_1_1", "a_2_1"]
+    assert cache.fetch(search, "a", x=[1, 2]) == ["a_0_1", "a_1_1", "a_2_1"]
+
+    assert cache.hits == 1
+    assert len(cache) == 3
+
+
+def test_cache_lambda_identity_across_reruns():
+    cache = SearchCache()
+
+    def make():
+        return lambda term: [term]
+
+    cache.fetch(make(), "a")
+    cache.fetch(make(), "a")
+
+    assert cache.hits == 1
+
+
+def test_cache_partial_identity():
+    cache = SearchCache()
+
+    cache.fetch(functools.partial(search, x=1), "a")
+    cache.fetch(functools.partial(search, x=2), "a")
+
+    assert cache.hits == 0
+
+
+def test_cache_lru_eviction():
+    cache = SearchCache(max_entries=2)
+
+    cache.fetch(search, "a")
+    cache.fetch(search, "b")
+    # refresh a, so b is the least recently used entry
+    cache.fetch(search, "a")
+    cache.fetch(search, "c")
+
+    assert cache.evictions == 1
+    assert cache.get(cache.key(search, "a", {})) is not None
+    assert cache.get(cache.key(search, "b", {})) is None
+
+
+def test_cache_max_bytes():
+    cache = SearchCache(max_entries=None, max_bytes=1000)
+
+    for term in "abcdefgh":
+        cache.fetch(search, term)
+
+    assert 0 < cache.stats()["bytes"] <= 1000
+    assert cache.evictions > 0
+
+
+def test_cache_ttl():
+    cache = SearchCache(ttl=0.01)
+
+    cache.fetch(search, "a")
+    time.sleep(0.02)
+    cache.fetch(search, "a")
+
+    assert cache.hits == 0
+    assert cache.misses == 2
+
+
+def test_cache_none_results():
+    cache = SearchCache()
+
+    def search_none(_: str):
+        return None
+
+    assert cache.fetch(search_none, "a") == []
+    assert cache.fetch(search_none, "a") == []
+    assert cache.hits == 1
+
+
+def test_refinement_filters_previous_results():
+    refine = PrefixRefinement()
+    history: list = []
+
+    refine.remember(history, "ber", ["Berlin", "Bern", ("Bergen", 3)])
+
+    assert refine.refine(history, "berl") == ["Berlin"]
+    assert refine.refine(history, "berg") == [("Bergen", 3)]
+    # not an extension of a previous searchterm
+    assert refine.refine(history, "be") is None
+    assert refine.refine(history, "par") is None
+
+
+def test_refinement_uses_longest_previous_term():
+    refine = PrefixRefinement(match=lambda term, label: label.startswith(term))
+    history: list = []
+
+    refine.remember(history, "a", ["ab", "abc", "abd"])
+    refine.remember(history, "abc", ["abc"])
+
+    assert refine.refine(history, "abcd") == []
+    assert refine.refine(history, "abd") == ["abd"]
+
+
+def test_refinement_skips_truncated_and_empty_terms():
+    refine = PrefixRefinement(truncated_at=2)
+    history: list = []
+
+    refine.remember(history, "", ["a"])
+    refine.remember(history, "b", ["b1", "b2"])
+
+    assert refine.refine(history, "a") is None
+    assert refine.refine(history, "b1") is None
+
+
+def test_refinement_skips_results_at_limit():
+    refine = PrefixRefinement()
+    history: list = []
+
+    refine.remember(history, "b", ["b1", "b2"], limit=2)
+    refine.remember(history, "c", ["c1"], limit=2)
+
+    assert refine.refine(history, "b1") is None
+    assert refine.refine(history, "c1") == ["c1"]
+
+
+def test_refinement_history_size():
+    refine = PrefixRefinement(size=2)
+    history: list = []
+
+    for term in ["a", "b", "c", "b"]:
+        refine.remember(history, term, [term])
+
+    assert [t for t, _ in history] == ["c", "b"]
+
+
+def test_cache_closures_of_same_factory():
+    cache = SearchCache()
+
+    def make_search(tenant: str):
+        return lambda term: [f"{tenant}:{term}"]
+
+    assert cache.fetch(make_search("a"), "x") == ["a:x"]
+    assert cache.fetch(make_search("b"), "x") == ["b:x"]
+    assert cache.fetch(make_search("a"), "x") == ["a:x"]
+    assert cache.hits == 1
+
+    # unhashable captured values are compared by identity
+    def make_rows_search(rows: list[int]):
+        return lambda term: [term, *rows]
+
+    rows = [1]
+    assert cache.fetch(make_rows_search(rows), "x") == ["x", 1]
+    assert cache.fetch(make_rows_search(rows), "x") == ["x", 1]
+    assert cache.fetch(make_rows_search([2]), "x") == ["x", 2]
+    assert cache.hits == 2
+
+
+def test_cache_bound_methods_of_different_instances():
+    cache = SearchCache()
+
+    class TenantSearch:
+        def __init__(self, tenant: str) -> None:
+            self.tenant = tenant
+
+        def search(self, term: str) -> list[str]:
+            return [f"{self.tenant}:{term}"]
+
+    a, b = TenantSearch("a"), TenantSearch("b")
+
+    assert cache.fetch(a.search, "x") == ["a:x"]
+    assert cache.fetch(b.search, "x") == ["b:x"]
+    assert cache.fetch(a.search, "x") == ["a:x"]
+    assert cache.hits == 1
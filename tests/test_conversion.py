@@ -23,36 +23,29 @@ def test_list_to_options_py_empty():
 
 def test_list_to_options_js_single_values():
     options = [1, 2, "three", 4.0]
-    expected = [
-        {"label": "1", "value": 0},
-        {"label": "2", "value": 1},
-        {"label": "three", "value": 2},
-        {"label": "4.0", "value": 3},
-    ]
+    expected = {"labels": ["1", "2", "three", "4.0"], "descriptions": None}
     assert _list_to_options_js(options) == expected
 
 
 def test_list_to_options_js_tuples():
     options = [(1, "one"), (2, "two"), ("3", "three")]
-    expected = [
-        {"label": "1", "value": 0},
-        {"label": "2", "value": 1},
-        {"label": "3", "value": 2},
-    ]
+    expected = {"labels": ["1", "2", "3"], "descriptions": None}
     assert _list_to_options_js(options) == expected
 
 
 def test_list_to_options_js_mixed():
     options = [1, (2, "two"), 3, ("4", "four")]
-    expected = [
-        {"label": "1", "value": 0},
-        {"label": "2", "value": 1},
-        {"label": "3", "value": 2},
-        {"label": "4", "value": 3},
-    ]
+    expected = {"labels": ["1", "2", "3", "4"], "descriptions": None}
     assert _list_to_options_js(options) == expected
 
 
+def test_list_to_options_js_descriptions():
+    options = [1, (2, "two", "second"), ("3", "three")]
+    expected = {"labels": ["1", "2", "3"], "descriptions": [None, "second", None]}
+    assert _list_to_options_js(options) == expected
+    assert _list_to_options_py(options) == [1, "two", "three"]
+
+
 def test_list_to_options_js_empty():
     options = []
-    assert _list_to_options_js(options) == []
+    assert _list_to_options_js(options) == {"labels": [], "descriptions": None}
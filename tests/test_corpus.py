@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from streamlit_searchbox.corpus import MappedCorpus, write_corpus
+
+CITIES = ["Berlin", "Bern", "Bergen", "Paris", "Hamburg", "Heidelberg", "Nürnberg"]
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    return tmp_path / "cities.corpus"
+
+
+def test_corpus_prefix(corpus_path):
+    write_corpus(corpus_path, CITIES)
+    corpus = MappedCorpus(corpus_path)
+
+    assert len(corpus) == len(CITIES)
+    assert corpus("ber") == ["Bergen", "Berlin", "Bern"]
+    assert corpus("HAM") == ["Hamburg"]
+    assert corpus("nü") == ["Nürnberg"]
+    assert corpus("xyz") == []
+    assert corpus("") == sorted(CITIES, key=str.lower)
+
+
+def test_corpus_limit(corpus_path):
+    write_corpus(corpus_path, CITIES)
+    corpus = MappedCorpus(corpus_path, limit=2)
+
+    assert corpus("") == ["Bergen", "Berlin"]
+    assert corpus("ber") == ["Bergen", "Berlin"]
+    assert corpus.search("ber", limit=1) == ["Bergen"]
+    assert corpus.prefix_range("be") == (0, 3)
+
+
+def test_corpus_values(corpus_path):
+    write_corpus(corpus_path, [(c, i) for i, c in enumerate(CITIES)])
+    corpus = MappedCorpus(corpus_path)
+
+    assert corpus("pa") == [("Paris", "3")]
+    assert corpus("h") == [("Hamburg", "4"), ("Heidelberg", "5")]
+
+
+def test_corpus_case_sensitive(corpus_path):
+    write_corpus(corpus_path, CITIES + ["bernau"], case_sensitive=True)
+    corpus = MappedCorpus(corpus_path)
+
+    assert corpus("Ber") == ["Bergen", "Berlin", "Bern"]
+    assert corpus("ber") == ["bernau"]
+
+
+def test_corpus_matches_sorted_list(corpus_path):
+    rng = random.Random(0)
+    labels = ["".join(rng.choices("abcäö", k=rng.randint(0, 6))) for _ in range(500)]
+    write_corpus(corpus_path, labels)
+    corpus = MappedCorpus(corpus_path, limit=len(labels))
+
+    for _ in range(100):
+        term = "".join(rng.choices("abcäö", k=rng.randint(0, 3)))
+        expected = sorted(label for label in labels if label.startswith(term))
+
+        assert corpus(term) == expected
+
+
+def test_corpus_rewrite(corpus_path):
+    write_corpus(corpus_path, CITIES)
+    corpus = MappedCorpus(corpus_path)
+    write_corpus(corpus_path, ["Paris"])
+
+    # the previous mapping stays readable until the corpus is reopened
+    assert corpus("pa") == ["Paris"]
+    assert len(corpus) == len(CITIES)
+    assert len(MappedCorpus(corpus_path)) == 1
+
+    corpus.close()
+
+
+def test_corpus_invalid_file(corpus_path):
+    corpus_path.write_bytes(b"label\n" * 20)
+
+    with pytest.raises(ValueError):
+        MappedCorpus(corpus_path)
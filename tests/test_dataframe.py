@@ -0,0 +1,79 @@
+import pandas as pd
+
+from streamlit_searchbox.dataframe import DataFrameSearch
+
+CITIES = pd.DataFrame(
+    {
+        "city": ["Berlin", "Bern", "Bergen", "Paris", "Hamburg", "Heidelberg", None],
+        "country": ["DE", "CH", "NO", "FR", "DE", "DE", "DE"],
+    },
+    index=["b", "be", "bg", "p", "h", "hd", "x"],
+)
+
+
+def test_dataframe_prefix_first():
+    search = DataFrameSearch(CITIES, "city")
+
+    assert search("ber") == [
+        ("Berlin", 0),
+        ("Bern", 1),
+        ("Bergen", 2),
+        ("Heidelberg", 5),
+    ]
+    assert search("BURG") == [("Hamburg", 4)]
+    assert search("xyz") == []
+
+
+def test_dataframe_columns():
+    search = DataFrameSearch(CITIES, ["city", "country"], description="country")
+
+    assert search("de") == [
+        ("Berlin", 0, "DE"),
+        ("Hamburg", 4, "DE"),
+        ("Heidelberg", 5, "DE"),
+        ("", 6, "DE"),
+    ]
+    assert search("ch") == [("Bern", 1, "CH")]
+
+
+def test_dataframe_label():
+    search = DataFrameSearch(CITIES, "city", label="country")
+
+    assert search("par") == [("FR", 3)]
+
+
+def test_dataframe_limit():
+    search = DataFrameSearch(CITIES, "city", limit=2)
+
+    assert search("") == [("Berlin", 0), ("Bern", 1)]
+    assert search("e") == [("Berlin", 0), ("Bern", 1)]
+    assert search("g") == [("Bergen", 2), ("Hamburg", 4)]
+    assert search.search("er", limit=4) == [
+        ("Berlin", 0),
+        ("Bern", 1),
+        ("Bergen", 2),
+        ("Heidelberg", 5),
+    ]
+
+
+def test_dataframe_limit_prefix_first():
+    search = DataFrameSearch(pd.DataFrame({"city": ["Bergen", "Gent", "Genf"]}), "city")
+
+    # prefix matches after the first substring matches are found as well
+    assert search.search("ge", limit=1) == [("Gent", 1)]
+    assert search.search("ge", limit=2) == [("Gent", 1), ("Genf", 2)]
+    assert search.search("ge", limit=3) == [("Gent", 1), ("Genf", 2), ("Bergen", 0)]
+
+
+def test_dataframe_case_sensitive():
+    search = DataFrameSearch(CITIES, "city", case_sensitive=True)
+
+    assert search("Ber") == [("Berlin", 0), ("Bern", 1), ("Bergen", 2)]
+    assert search("ber") == [("Heidelberg", 5)]
+
+
+def test_dataframe_row():
+    search = DataFrameSearch(CITIES, "city")
+    _, position = search("hamb")[0]
+
+    assert search.row(position).to_dict() == {"city": "Hamburg", "country": "DE"}
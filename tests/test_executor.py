@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from streamlit_searchbox import executor
+from streamlit_searchbox.executor import SearchCancelled, SearchExecutor
+
+
+def never_cancelled() -> bool:
+    return False
+
+
+class BlockingSearch:
+    """
+    search function that blocks until released and tracks its concurrency
+    """
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, searchterm: str) -> list[str]:
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        self.release.wait(timeout=5)
+
+        with self.lock:
+            self.running -= 1
+
+        return [searchterm]
+
+
+def run_threads(executor: SearchExecutor, search, terms: list[str]) -> list:
+    results: list = [None] * len(terms)
+
+    def _run(i: int, term: str) -> None:
+        results[i] = executor.run(search, term, cancelled=never_cancelled)
+
+    threads = [
+        threading.Thread(target=_run, args=(i, term)) for i, term in enumerate(terms)
+    ]
+
+    for t in threads:
+        t.start()
+
+    time.sleep(0.2)
+    search.release.set()
+
+    for t in threads:
+        t.join(timeout=5)
+
+    return results
+
+
+def test_executor_coalesces_identical_calls():
+    executor = SearchExecutor()
+    search = BlockingSearch()
+
+    results = run_threads(executor, search, ["a"] * 5)
+
+    assert results == [["a"]] * 5
+    assert search.calls == 1
+    assert executor.stats() == {"calls": 1, "coalesced": 4, "inflight": 0}
+
+
+def test_executor_max_concurrency():
+    executor = SearchExecutor(max_concurrency=2)
+    search = BlockingSearch()
+
+    results = run_threads(executor, search, ["a", "b", "c", "d"])
+
+    assert results == [["a"], ["b"], ["c"], ["d"]]
+    assert search.calls == 4
+    assert search.max_running == 2
+
+
+def test_executor_kwargs_and_async():
+    executor = SearchExecutor()
+
+    async def search_async(searchterm: str, n: int) -> list[str]:
+        await asyncio.sleep(0.01)
+        return [searchterm] * n
+
+    assert executor.run(search_async, "a", {"n": 2}, never_cancelled) == ["a", "a"]
+
+
+def test_executor_cancelled_while_waiting():
+    executor = SearchExecutor()
+    search = BlockingSearch()
+
+    with pytest.raises(SearchCancelled):
+        executor.run(search, "a", cancelled=lambda: True)
+
+    search.release.set()
+
+
+def test_executor_closures_are_not_coalesced():
+    executor = SearchExecutor()
+    release = threading.Event()
+
+    def make_search(tenant: str):
+        def search(searchterm: str) -> list[str]:
+            release.wait(timeout=5)
+            return [f"{tenant}:{searchterm}"]
+
+        return search
+
+    a = executor.submit(make_search("a"), "x", cancelled=never_cancelled)
+    b = executor.submit(make_search("b"), "x", cancelled=never_cancelled)
+    release.set()
+
+    assert a is not b
+    assert (a.result(timeout=5), b.result(timeout=5)) == (["a:x"], ["b:x"])
+    assert executor.stats()["coalesced"] == 0
+
+
+def test_executor_closures_share_slots():
+    executor = SearchExecutor(max_concurrency=1)
+
+    def make_search(tenant: str):
+        def search(searchterm: str) -> list[str]:
+            return [f"{tenant}:{searchterm}"]
+
+        return search
+
+    # re-created on every rerun
+    for tenant in ("a", "b", "c"):
+        assert executor.run(make_search(tenant), "x", cancelled=never_cancelled) == [
+            f"{tenant}:x"
+        ]
+
+    assert len(executor._slots) == 1
+
+
+def test_executor_slot_wait_timeout():
+    executor = SearchExecutor(max_concurrency=1)
+    search = BlockingSearch()
+
+    executor.submit(search, "a", cancelled=never_cancelled)
+
+    start = time.monotonic()
+    with pytest.raises(concurrent.futures.TimeoutError):
+        executor.run(search, "b", cancelled=never_cancelled, timeout=0.1)
+
+    assert time.monotonic() - start < 0.5
+
+    search.release.set()
+    assert executor.run(search, "c", cancelled=never_cancelled, timeout=5) == ["c"]
+
+
+def test_executor_streams_are_not_shared():
+    executor = SearchExecutor()
+
+    def search_stream(searchterm: str):
+        yield [f"{searchterm}1"]
+        yield [f"{searchterm}2"]
+
+    first = executor.run(search_stream, "a", cancelled=never_cancelled)
+    second = executor.run(search_stream, "a", cancelled=never_cancelled)
+
+    # closing the stream of one session doesn't end the stream of another
+    assert first is not second
+    first.close()
+    assert list(second) == [["a1"], ["a2"]]
+    assert executor.stats()["coalesced"] == 0
+
+
+def test_executor_coalesced_stream_is_called_again():
+    executor = SearchExecutor()
+    release = threading.Event()
+
+    class StreamSearch:
+        # returns a generator, but isn't a generator function itself
+        def __call__(self, searchterm: str):
+            release.wait(timeout=5)
+            return iter_batches(searchterm)
+
+    def iter_batches(searchterm: str):
+        yield [searchterm]
+
+    search = StreamSearch()
+    first = executor.submit(search, "a", cancelled=never_cancelled)
+    second = executor.submit(search, "a", cancelled=never_cancelled)
+    release.set()
+
+    assert first.result(timeout=5) is not second.result(timeout=5)
+    first.result().close()
+    assert list(second.result()) == [["a"]]
+
+
+def test_executor_coalesced_iterator_is_called_again():
+    executor = SearchExecutor()
+    release = threading.Event()
+
+    def search_cursor(searchterm: str):
+        release.wait(timeout=5)
+        return iter([searchterm, f"{searchterm}2"])
+
+    first = executor.submit(search_cursor, "a", cancelled=never_cancelled)
+    second = executor.submit(search_cursor, "a", cancelled=never_cancelled)
+    release.set()
+
+    # a one-shot iterator can't be consumed by both callers
+    assert list(first.result(timeout=5)) == ["a", "a2"]
+    assert list(second.result(timeout=5)) == ["a", "a2"]
+    assert executor.stats()["coalesced"] == 1
+
+
+@pytest.mark.parametrize(
+    "state, rerun_data, requested",
+    [
+        (None, None, False),
+        ("CONTINUE", None, False),
+        ("STOP", None, True),
+        # full app rerun
+        ("RERUN", dict(fragment_id_queue=[], is_fragment_scoped_rerun=False), True),
+        # `st.rerun(scope="fragment")` of another fragment preempts the run
+        ("RERUN", dict(fragment_id_queue=["b"], is_fragment_scoped_rerun=True), True),
+        # interaction within the searchbox fragment
+        ("RERUN", dict(fragment_id_queue=["a"], is_fragment_scoped_rerun=False), True),
+        # `st.fragment(run_every=...)` of another fragment runs afterwards
+        ("RERUN", dict(fragment_id_queue=["b"], is_fragment_scoped_rerun=False), False),
+    ],
+)
+def test_rerun_requested(monkeypatch, state, rerun_data, requested):
+    requests = SimpleNamespace(
+        _state=SimpleNamespace(value=state) if state else None,
+        _rerun_data=SimpleNamespace(fragment_id=None, **rerun_data)
+        if rerun_data
+        else None,
+    )
+    ctx = SimpleNamespace(script_requests=requests)
+    monkeypatch.setattr(executor, "get_script_run_ctx", lambda: ctx)
+    monkeypatch.setattr(executor, "_current_fragment_id", lambda: "a")
+
+    assert executor._rerun_requested() is requested
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import streamlit_searchbox
+from streamlit_searchbox import _set_defaults, st_searchbox
+from streamlit_searchbox.cache import _function_key
+from streamlit_searchbox.executor import SearchCancelled, SearchExecutor
+from streamlit_searchbox.federated import FederatedSearch, SearchSource
+
+
+def never_cancelled() -> bool:
+    return False
+
+
+def search_cities(searchterm: str) -> list:
+    return [c for c in ["berlin", "bern", "bergen"] if c.startswith(searchterm)]
+
+
+def search_ids(searchterm: str) -> list:
+    return [("Bern (CH)", "bern"), ("Bernau", "bernau")]
+
+
+def test_federated_merge_dedup():
+    search = FederatedSearch([search_cities, search_ids], executor=SearchExecutor())
+
+    # bern is found by both sources, the option with the higher rank is kept
+    assert search("ber") == [
+        ("Bern (CH)", "bern"),
+        "berlin",
+        ("Bernau", "bernau"),
+        "bergen",
+    ]
+
+
+def test_federated_weights():
+    search = FederatedSearch(
+        [search_cities, SearchSource(search_ids, weight=3)], executor=SearchExecutor()
+    )
+
+    assert search("ber") == [
+        ("Bern (CH)", "bern"),
+        ("Bernau", "bernau"),
+        "berlin",
+        "bergen",
+    ]
+
+
+def test_federated_limit_and_kwargs():
+    def search_kwargs(searchterm: str, country: str) -> list:
+        return [f"{searchterm} {country}"]
+
+    search = FederatedSearch([search_kwargs, search_kwargs], limit=1)
+
+    assert search.merge([["a", "b"], ["c"]]) == ["a"]
+    assert search("ber", country="de") == ["ber de"]
+
+
+def test_federated_timeout_and_deadline():
+    release = threading.Event()
+
+    def search_slow(searchterm: str) -> list:
+        release.wait(timeout=5)
+        return ["slow"]
+
+    search = FederatedSearch(
+        [search_cities, SearchSource(search_slow, timeout=0.1)],
+        executor=SearchExecutor(),
+    )
+
+    start = time.monotonic()
+    assert search.gather("berl", cancelled=never_cancelled) == [["berlin"], None]
+    assert time.monotonic() - start < 0.5
+
+    search = FederatedSearch([search_slow, search_cities], deadline=0.2)
+
+    start = time.monotonic()
+    assert search("berl") == ["berlin"]
+    assert time.monotonic() - start < 0.5
+
+    release.set()
+
+
+def test_federated_slow_source_without_free_slot():
+    release = threading.Event()
+
+    def search_slow(searchterm: str) -> list:
+        release.wait(timeout=5)
+        return ["slow"]
+
+    search = FederatedSearch(
+        [search_slow, search_cities],
+        deadline=0.3,
+        executor=SearchExecutor(max_concurrency=1),
+    )
+
+    # the timed out source keeps its slot, the next search doesn't wait for it
+    for term in ["berl", "berg"]:
+        start = time.monotonic()
+        assert search.gather(term, cancelled=never_cancelled)[1] == [
+            c for c in ["berlin", "bern", "bergen"] if c.startswith(term)
+        ]
+        assert time.monotonic() - start < 0.5
+
+    release.set()
+
+
+def test_federated_failed_source():
+    def search_broken(searchterm: str) -> list:
+        raise ConnectionError()
+
+    search = FederatedSearch([search_broken, search_cities])
+
+    assert search("berl") == ["berlin"]
+
+
+def test_federated_async_and_stream_sources():
+    async def search_async(searchterm: str) -> list:
+        await asyncio.sleep(0.01)
+        return [searchterm]
+
+    def search_stream(searchterm: str):
+        yield ["streamed"]
+
+    def search_words(searchterm: str):
+        return (w for w in ["berlin"] if w.startswith(searchterm))
+
+    search = FederatedSearch([search_async, search_stream, search_words])
+
+    # batches of streams can't be merged, generator expressions are options
+    assert search("berl") == ["berl", "berlin"]
+
+
+def test_federated_cancelled():
+    release = threading.Event()
+
+    def search_slow(searchterm: str) -> list:
+        release.wait(timeout=5)
+        return []
+
+    search = FederatedSearch([search_slow], executor=SearchExecutor())
+
+    with pytest.raises(SearchCancelled):
+        search.gather("a", cancelled=lambda: True)
+
+    release.set()
+
+
+def test_federated_stable_key():
+    def create():
+        return FederatedSearch([lambda s: [s], SearchSource(search_ids, weight=2)])
+
+    assert _function_key(create()) == _function_key(create())
+    assert _function_key(create()) != _function_key(FederatedSearch([search_ids]))
+
+
+def test_st_searchbox_list(monkeypatch):
+    monkeypatch.setattr(streamlit_searchbox.st, "session_state", {})
+    monkeypatch.setattr(streamlit_searchbox, "_rerun", lambda scope: None)
+    monkeypatch.setattr(
+        streamlit_searchbox,
+        "_get_react_component",
+        lambda **_: {"interaction": "search", "value": "berl", "seq": 1},
+    )
+    _set_defaults("federated", None)
+
+    st_searchbox([search_cities, SearchSource(search_ids)], key="federated")
+
+    assert streamlit_searchbox.st.session_state["federated"]["options_py"] == [
+        "berlin",
+        "bern",
+        "bernau",
+    ]
@@ -0,0 +1,55 @@
+import pytest
+import streamlit as st
+
+import streamlit_searchbox
+from streamlit_searchbox import _rerun
+
+APP = """
+import streamlit as st
+
+from streamlit_searchbox import _current_fragment_id, _fragment_supported
+
+st.write(f"app supported={_fragment_supported()} fragment={_current_fragment_id()}")
+
+with st.form("form"):
+    st.write(f"form supported={_fragment_supported()}")
+    st.form_submit_button("submit")
+
+@st.fragment
+def user_fragment():
+    st.write(f"fragment id={_current_fragment_id() is not None}")
+
+user_fragment()
+"""
+
+
+@pytest.mark.skipif(st.__version__ < "1.37", reason="scoped reruns not supported")
+def test_fragment_detection():
+    # the testing api is only available for streamlit >= 1.28
+    AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+    at = AppTest.from_string(APP).run()
+
+    assert not at.exception
+    assert [m.value for m in at.markdown] == [
+        "app supported=True fragment=None",
+        "form supported=False",
+        "fragment id=True",
+    ]
+
+
+@pytest.mark.skipif(st.__version__ < "1.37", reason="scoped reruns not supported")
+def test_rerun_scope_outside_fragment(monkeypatch):
+    scopes = []
+    monkeypatch.setattr(
+        streamlit_searchbox, "rerun", lambda scope: scopes.append(scope)
+    )
+
+    monkeypatch.setattr(streamlit_searchbox, "_current_fragment_id", lambda: "id")
+    _rerun("fragment")
+    _rerun("app")
+
+    # merged into a full app rerun, the fragment isn't running anymore
+    monkeypatch.setattr(streamlit_searchbox, "_current_fragment_id", lambda: None)
+    _rerun("fragment")
+
+    assert scopes == ["fragment", "app", "app"]
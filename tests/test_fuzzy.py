@@ -0,0 +1,103 @@
+import random
+
+from streamlit_searchbox.fuzzy import CHARS_PER_TYPO, FuzzyIndex
+
+CITIES = ["Berlin", "Bern", "Bergen", "Paris", "Hamburg", "Heidelberg", "Nürnberg"]
+
+
+def prefix_distance(term: str, label: str) -> int:
+    """
+    naive edit distance (with transpositions) of term to the closest label prefix
+    """
+    d = [list(range(len(term) + 1))]
+
+    for i in range(1, len(label) + 1):
+        d.append([i] + [0] * len(term))
+
+        for j in range(1, len(term) + 1):
+            d[i][j] = min(
+                d[i - 1][j] + 1,
+                d[i][j - 1] + 1,
+                d[i - 1][j - 1] + (label[i - 1] != term[j - 1]),
+            )
+
+            if i > 1 and j > 1 and label[i - 1] == term[j - 2]:
+                if label[i - 2] == term[j - 1]:
+                    d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+
+    return min(row[-1] for row in d)
+
+
+def test_fuzzy_typos():
+    index = FuzzyIndex(CITIES)
+
+    assert index("brlin") == ["Berlin"]
+    assert index("berlni") == ["Berlin"]
+    assert index("hamburk") == ["Hamburg"]
+    assert index("hidelberg") == ["Heidelberg"]
+
+
+def test_fuzzy_typos_per_length():
+    index = FuzzyIndex(CITIES)
+
+    # no typos below 4 characters
+    assert index("ber") == ["Bergen", "Berlin", "Bern"]
+    assert index("brl") == []
+    # one typo below 8 characters
+    assert index("hmbrg") == []
+    assert index("hmburg") == ["Hamburg"]
+
+
+def test_fuzzy_ranking():
+    index = FuzzyIndex(CITIES)
+
+    # exact prefix first, then typos with the longest exact prefix first
+    assert index("bern") == ["Bern", "Bergen", "Berlin"]
+    assert index("berlen") == ["Berlin", "Bergen"]
+
+
+def test_fuzzy_limit():
+    index = FuzzyIndex(CITIES, limit=2)
+
+    assert index("") == ["Berlin", "Bern"]
+    assert index("bern") == ["Bern", "Bergen"]
+    assert index.search("bern", limit=1) == ["Bern"]
+
+
+def test_fuzzy_tuples():
+    index = FuzzyIndex([(c, i) for i, c in enumerate(CITIES)])
+
+    assert index("pariss") == [("Paris", 3)]
+
+
+def test_fuzzy_case_sensitive():
+    index = FuzzyIndex(CITIES, case_sensitive=True)
+
+    assert index("Brlin") == ["Berlin"]
+    assert index("brlin") == []
+
+
+def test_fuzzy_matches_naive_search():
+    rng = random.Random(0)
+
+    for _ in range(100):
+        labels = [
+            "".join(rng.choices("abc", k=rng.randint(1, 10)))
+            for _ in range(rng.randint(1, 50))
+        ]
+        limit = rng.randint(1, 10)
+        index = FuzzyIndex(labels, limit=limit, prefix_length=rng.randint(2, 8))
+
+        for _ in range(10):
+            term = "".join(rng.choices("abc", k=rng.randint(1, 10)))
+            typos = min(2, len(term) // CHARS_PER_TYPO)
+
+            distances = sorted(
+                d
+                for d in (prefix_distance(term, label) for label in labels)
+                if d <= typos
+            )
+
+            assert [prefix_distance(term, label) for label in index(term)] == (
+                distances[:limit]
+            )
@@ -0,0 +1,64 @@
+import pytest
+
+from streamlit_searchbox.index import SearchIndex, TopKSearch
+
+CITIES = ["Berlin", "Bern", "Bergen", "Paris", "Hamburg", "Heidelberg", "Nürnberg"]
+
+
+def test_index_prefix_first():
+    index = SearchIndex(CITIES)
+
+    assert index("ber") == ["Bergen", "Berlin", "Bern", "Heidelberg", "Nürnberg"]
+    assert index("BERL") == ["Berlin"]
+
+
+def test_index_substring():
+    index = SearchIndex(CITIES)
+
+    assert index("berg") == ["Bergen", "Heidelberg", "Nürnberg"]
+    assert index("mbu") == ["Hamburg"]
+    # matching trigrams "ber" and "erg" alone aren't enough
+    assert index("bererg") == []
+    assert index("xyz") == []
+
+
+def test_index_short_terms():
+    index = SearchIndex(CITIES)
+
+    assert index("rg") == ["Bergen", "Hamburg", "Heidelberg", "Nürnberg"]
+    assert index("h") == ["Hamburg", "Heidelberg"]
+
+
+def test_index_limit():
+    index = SearchIndex(CITIES, limit=2)
+
+    assert index("") == ["Berlin", "Bern"]
+    assert index("ber") == ["Bergen", "Berlin"]
+    assert index.search("ber", limit=4) == ["Bergen", "Berlin", "Bern", "Heidelberg"]
+
+
+def test_index_tuples():
+    index = SearchIndex([(c, i) for i, c in enumerate(CITIES)])
+
+    assert index("bern") == [("Bern", 1)]
+
+
+def test_index_case_sensitive():
+    index = SearchIndex(CITIES, case_sensitive=True)
+
+    assert index("ber") == ["Heidelberg", "Nürnberg"]
+    assert index("Ber") == ["Bergen", "Berlin", "Bern"]
+
+
+def test_top_k_search_base():
+    class Countries(TopKSearch):
+        limit = 2
+
+        def _search(self, searchterm: str, limit: int) -> list:
+            return ["germany", "georgia", "ghana"][:limit]
+
+    assert Countries()("g") == ["germany", "georgia"]
+    assert Countries()("g", limit=1) == ["germany"]
+
+    with pytest.raises(TypeError):
+        TopKSearch()  # type: ignore
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+
+from streamlit_searchbox.metrics import Histogram, SearchboxMetrics
+
+
+def test_histogram_buckets():
+    histogram = Histogram([10, 100])
+
+    for value in [1, 10, 50, 500]:
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative() == [(10, 2), (100, 3), (float("inf"), 4)]
+    assert histogram.quantile(0.5) == 10
+    assert histogram.quantile(0.95) == float("inf")
+    assert histogram.sum == 561
+
+
+def test_metrics_hooks_and_snapshot():
+    events: list = []
+    metrics = SearchboxMetrics(
+        on_search_start=lambda key, term: events.append(("start", key, term)),
+        on_search_end=lambda key, term, m: events.append(("end", key, term, m)),
+    )
+
+    metrics.search_start("box", "ber")
+    metrics.search_end("box", "ber", {"search_ms": 20, "results": 3})
+    metrics.count("box", "dropped", 2)
+
+    assert events == [
+        ("start", "box", "ber"),
+        ("end", "box", "ber", {"search_ms": 20, "results": 3}),
+    ]
+
+    snapshot = metrics.snapshot()["box"]
+    assert snapshot["dropped"] == 2
+    assert snapshot["search_ms"] == {"count": 1, "sum": 20, "p50": 25, "p95": 25}
+
+
+def test_metrics_export(caplog):
+    metrics = SearchboxMetrics()
+    metrics.observe('my "box"', "results", 3)
+    metrics.count('my "box"', "cache_hits")
+
+    text = metrics.prometheus()
+
+    assert "# TYPE streamlit_searchbox_results histogram" in text
+    assert 'streamlit_searchbox_results_bucket{key="my \\"box\\"",le="10"} 1' in text
+    assert 'streamlit_searchbox_results_count{key="my \\"box\\""} 1' in text
+    assert 'streamlit_searchbox_cache_hits_total{key="my \\"box\\""} 1' in text
+
+    with caplog.at_level(logging.INFO, logger="streamlit_searchbox.metrics"):
+        metrics.log()
+
+    assert 'key=my "box" cache_hits=1 results[n=1 p50<=10 p95<=10]' in caplog.text
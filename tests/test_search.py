@@ -0,0 +1,601 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+import streamlit_searchbox
+from streamlit_searchbox import (
+    _concat_options_js,
+    _corpus_args,
+    _list_to_options_js,
+    _option_value,
+    _options_args,
+    _process_page,
+    _process_search,
+    _set_defaults,
+    st_searchbox,
+)
+from streamlit_searchbox import executor
+from streamlit_searchbox.cache import PrefixRefinement, SearchCache
+from streamlit_searchbox.index import SearchIndex
+from streamlit_searchbox.metrics import SearchboxMetrics
+
+KEY = "searchbox"
+
+
+@pytest.fixture(autouse=True)
+def session_state(monkeypatch) -> dict:
+    """
+    replace the streamlit session state and reruns, so the search can run
+    outside of a streamlit script
+    """
+    state: dict = {}
+
+    monkeypatch.setattr(streamlit_searchbox.st, "session_state", state)
+
+    _set_defaults(KEY, None)
+
+    return state
+
+
+@pytest.fixture(autouse=True)
+def reruns(monkeypatch) -> list[str]:
+    scopes: list[str] = []
+
+    monkeypatch.setattr(streamlit_searchbox, "_rerun", scopes.append)
+
+    return scopes
+
+
+class Search:
+    def __init__(self) -> None:
+        self.terms: list[str] = []
+
+    def __call__(self, searchterm: str) -> list[str]:
+        self.terms.append(searchterm)
+        return [w for w in ["berlin", "bern", "bergen", "paris"] if searchterm in w]
+
+
+def test_process_search_sets_options(session_state):
+    search = Search()
+
+    _process_search(search, KEY, "ber", rerun_on_update=True)
+
+    assert session_state[KEY]["search"] == "ber"
+    assert session_state[KEY]["options_py"] == ["berlin", "bern", "bergen"]
+    assert session_state[KEY]["options_js"]["labels"][0] == "berlin"
+
+
+def test_process_search_reruns(session_state, reruns, monkeypatch):
+    _process_search(Search(), KEY, "a", rerun_on_update=True, rerun_scope="fragment")
+    _process_search(Search(), KEY, "b", rerun_on_update=False)
+
+    assert reruns == ["fragment"]
+
+    # newer interaction was queued during the search, results are shown by that rerun
+    queued = iter([False, True])
+    monkeypatch.setattr(streamlit_searchbox, "_rerun_requested", lambda: next(queued))
+    _process_search(Search(), KEY, "c", rerun_on_update=True)
+
+    assert reruns == ["fragment"]
+    assert session_state[KEY]["search"] == "c"
+
+
+def test_process_search_skipped_if_queued(session_state, monkeypatch):
+    search = Search()
+
+    # newer interaction is already queued, that rerun will search instead
+    monkeypatch.setattr(streamlit_searchbox, "_rerun_requested", lambda: True)
+    _process_search(search, KEY, "ber", rerun_on_update=True)
+
+    assert search.terms == []
+    assert session_state[KEY]["search"] == ""
+
+
+def test_search_outdated_dropped(session_state, monkeypatch):
+    search = Search()
+    component = {"interaction": "search", "value": "ber", "seq": 2}
+
+    monkeypatch.setattr(
+        streamlit_searchbox, "_get_react_component", lambda **_: component
+    )
+
+    st_searchbox(search, key=KEY)
+    assert session_state[KEY]["search"] == "ber"
+
+    # older search that arrives late is dropped, the same one is processed again
+    component.update(value="be", seq=1)
+    st_searchbox(search, key=KEY)
+    assert session_state[KEY]["search"] == "ber"
+
+    component.update(value="berl", seq=3)
+    st_searchbox(search, key=KEY)
+    assert search.terms == ["ber", "berl"]
+
+
+def test_local_mode_sends_no_options(session_state, monkeypatch):
+    args = []
+
+    def component(**kwargs):
+        args.append(kwargs)
+        return None
+
+    monkeypatch.setattr(streamlit_searchbox, "_get_react_component", component)
+
+    for _ in range(2):
+        st_searchbox(None, key=KEY, options=["berlin", "bern"], mode="local")
+
+    # the react component can't request options it never applies
+    assert [a["options"] for a in args] == [None, None]
+    assert args[0]["corpus"]["labels"] == ["berlin", "bern"]
+    assert args[1]["corpus"]["labels"] is None
+
+
+def test_process_search_same_term(session_state):
+    search = Search()
+
+    _process_search(search, KEY, "ber", rerun_on_update=True)
+    _process_search(search, KEY, "ber", rerun_on_update=True)
+
+    assert search.terms == ["ber"]
+
+
+def test_process_search_refinement(session_state):
+    search = Search()
+    refine = PrefixRefinement()
+
+    for term in ["b", "be", "ber", "berl", "berli"]:
+        _process_search(search, KEY, term, rerun_on_update=True, refine=refine)
+
+    assert search.terms == ["b"]
+    assert session_state[KEY]["options_py"] == ["berlin"]
+
+    # not an extension of the previous searchterms
+    _process_search(search, KEY, "par", rerun_on_update=True, refine=refine)
+
+    assert search.terms == ["b", "par"]
+
+
+def test_process_search_refinement_top_k(session_state):
+    index = SearchIndex(["berlin", "bern", "bergen", "berlingen"], limit=2)
+
+    for term in ["ber", "berli"]:
+        _process_search(
+            index, KEY, term, rerun_on_update=True, refine=PrefixRefinement()
+        )
+
+    # the top 2 results for "ber" are incomplete and can't be refined
+    assert session_state[KEY]["options_py"] == ["berlin", "berlingen"]
+
+
+def test_corpus_args_sent_once(session_state):
+    options = ["berlin", ("Paris", "paris")]
+
+    corpus = _corpus_args(KEY, options)
+
+    assert corpus["labels"] == ["berlin", "Paris"]
+    assert session_state[KEY]["options_py"] == ["berlin", "paris"]
+
+    # afterwards only the hash is referenced
+    assert _corpus_args(KEY, options) == {"hash": corpus["hash"], "labels": None}
+    # a new list with the same content isn't sent again either
+    assert _corpus_args(KEY, list(options))["labels"] is None
+
+
+def test_corpus_args_changed_or_requested(session_state):
+    corpus = _corpus_args(KEY, ["a", "b"])
+
+    changed = _corpus_args(KEY, ["a", "c"])
+
+    assert changed["hash"] != corpus["hash"]
+    assert changed["labels"] == ["a", "c"]
+    assert session_state[KEY]["options_py"] == ["a", "c"]
+
+    # react component requested the corpus again
+    session_state[KEY]["corpus"]["sent"] = False
+
+    assert _corpus_args(KEY, ["a", "c"])["labels"] == ["a", "c"]
+
+
+def test_options_args_full_unchanged_splice(session_state):
+    _process_search(Search(), KEY, "ber", rerun_on_update=False)
+
+    args = _options_args(KEY)
+    assert args["version"] == 1
+    assert args["options"]["labels"] == ["berlin", "bern", "bergen"]
+
+    # reruns of other widgets don't send the options again
+    assert _options_args(KEY) == {"version": 1}
+
+    session_state[KEY]["options_js"] = _concat_options_js(
+        session_state[KEY]["options_js"], _list_to_options_js([("paris", 3, "fr")])
+    )
+
+    assert _options_args(KEY) == {
+        "version": 2,
+        "base": 1,
+        "start": 3,
+        "delete": 0,
+        "insert": {"labels": ["paris"], "descriptions": ["fr"]},
+    }
+
+
+def test_options_args_requested(session_state):
+    _process_search(Search(), KEY, "ber", rerun_on_update=False)
+    _options_args(KEY)
+
+    # mostly new options are sent in full
+    _process_search(Search(), KEY, "par", rerun_on_update=False)
+    args = _options_args(KEY)
+    assert args["version"] == 2
+    assert args["options"] == {"labels": ["paris"], "descriptions": None}
+
+    # react component lost its options
+    session_state[KEY]["options_sent"]["options"] = None
+    args = _options_args(KEY)
+    assert args["version"] == 3
+    assert args["options"] == {"labels": ["paris"], "descriptions": None}
+
+
+def test_process_search_async(session_state):
+    async def search_async(searchterm: str) -> list[str]:
+        await asyncio.sleep(0.01)
+        return [f"{searchterm}_{i}" for i in range(3)]
+
+    _process_search(search_async, KEY, "a", rerun_on_update=True)
+
+    assert session_state[KEY]["options_py"] == ["a_0", "a_1", "a_2"]
+
+
+def test_process_search_async_cancelled(session_state, monkeypatch):
+    cancelled = threading.Event()
+
+    async def search_slow(searchterm: str) -> list[str]:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return [searchterm]
+
+    # newer interaction arrived while searching
+    monkeypatch.setattr(executor, "_rerun_requested", lambda: True)
+
+    _process_search(search_slow, KEY, "a", rerun_on_update=True)
+
+    assert cancelled.wait(timeout=1)
+    # search is repeated on the next rerun
+    assert session_state[KEY]["search"] == ""
+    assert session_state[KEY]["options_js"]["labels"] == []
+
+
+def test_process_search_stream(session_state, reruns):
+    def search_stream(searchterm: str):
+        yield [f"{searchterm}_fast"]
+        yield [(f"{searchterm}_slow", 1), (f"{searchterm}_slower", 2)]
+
+    _process_search(search_stream, KEY, "a", rerun_on_update=True)
+
+    assert session_state[KEY]["options_py"] == ["a_fast"]
+
+    # every rerun appends one batch until the stream is exhausted
+    for _ in range(3):
+        _process_search(search_stream, KEY, "a", rerun_on_update=True)
+
+    assert session_state[KEY]["options_py"] == ["a_fast", 1, 2]
+    assert session_state[KEY]["options_js"]["labels"] == [
+        "a_fast",
+        "a_slow",
+        "a_slower",
+    ]
+    assert session_state[KEY]["stream"] is None
+    assert len(reruns) == 2
+
+
+def test_process_search_stream_closed(session_state):
+    closed = threading.Event()
+
+    def search_stream(searchterm: str):
+        try:
+            yield [searchterm]
+            yield [searchterm]
+        finally:
+            closed.set()
+
+    _process_search(search_stream, KEY, "a", rerun_on_update=True)
+    _process_search(search_stream, KEY, "b", rerun_on_update=True)
+
+    assert closed.is_set()
+    assert session_state[KEY]["options_py"] == ["b"]
+
+
+def test_process_search_async_stream(session_state):
+    async def search_stream(searchterm: str):
+        yield [f"{searchterm}_fast"]
+        await asyncio.sleep(0.01)
+        yield [f"{searchterm}_slow"]
+
+    for _ in range(3):
+        _process_search(search_stream, KEY, "a", rerun_on_update=False)
+
+    assert session_state[KEY]["options_py"] == ["a_fast", "a_slow"]
+    assert session_state[KEY]["stream"] is None
+
+
+def test_process_search_max_options(session_state, reruns):
+    def search_many(searchterm: str) -> list[tuple[str, int]]:
+        return [(f"{searchterm}_{i}", i) for i in range(5)]
+
+    _process_search(search_many, KEY, "a", rerun_on_update=False, max_options=2)
+
+    assert session_state[KEY]["options_py"] == [0, 1]
+    assert session_state[KEY]["options_more"] is not None
+
+    _process_page(KEY, 2, max_options=2)
+    # same page is requested again, e.g. rerun by another widget
+    _process_page(KEY, 2, max_options=2)
+
+    assert session_state[KEY]["options_py"] == [0, 1, 2, 3]
+    assert session_state[KEY]["options_js"]["labels"][3] == "a_3"
+
+    _process_page(KEY, 4, max_options=2)
+
+    assert session_state[KEY]["options_py"] == [0, 1, 2, 3, 4]
+    assert session_state[KEY]["options_more"] is None
+    assert len(reruns) == 2
+
+
+def test_process_search_generator_expression(session_state):
+    def search_words(searchterm: str):
+        # plain search function, the generator yields options and not batches
+        return (w for w in ["berlin", "bern", "bergen"] if searchterm in w)
+
+    class SearchBatches:
+        def __call__(self, searchterm: str):
+            yield ["berlin"]
+            yield ["bern"]
+
+    _process_search(search_words, KEY, "ber", rerun_on_update=False, max_options=2)
+
+    assert session_state[KEY]["options_py"] == ["berlin", "bern"]
+    assert session_state[KEY].get("stream") is None
+
+    _process_search(SearchBatches(), KEY, "b", rerun_on_update=False)
+
+    assert session_state[KEY]["options_py"] == ["berlin"]
+    assert session_state[KEY]["stream"] is not None
+
+
+def test_process_search_max_options_iterable(session_state, reruns):
+    read = []
+
+    def read_row(i: int) -> tuple[str, int]:
+        read.append(i)
+        return (f"row_{i}", i)
+
+    def search_cursor(searchterm: str):
+        # e.g. a database cursor, only the shown pages should be read
+        return map(read_row, range(1_000))
+
+    _process_search(search_cursor, KEY, "a", rerun_on_update=False, max_options=2)
+
+    assert session_state[KEY]["options_py"] == [0, 1]
+    assert read == [0, 1, 2]
+
+    _process_page(KEY, 2, max_options=2)
+
+    assert session_state[KEY]["options_py"] == [0, 1, 2, 3]
+    assert session_state[KEY]["options_js"]["labels"][3] == "row_3"
+    assert read == [0, 1, 2, 3, 4]
+    assert session_state[KEY]["options_more"] is not None
+
+
+def test_process_search_value_store(session_state):
+    store = SearchCache(ttl=None)
+    search = Search()
+
+    _process_search(search, KEY, "ber", rerun_on_update=False, value_store=store)
+
+    # session only keeps a reference, values are resolved on submit
+    assert "options_py" not in session_state[KEY]
+    assert len(store) == 1
+    assert _option_value(KEY, 1) == "bern"
+
+    # evicted results are searched again
+    store.clear()
+    assert _option_value(KEY, 2) == "bergen"
+    assert search.terms == ["ber", "ber"]
+
+
+def test_process_search_value_store_changed_results(session_state):
+    store = SearchCache(ttl=None)
+
+    _process_search(Search(), KEY, "ber", rerun_on_update=False, value_store=store)
+
+    # results of another session or a new search changed their order
+    store.set(session_state[KEY]["options_ref"].key, [("bern", 2), ("berlin", 1)])
+
+    assert _option_value(KEY, 0) == 1
+    assert _option_value(KEY, 2) is None
+
+
+def test_cache_iterator_results_not_shared(session_state):
+    cache = SearchCache()
+
+    def search_cursor(searchterm: str):
+        return iter([w for w in ["berlin", "bern"] if w.startswith(searchterm)])
+
+    for key in ["a", "b"]:
+        _set_defaults(key, None)
+        _process_search(search_cursor, key, "ber", rerun_on_update=False, cache=cache)
+
+    # the iterator of the first session would be exhausted for the second one
+    assert session_state["a"]["options_py"] == ["berlin", "bern"]
+    assert session_state["b"]["options_py"] == ["berlin", "bern"]
+    assert len(cache) == 0
+
+
+def test_value_store_cancelled_after_eviction(session_state, reruns, monkeypatch):
+    store = SearchCache(ttl=None)
+    search = Search()
+
+    monkeypatch.setattr(
+        streamlit_searchbox,
+        "_get_react_component",
+        lambda **_: {"interaction": "search", "value": "ber", "seq": 1},
+    )
+    st_searchbox(search, key=KEY, value_store=store, max_options=1)
+    session_state[KEY]["result"] = "paris"
+
+    def search_cancelled(searchterm: str) -> list[str]:
+        raise executor.SearchCancelled()
+
+    # evicted results are searched again while a newer interaction is queued
+    store.clear()
+    session_state[KEY]["options_ref"].search = lambda: search_cancelled("ber")
+
+    _process_page(KEY, 1, max_options=1)
+    assert session_state[KEY]["options_js"]["labels"] == ["berlin"]
+
+    monkeypatch.setattr(
+        streamlit_searchbox,
+        "_get_react_component",
+        lambda **_: {"interaction": "submit", "value": 0},
+    )
+    assert st_searchbox(search, key=KEY, value_store=store, max_options=1) == "paris"
+    assert session_state[KEY]["result"] == "paris"
+
+
+def test_value_store_closures_of_same_factory(session_state):
+    store = SearchCache(ttl=None)
+
+    def make_search(rows: list[str]):
+        def search(searchterm: str) -> list[str]:
+            return [r for r in rows if r.startswith(searchterm)]
+
+        return search
+
+    _process_search(make_search(["bern"]), KEY, "b", False, value_store=store)
+    _set_defaults(KEY, None)
+    _process_search(make_search(["berlin"]), KEY, "b", False, value_store=store)
+
+    # another session with a different closure doesn't resolve these results
+    assert len(store) == 2
+    assert _option_value(KEY, 0) == "berlin"
+
+
+def test_debounce_auto_latency(session_state, monkeypatch):
+    args: dict = {}
+
+    def component(**kwargs):
+        args.update(kwargs)
+        return {"interaction": "search", "value": "ber", "seq": 1}
+
+    monkeypatch.setattr(streamlit_searchbox, "_get_react_component", component)
+    monkeypatch.setattr(streamlit_searchbox, "LATENCY_SMOOTHING", 0.5)
+
+    st_searchbox(Search(), key=KEY, debounce="auto", debounce_bounds=(10, 500))
+
+    assert session_state[KEY]["latency_ms"] >= 0
+    assert args["debounce_bounds"] == (10, 500)
+
+    # smoothed with the previous latency
+    session_state[KEY]["latency_ms"] = 100
+    streamlit_searchbox._update_latency(KEY, 300)
+    assert session_state[KEY]["latency_ms"] == 200
+
+    st_searchbox(Search(), key=KEY, debounce="auto")
+    assert args["latency"] == 200
+
+    # fixed debounce doesn't need the latency
+    st_searchbox(Search(), key=KEY, debounce=100)
+    assert args["latency"] is None
+
+
+def test_process_search_metrics(session_state, reruns):
+    metrics = SearchboxMetrics()
+    cache = SearchCache()
+    search = Search()
+
+    for term in ["ber", "bern", "ber"]:
+        _process_search(
+            search, KEY, term, rerun_on_update=True, cache=cache, metrics=metrics
+        )
+
+    snapshot = metrics.snapshot()[KEY]
+
+    assert snapshot["searches"] == 3
+    assert snapshot["cache_hits"] == 1
+    assert snapshot["cache_misses"] == 2
+    assert snapshot["reruns"] == 3
+    assert snapshot["results"]["count"] == 3
+    assert snapshot["convert_ms"]["count"] == 3
+
+
+def test_metrics_search_end_status(session_state, monkeypatch):
+    events: list = []
+    metrics = SearchboxMetrics(
+        on_search_end=lambda key, term, m: events.append((term, m["status"]))
+    )
+
+    def search_cancelled(searchterm: str) -> list[str]:
+        raise executor.SearchCancelled()
+
+    def search_error(searchterm: str) -> list[str]:
+        raise ValueError(searchterm)
+
+    _process_search(Search(), KEY, "ber", rerun_on_update=True, metrics=metrics)
+    _process_search(search_cancelled, KEY, "bern", False, metrics=metrics)
+
+    with pytest.raises(ValueError):
+        _process_search(search_error, KEY, "berl", False, metrics=metrics)
+
+    assert events == [("ber", "ok"), ("bern", "cancelled"), ("berl", "error")]
+
+    snapshot = metrics.snapshot()[KEY]
+    assert snapshot["cancelled"] == 1
+    assert snapshot["errors"] == 1
+    assert snapshot["search_ms"]["count"] == 1
+
+    # time of the rerun is observed once the searchbox renders again
+    monkeypatch.setattr(
+        streamlit_searchbox, "_get_react_component", lambda **kwargs: None
+    )
+    st_searchbox(Search(), key=KEY, metrics=metrics)
+
+    assert metrics.snapshot()[KEY]["rerun_ms"]["count"] == 1
+
+
+def test_trace_echo_and_report(session_state, monkeypatch):
+    args: dict = {}
+    reports: list[dict] = []
+    component = {"interaction": "search", "value": "ber", "seq": 7}
+
+    def react(**kwargs):
+        args.update(kwargs)
+        return component
+
+    monkeypatch.setattr(streamlit_searchbox, "_get_react_component", react)
+
+    st_searchbox(Search(), key=KEY, trace=reports.append)
+
+    # server timings are echoed to the component with the new options
+    st_searchbox(Search(), key=KEY, trace=reports.append)
+    assert args["tracing"] is True
+    assert args["trace"]["id"] == 7
+    assert {"server_ms", "search_ms", "convert_ms"} <= set(args["trace"])
+
+    # waterfall is reported with the next interaction, only once
+    component["trace_report"] = {
+        "id": 7,
+        "roundtrip_ms": 120,
+        "server": {"id": 7, "server_ms": 20},
+    }
+    st_searchbox(Search(), key=KEY, trace=reports.append)
+    st_searchbox(Search(), key=KEY, trace=reports.append)
+
+    assert len(reports) == 1
+    assert reports[0]["key"] == KEY
+    assert reports[0]["streamlit_ms"] == 100
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from streamlit_searchbox.semantic import IVFIndex, SemanticSearch
+
+CITIES = ["Berlin", "Bern", "Bergen", "Paris", "Hamburg", "Heidelberg", "Nürnberg"]
+
+
+def embed_chars(texts: list[str]) -> np.ndarray:
+    """
+    toy embedding, counts of each letter
+    """
+    vectors = np.zeros((len(texts), 26), dtype=np.float32)
+
+    for i, text in enumerate(texts):
+        for char in text.lower():
+            if "a" <= char <= "z":
+                vectors[i, ord(char) - ord("a")] += 1
+
+    return vectors
+
+
+def clustered_vectors(size: int, dimension: int = 16) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, dimension))
+
+    return centers[rng.integers(20, size=size)] + rng.normal(size=(size, dimension))
+
+
+def exact_search(vectors: np.ndarray, query: np.ndarray, k: int) -> list[int]:
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.argsort(-(vectors @ query), kind="stable")[:k].tolist()
+
+
+def test_ivf_all_lists_is_exact():
+    vectors = clustered_vectors(2_000)
+    index = IVFIndex.build(vectors, n_lists=10)
+
+    for query in vectors[:20]:
+        ids, scores = index.search(query, k=5, n_probe=10)
+
+        assert set(ids.tolist()) == set(exact_search(vectors, query, 5))
+        assert np.all(np.diff(scores) <= 0)
+
+
+def test_ivf_recall():
+    vectors = clustered_vectors(5_000)
+    index = IVFIndex.build(vectors)
+    queries = vectors[:50] + 0.1
+
+    found = sum(
+        len(
+            set(index.search(q, k=10, n_probe=8)[0]) & set(exact_search(vectors, q, 10))
+        )
+        for q in queries
+    )
+
+    assert found / (10 * len(queries)) > 0.9
+
+
+def test_ivf_layout():
+    index = IVFIndex.build(clustered_vectors(500), n_lists=7)
+
+    assert len(index) == 500
+    assert index.offsets[0] == 0 and index.offsets[-1] == 500
+    assert sorted(index.ids.tolist()) == list(range(500))
+    assert np.allclose(np.linalg.norm(index.vectors, axis=1), 1)
+
+
+def test_ivf_small():
+    index = IVFIndex.build(np.eye(3), n_lists=10)
+
+    assert len(index.centroids) == 3
+    assert index.search([0, 1, 0], k=10)[0].tolist()[0] == 1
+
+    with pytest.raises(ValueError):
+        index.search([0, 1], k=1)
+
+    with pytest.raises(ValueError):
+        IVFIndex.build(np.empty((0, 3)))
+
+
+def test_ivf_save_load(tmp_path):
+    vectors = clustered_vectors(1_000)
+    index = IVFIndex.build(vectors)
+    index.save(tmp_path / "index")
+
+    loaded = IVFIndex.load(tmp_path / "index")
+
+    assert isinstance(loaded.vectors, np.memmap)
+
+    for query in vectors[:5]:
+        ids, scores = index.search(query)
+        loaded_ids, loaded_scores = loaded.search(query)
+
+        assert ids.tolist() == loaded_ids.tolist()
+        assert np.allclose(scores, loaded_scores)
+
+
+def test_semantic_search():
+    search = SemanticSearch(CITIES, embed_chars, n_lists=2, n_probe=2)
+
+    assert search("nreb")[0] == "Bern"
+    assert search("grubmah")[0] == "Hamburg"
+    assert search.search("berlni", limit=2) == ["Berlin", "Bern"]
+    assert search("  ") == CITIES[:10]
+
+
+def test_semantic_batches():
+    batches = []
+
+    def embed(texts: list[str]) -> np.ndarray:
+        batches.append(len(texts))
+        return embed_chars(texts)
+
+    SemanticSearch(CITIES, embed, batch_size=3)
+
+    assert batches == [3, 3, 1]
+
+
+def test_semantic_tuples_and_min_score():
+    options = [(city, i) for i, city in enumerate(CITIES)]
+    search = SemanticSearch(options, embed_chars, n_probe=10, min_score=0.9)
+
+    assert search("sirap") == [("Paris", 3)]
+
+
+def test_semantic_save_load(tmp_path):
+    search = SemanticSearch(CITIES, embed_chars)
+    search.save(tmp_path)
+
+    loaded = SemanticSearch.load(tmp_path, CITIES, embed_chars)
+
+    assert loaded("hamburg") == search("hamburg")
+
+    with pytest.raises(ValueError):
+        SemanticSearch.load(tmp_path, CITIES[:3], embed_chars)